@@ -6,11 +6,13 @@ app.py
 import sys
 from time import time
 
-import validators
 from gooey import Gooey, GooeyParser
 
-from procedures.approve_vendor import ApproveVendorProcess
-from utils.webdriver import MyWebDriver
+from procedures.batch import DEFAULT_WORKERS, load_vendor_emails
+from procedures.runner import enqueue_batch, run_batch, run_queue, run_vendor
+from procedures.warm_start import (WarmDriver, claim_warm_driver,
+                                   warm_start_enabled)
+from utils.webdriver import INTERACTIVE, PERFORMANCE
 
 
 PROG_NAME = "AutoCAT: The Automation You Need For the Jobs You Don't!"
@@ -38,35 +40,133 @@ def goopy():
 
     parser = GooeyParser(prog="AutoCAT", description=f"\n{PROG_DESC}")
 
-    # Accept argument for the vendor's email address:
+    # Accept either a single vendor's email address OR a batch file:
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--vendor", dest="Vendor", metavar="Vendor", action="store", type=str,
+        help="Vendor's email address:"
+    )
+    source.add_argument(
+        "--batch", dest="Batch", metavar="Batch File", action="store",
+        type=str, widget="FileChooser",
+        help="CSV / newline separated file of vendor email addresses:"
+    )
+    source.add_argument(
+        "--queue", dest="Queue", metavar="Work Queue", action="store_true",
+        widget="CheckBox",
+        help="Process vendors from the shared MongoDB work queue"
+    )
+    parser.add_argument(
+        "--retry_failed", dest="RetryFailed", metavar="Retry Failed",
+        action="store_true", widget="CheckBox",
+        help="With 'Work Queue', put the vendors that failed back in the "
+             "queue first"
+    )
+    parser.add_argument(
+        "--workers", dest="Workers", metavar="Workers", action="store",
+        type=int, default=DEFAULT_WORKERS, widget="IntegerField",
+        help="Number of parallel browsers to use in batch mode:"
+    )
+    parser.add_argument(
+        "--profile", dest="Profile", metavar="Browser Profile",
+        action="store", choices=[INTERACTIVE, PERFORMANCE], widget="Dropdown",
+        help="'performance' runs headless without images or trackers "
+             "(default: interactive for one vendor, performance for batches)"
+    )
+    parser.add_argument(
+        "--safe_mode", dest="SafeMode", metavar="Safe Mode",
+        action="store_true", widget="CheckBox",
+        help="Add fixed delays between steps (for flaky connections)"
+    )
+    parser.add_argument(
+        "--resume", dest="Resume", metavar="Resume",
+        action="store_true", widget="CheckBox",
+        help="Skip the steps a previous (failed) run already completed "
+             "(always on with 'Work Queue')"
+    )
     parser.add_argument(
-        "Vendor", action="store", type=str, help="Vendor's email address:"
+        "--parallel_steps", dest="ParallelSteps", metavar="Parallel Steps",
+        action="store_true", widget="CheckBox",
+        help="Run independent steps at the same time in a second "
+             "(headless) browser"
+    )
+    parser.add_argument(
+        "--batch_categories", dest="BatchCategories",
+        metavar="Batch Categories", action="store_true", widget="CheckBox",
+        help="Create the whole batch's Coming Soon categories together "
+             "(two saves instead of two per vendor)"
+    )
+    parser.add_argument(
+        "--profile_resources", dest="ProfileResources",
+        metavar="Profile Resources", action="store_true", widget="CheckBox",
+        help="Record the CPU & memory each step uses (in PROFILE_DIR, "
+             "default 'profiles')"
+    )
+    parser.add_argument(
+        "--trace_network", dest="TraceNetwork", metavar="Trace Network",
+        action="store_true", widget="CheckBox",
+        help="Record each step's network waterfall from Chrome's "
+             "performance log (in TRACE_DIR, default 'traces')"
+    )
+    parser.add_argument(
+        "--enqueue", dest="Enqueue", metavar="Enqueue Only",
+        action="store_true", widget="CheckBox",
+        help="Add the batch file's vendors to the shared work queue instead "
+             "of processing them here"
     )
 
     # Grab user's input:
     args = parser.parse_args()
-    email_input = args.Vendor
-
-    # [CHECK] Validation for Vendor Emails:
-    if (not validators.email(email_input)):
-        print("Vendor field may only contain email addresses!")
-        raise ValueError
 
-    print("\nLaunching Approval Process . . .")
-
-    # Initialize our WebDriver + Procedures classes:
-    driver = MyWebDriver().initialize_driver()
-    approve = ApproveVendorProcess(driver)
-
-    # Run all procedures:
-    approve.run_all(email_input)
-    delta = round(time() - start, 3)
-    print(f"\n ---- Completed in {delta} seconds total. ----")
+    # [CASE] Queue mode --> Work through the shared queue with the others:
+    if args.Queue:
+        run_queue(args.Workers, profile=args.Profile,
+                  parallel_steps=args.ParallelSteps, start=start,
+                  profile_resources=args.ProfileResources,
+                  trace_network=args.TraceNetwork,
+                  retry_failed=args.RetryFailed, safe_mode=args.SafeMode)
+        return
+
+    # [CASE] Batch mode --> Fan the vendors out over our workers:
+    if args.Batch:
+        emails = load_vendor_emails(args.Batch)
+        if not emails:
+            print("Batch file doesn't contain any vendor email addresses!")
+            raise ValueError
+
+        # [CASE] Only enqueue them, for the queue workers to pick up:
+        if args.Enqueue:
+            enqueue_batch(emails)
+            return
+
+        run_batch(emails, args.Workers, profile=args.Profile,
+                  safe_mode=args.SafeMode, resume=args.Resume,
+                  parallel_steps=args.ParallelSteps,
+                  batch_categories=args.BatchCategories, start=start,
+                  profile_resources=args.ProfileResources,
+                  trace_network=args.TraceNetwork)
+        return
+
+    # [CASE] Warm start --> Use the browser the GUI already launched (unless
+    #   tracing, which it wasn't launched with -- the GUI then quits it):
+    warm = claim_warm_driver(args.Profile or INTERACTIVE) \
+        if not args.TraceNetwork else None
+    run_vendor(args.Vendor, profile=args.Profile, safe_mode=args.SafeMode,
+               resume=args.Resume, parallel_steps=args.ParallelSteps,
+               start=start, warm=warm,
+               profile_resources=args.ProfileResources,
+               trace_network=args.TraceNetwork)
 
 
 # Run Gooey Program:
 if __name__ == "__main__":
 
+    # [CASE] Warm start & we're the GUI (Gooey reruns us with
+    #   '--ignore-gooey' on Start) --> Launch & log in the browser while the
+    #   form is being filled in:
+    if warm_start_enabled() and "--ignore-gooey" not in sys.argv:
+        WarmDriver().start()
+
     try:
         goopy()
 
@@ -0,0 +1,742 @@
+'''
+mock_backend.py
+------------
+    A self-contained, in-memory replica of the backend pages the approval
+    process drives (login, search, account tabs, Coming Soon & category
+    pages), laid out to match the locators in 'xpaths/approved_paths.py'.
+
+    Run it on its own (from the 'AutoCAT' folder) to poke at it by hand:
+
+        python -m benchmarks.mock_backend --port 8000 --vendors 5
+'''
+import argparse
+import html
+import itertools
+import json
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+
+# The Coming Soon parent category (as in the real backend):
+COMING_SOON_ID = "1845"
+
+# Position the approval process moves each new category to:
+TARGET_POSITION = 15000
+
+_COUNTRIES = ["United States", "Canada", "United Kingdom", "France",
+              "Australia"]
+
+_US_STATES = {"CA": "California", "NY": "New York", "TX": "Texas",
+              "WA": "Washington", "IL": "Illinois"}
+
+# Behaviour shared by every logged-in page:
+#   - A form's submit button loses its 'disabled' class once it's edited, and
+#     submitting is refused while it's disabled.
+#   - Forms marked 'ajax' save in the background, disabling their button once
+#     the server answers. The rest submit normally & the page reloads with
+#     its button disabled.
+#   - A tiny select2 stand-in for the vendor categories field.
+_PAGE_JS = """
+function submitButton(form) {
+    return form.querySelector('button[type=submit]');
+}
+function markDirty(form) {
+    var btn = submitButton(form);
+    if (btn) { btn.classList.remove('disabled'); }
+}
+document.querySelectorAll('form').forEach(function (form) {
+    form.addEventListener('input', function () { markDirty(form); });
+    form.addEventListener('change', function () { markDirty(form); });
+    form.addEventListener('submit', function (e) {
+        var btn = submitButton(form);
+        if (btn && btn.classList.contains('disabled')) {
+            e.preventDefault();
+            return;
+        }
+        if (!form.classList.contains('ajax')) { return; }
+        e.preventDefault();
+        fetch(form.action, {method: 'POST', credentials: 'same-origin',
+                            body: new URLSearchParams(new FormData(form))})
+            .then(function (r) {
+                if (r.ok && btn) { btn.classList.add('disabled'); }
+            });
+    });
+});
+
+var newRows = 0;
+function addCategory() {
+    newRows += 1;
+    var row = document.createElement('tr');
+    row.innerHTML = '<td colspan="3"><input type="text" id="new-n' + newRows +
+        '-name" name="new-n' + newRows + '-name"></td>';
+    document.getElementById('new-rows').appendChild(row);
+}
+function editPosition(view) {
+    var edit = view.nextElementSibling;
+    view.style.display = 'none';
+    edit.style.display = 'block';
+    edit.querySelector('input').focus();
+}
+
+function initSelect2(input) {
+    var select = document.getElementById('categories');
+    var form = input.form, results = null, latest = 0;
+    function close() {
+        if (results) { results.remove(); results = null; }
+    }
+    input.addEventListener('input', function () {
+        var seq = ++latest;
+        fetch('admin.php?target=categories_json&term=' +
+              encodeURIComponent(input.value), {credentials: 'same-origin'})
+            .then(function (r) { return r.json(); })
+            .then(function (items) {
+                if (seq !== latest) { return; }
+                close();
+                if (!items.length) { return; }
+                results = document.createElement('ul');
+                results.className = 'select2-results';
+                items.forEach(function (item, i) {
+                    var li = document.createElement('li');
+                    li.className = 'select2-results__option' +
+                        (i === 0 ? ' select2-results__option--highlighted' : '');
+                    li.textContent = item.name;
+                    li.setAttribute('data-id', item.id);
+                    results.appendChild(li);
+                });
+                document.body.appendChild(results);
+            });
+    });
+    input.addEventListener('keydown', function (e) {
+        if (e.key !== 'Enter') { return; }
+        e.preventDefault();
+        var option = results && results.querySelector(
+            '.select2-results__option--highlighted');
+        if (!option) { return; }
+        var choice = document.createElement('option');
+        choice.value = option.getAttribute('data-id');
+        choice.textContent = option.textContent;
+        choice.selected = true;
+        select.appendChild(choice);
+        var chip = document.createElement('li');
+        chip.className = 'select2-selection__choice';
+        chip.textContent = option.textContent;
+        input.parentNode.parentNode.insertBefore(chip, input.parentNode);
+        input.value = '';
+        latest++;
+        close();
+        markDirty(form);
+    });
+}
+document.querySelectorAll('.select2-search__field').forEach(initSelect2);
+"""
+
+
+def _e(value) -> str:
+    '''Escapes a value for use in HTML text or attributes.'''
+    return html.escape(str(value if value is not None else ""), quote=True)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def _options(choices, selected) -> str:
+    '''Renders <option>s from (value, text) pairs.'''
+    return "".join(
+        f"<option value='{_e(value)}'"
+        f"{' selected' if value == selected else ''}>{_e(text)}</option>"
+        for value, text in choices)
+
+
+class MockBackend:
+    '''An in-memory backend served over HTTP on a background thread.
+
+    Attributes
+    ----------
+        host : str, optional
+            The interface to listen on. (default "127.0.0.1")
+
+        port : int, optional
+            The port to listen on, 0 picks a free one. (default 0)
+
+        latency : float, optional
+            Seconds added to every response. (default 0)
+
+        save_latency : float, optional
+            Extra seconds added to every form submission. (default 0)
+
+    Methods
+    -------
+        start():
+            Starts serving in the background.
+
+        stop():
+            Shuts the server down.
+
+        add_vendor(email, brand_name, ...):
+            Adds a vendor, returning their profile id.
+
+        seed_vendors(count):
+            Adds `count` sample vendors, returning their emails.
+
+        verify(email):
+            Returns what's wrong (if anything) with a vendor's category build.
+    '''
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, save_latency: float = 0.0):
+        self._latency = latency
+        self._save_latency = save_latency
+        self._lock = threading.Lock()
+        self._sessions: set = set()
+        self._vendors: dict = {}
+        self._categories: dict = {}
+        self._ids = itertools.count(5000)
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.backend = self
+        self._thread = None
+
+        # A few existing Coming Soon categories:
+        for position, name in enumerate(["Spring Preview", "Holiday Shop"]):
+            self._add_category(name, position=(position + 1) * 10)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def landing_url(self) -> str:
+        return f"{self.base_url}/admin.php"
+
+    @property
+    def login_url(self) -> str:
+        return f"{self.landing_url}?target=login"
+
+    @property
+    def search_url(self) -> str:
+        '''A VENDOR_SEARCH_URL template for this backend.'''
+        return "{root}?target=profile_list&pattern={email}"
+
+    @property
+    def latency(self) -> float:
+        return self._latency
+
+    @property
+    def save_latency(self) -> float:
+        return self._save_latency
+
+
+    def start(self) -> "MockBackend":
+        '''Starts serving in the background.'''
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="mock-backend", daemon=True)
+        self._thread.start()
+        return self
+
+
+    def stop(self) -> None:
+        '''Shuts the server down.'''
+        self._server.shutdown()
+        self._server.server_close()
+
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+    def _add_category(self, name: str, position: int = 0) -> str:
+        category_id = str(next(self._ids))
+        self._categories[category_id] = {
+            "id": category_id, "name": name, "position": position,
+            "parent": COMING_SOON_ID, "clean_url": _slug(name),
+            "description": "", "show_search": False,
+        }
+        return category_id
+
+
+    def add_vendor(self, email: str, brand_name: str,
+                   country: str = "United States", state: str = "CA",
+                   city: str = "Los Angeles", website: str = "",
+                   description: str = "", instagram: str = "") -> str:
+        '''Adds a vendor, returning their profile id. For the U.S. `state`
+        is an abbreviation, elsewhere it's free text.'''
+        with self._lock:
+            profile_id = str(next(self._ids))
+            self._vendors[profile_id] = {
+                "profile_id": profile_id, "email": email.lower(),
+                "brand_name": brand_name, "country": country, "state": state,
+                "city": city, "website": website, "description": description,
+                "instagram": instagram, "questions_email": "", "location": "",
+                "trusted": "0", "minimum_order": "", "page_url": "",
+                "categories": [],
+            }
+            return profile_id
+
+
+    def seed_vendors(self, count: int) -> list:
+        '''Adds `count` sample vendors, returning their emails.'''
+        emails = []
+        for i in range(1, count + 1):
+            country = _COUNTRIES[i % len(_COUNTRIES)]
+            if country == "United States":
+                state = list(_US_STATES)[i % len(_US_STATES)]
+            else:
+                state = f"Province {i}"
+            email = f"vendor{i}@example.com"
+            self.add_vendor(
+                email, f"Brand {i}", country=country, state=state,
+                city=f"City {i}", website=f"WWW.Brand{i}.example.com",
+                description=f"Brand {i} makes lovely things.",
+                instagram=f"@Brand{i}" if i % 2 else "")
+            emails.append(email)
+        return emails
+
+
+    def find_vendor(self, email: str) -> dict:
+        '''Returns a copy of the vendor with the given email (or None).'''
+        with self._lock:
+            for vendor in self._vendors.values():
+                if vendor["email"] == email.strip().lower():
+                    return dict(vendor)
+        return None
+
+
+    def verify(self, email: str) -> list:
+        '''Returns what's wrong (if anything) with the vendor's category
+        build.
+
+        Returns
+        -------
+            list [str]
+                A description of every problem found -- empty on success.
+        '''
+        vendor = self.find_vendor(email)
+        if vendor is None:
+            return ["no such vendor"]
+
+        problems = []
+        with self._lock:
+            matches = [c for c in self._categories.values()
+                       if c["name"] == vendor["brand_name"]]
+        if len(matches) != 1:
+            return problems + [f"{len(matches)} categories named "
+                               f"'{vendor['brand_name']}'"]
+        category = matches[0]
+
+        if vendor["questions_email"] != vendor["email"]:
+            problems.append("product questions e-mail not set")
+        if vendor["trusted"] != "1":
+            problems.append("not marked as trusted")
+        if not vendor["location"]:
+            problems.append("location not set")
+        if category["id"] not in vendor["categories"]:
+            problems.append("category not added to the vendor")
+        if category["position"] != TARGET_POSITION:
+            problems.append(f"position is {category['position']}")
+        if not category["clean_url"].endswith("-wholesale"):
+            problems.append("clean URL doesn't end in '-wholesale'")
+        if not category["show_search"]:
+            problems.append("search box not shown")
+        if vendor["description"] and \
+                category["description"] != vendor["description"]:
+            problems.append("description not copied")
+        return problems
+
+
+    # * * * * * Pages * * * * *
+
+    def _layout(self, body: str, crumb: str = "Dashboard",
+                logged_in: bool = True) -> str:
+        '''Wraps a page's body in the backend's layout, putting it where the
+        absolute xpaths expect (/html/body/div[2]/div[2]/div[2]/div[1]/div/
+        div[2]).'''
+        header = ""
+        if logged_in:
+            header = """
+            <div id="header">
+              <div class="logo">Admin</div>
+              <div class="menu"></div>
+              <div class="quick-search"><div>
+                <form method="get" action="admin.php">
+                  <input type="hidden" name="target" value="search">
+                  <input type="hidden" name="mode" value="products">
+                  <div>
+                    <div class="dropdown">
+                      <button type="button" onclick="this.nextElementSibling.style.display='block'">Search in</button>
+                      <ul style="display:none">
+                        <li><a href="#" onclick="return false">Products</a></li>
+                        <li><a href="#" onclick="this.closest('form').mode.value='users'; this.closest('ul').style.display='none'; this.closest('form').substring.focus(); return false">Users</a></li>
+                      </ul>
+                    </div>
+                    <input type="text" name="substring">
+                  </div>
+                </form>
+              </div></div>
+            </div>"""
+        return f"""<!DOCTYPE html>
+<html><head><title>Admin</title></head>
+<body>
+{header or '<div id="header"></div>'}
+<div id="page">
+  <div id="sidebar"></div>
+  <div id="main">
+    <div id="breadcrumb"><ul><li><span>{_e(crumb)}</span></li></ul></div>
+    <div id="content"><div><div>
+      <div class="tabs"></div>
+      <div class="tab-body">{body}</div>
+    </div></div></div>
+  </div>
+</div>
+<script>{_PAGE_JS}</script>
+</body></html>"""
+
+
+    def _login_page(self) -> str:
+        return self._layout("""
+            <form id="login_form" method="post" action="admin.php?target=login">
+              <table>
+                <tbody>
+                  <tr><td><input type="text" name="login"></td></tr>
+                  <tr><td><input type="password" name="password"></td></tr>
+                </tbody>
+                <tbody>
+                  <tr><td><button type="submit">Log in</button></td></tr>
+                </tbody>
+              </table>
+            </form>""", crumb="Log in", logged_in=False)
+
+
+    def _vendor_crumb(self, vendor: dict) -> str:
+        return f"{vendor['email']} ({vendor['brand_name']})"
+
+
+    def _profile_page(self, vendor: dict) -> str:
+        return self._layout(f"""
+            <div class="account-details">
+              <p>Profile #{_e(vendor['profile_id'])}</p>
+            </div>""", crumb=self._vendor_crumb(vendor))
+
+
+    def _company_address_page(self, vendor: dict) -> str:
+        us = vendor["country"] == "United States"
+        return self._layout(f"""
+            <form class="ajax" method="post"
+                  action="admin.php?target=companyAddress&profile_id={_e(vendor['profile_id'])}">
+              <input type="text" id="product-questions-admin-email"
+                     name="questions_email" value="{_e(vendor['questions_email'])}">
+              <select id="location-country" name="country">
+                {_options([(c, c) for c in _COUNTRIES], vendor['country'])}
+              </select>
+              <select id="location-state" name="state"
+                      data-value="{_e(vendor['state'] if us else '')}">
+                {_options(_US_STATES.items(), vendor['state'] if us else None)}
+              </select>
+              <input type="text" id="location-custom-state" name="custom_state"
+                     value="{_e('' if us else vendor['state'])}">
+              <input type="text" id="location-city" name="city"
+                     value="{_e(vendor['city'])}">
+              <button type="submit" class="btn disabled">Save</button>
+            </form>""", crumb=self._vendor_crumb(vendor))
+
+
+    def _vendor_page(self, vendor: dict) -> str:
+        with self._lock:
+            chosen = [self._categories[c] for c in vendor["categories"]
+                      if c in self._categories]
+        chosen_options = "".join(
+            f"<option value='{_e(c['id'])}' selected>{_e(c['name'])}</option>"
+            for c in chosen)
+        chips = "".join(
+            f"<li class='select2-selection__choice'>{_e(c['name'])}</li>"
+            for c in chosen)
+        return self._layout(f"""
+            <form class="ajax" method="post"
+                  action="admin.php?target=vendor&profile_id={_e(vendor['profile_id'])}">
+              <div>
+                <fieldset>
+                  <div><ul>
+                    <li><select id="istrustedvendor" name="trusted">
+                      {_options([("0", "No"), ("1", "Yes")], vendor['trusted'])}
+                    </select></li>
+                    <li><input type="text" id="vendorlocation" name="location"
+                               value="{_e(vendor['location'])}"></li>
+                    <li><input type="text" id="companyfield-18" name="website"
+                               value="{_e(vendor['website'])}"></li>
+                    <li><textarea id="companyfield-32" name="description">{_e(vendor['description'])}</textarea></li>
+                    <li><input type="text" id="companyfield-33" name="instagram"
+                               value="{_e(vendor['instagram'])}"></li>
+                    <li><select id="companyfield-29" name="minimum_order">
+                      {_options([("", "No minimum"), ("50", "$50"),
+                                 ("100", "$100")], vendor['minimum_order'])}
+                    </select></li>
+                    <li><input type="text" id="vendorpageurl" name="page_url"
+                               value="{_e(vendor['page_url'])}"></li>
+                    <li>
+                      <div><label for="categories">Categories</label></div>
+                      <div><div>
+                        <select id="categories" name="categories" multiple
+                                style="display:none">{chosen_options}</select>
+                        <span class="select2"><span class="selection">
+                          <span class="select2-selection"><span>
+                            <ul>{chips}<li><input type="text"
+                              class="select2-search__field"></li></ul>
+                          </span></span>
+                          <span class="dropdown-wrapper"></span>
+                        </span></span>
+                      </div></div>
+                    </li>
+                  </ul></div>
+                </fieldset>
+                <div class="buttons">
+                  <button type="submit" class="btn disabled">Update</button>
+                </div>
+              </div>
+            </form>""", crumb=self._vendor_crumb(vendor))
+
+
+    def _coming_soon_page(self) -> str:
+        with self._lock:
+            rows = sorted(
+                (c for c in self._categories.values()
+                 if c["parent"] == COMING_SOON_ID),
+                key=lambda c: (c["position"], -int(c["id"])))
+        body_rows = "".join(f"""
+            <tr>
+              <td><div><div class="pos"><div class="inline-edit">
+                <div class="view" onclick="editPosition(this)">{c['position']}</div>
+                <div class="edit" style="display:none"><div><div><div><span>
+                  <input type="text" name="pos-{_e(c['id'])}" value=""
+                         placeholder="{c['position']}">
+                </span></div></div></div></div>
+              </div></div></div></td>
+              <td>{_e(c['id'])}</td>
+              <td><div><div><span>
+                <a href="admin.php?target=category&amp;id={_e(c['id'])}"
+                   title="{_e(c['name'])}">{_e(c['name'])}</a>
+              </span></div></div></td>
+            </tr>""" for c in rows)
+        return self._layout(f"""
+            <div><form method="post"
+                       action="admin.php?target=categories&amp;id={COMING_SOON_ID}">
+              <div>
+                <div class="title">Coming Soon</div>
+                <div class="toolbar"><div>
+                  <button type="button" onclick="addCategory()">New category</button>
+                </div></div>
+                <div class="list"><table>
+                  <tbody id="new-rows"></tbody>
+                  <tbody>{body_rows}</tbody>
+                </table></div>
+              </div>
+              <div><div><div>
+                <button type="submit" class="btn disabled">Save changes</button>
+              </div></div></div>
+            </form></div>""", crumb="Coming Soon")
+
+
+    def _category_page(self, category: dict) -> str:
+        return self._layout(f"""
+            <form method="post"
+                  action="admin.php?target=category&amp;id={_e(category['id'])}">
+              <div>
+                <fieldset>
+                  <div><textarea id="description" name="description">{_e(category['description'])}</textarea></div>
+                  <div><input type="text" id="cleanurl" name="cleanurl"
+                              value="{_e(category['clean_url'])}"></div>
+                  <div><input type="checkbox" id="showsearchbox"
+                              name="showsearchbox" value="1"
+                              {'checked' if category['show_search'] else ''}></div>
+                </fieldset>
+                <div><div><div>
+                  <button type="submit" class="btn disabled">Update</button>
+                </div></div></div>
+              </div>
+            </form>""", crumb=category["name"])
+
+
+    # * * * * * Requests * * * * *
+
+    def handle_get(self, query: dict, session: str):
+        '''Returns (status, headers, body) for a GET request.'''
+        target = query.get("target", "")
+        if target == "login":
+            return 200, {}, self._login_page()
+        if session not in self._sessions:
+            return 302, {"Location": "admin.php?target=login"}, ""
+
+        if target == "":
+            return 200, {}, self._layout("<p>Welcome back!</p>")
+
+        if target in ("search", "profile_list"):
+            term = query.get("substring") or query.get("pattern") or ""
+            if target == "search" and query.get("mode") != "users":
+                return 200, {}, self._layout("<p>No products found.</p>")
+            vendor = self.find_vendor(term)
+            if vendor is None:
+                return 200, {}, self._layout("<p>No users found.</p>")
+            location = "admin.php?" + urlencode(
+                {"target": "profile", "profile_id": vendor["profile_id"]})
+            return 302, {"Location": location}, ""
+
+        if target == "categories_json":
+            term = query.get("term", "").strip().lower()
+            with self._lock:
+                matches = [c for c in self._categories.values()
+                           if term and term in c["name"].lower()]
+            matches.sort(key=lambda c: (c["name"].lower() != term,
+                                        len(c["name"]), c["name"]))
+            items = [{"id": c["id"], "name": c["name"]} for c in matches[:10]]
+            return 200, {"Content-Type": "application/json"}, \
+                json.dumps(items)
+
+        if target == "categories" and query.get("id") == COMING_SOON_ID:
+            return 200, {}, self._coming_soon_page()
+
+        if target == "category":
+            with self._lock:
+                category = self._categories.get(query.get("id"))
+            if category is not None:
+                return 200, {}, self._category_page(category)
+
+        vendor = self._vendors.get(query.get("profile_id"))
+        if vendor is not None:
+            pages = {"profile": self._profile_page,
+                     "companyAddress": self._company_address_page,
+                     "vendor": self._vendor_page}
+            if target in pages:
+                return 200, {}, pages[target](vendor)
+
+        return 404, {}, self._layout("<p>Page not found.</p>")
+
+
+    def handle_post(self, query: dict, form: dict, session: str):
+        '''Returns (status, headers, body) for a POST request.'''
+        target = query.get("target", "")
+        first = {key: values[0] for key, values in form.items()}
+
+        if target == "login":
+            token = secrets.token_hex(16)
+            with self._lock:
+                self._sessions.add(token)
+            return 303, {"Location": "/admin.php",
+                         "Set-Cookie": f"xid={token}; Path=/; HttpOnly"}, ""
+        if session not in self._sessions:
+            return 403, {}, ""
+
+        time.sleep(self._save_latency)
+        back = {"Location": "admin.php?" + urlencode(query)}
+
+        if target == "categories" and query.get("id") == COMING_SOON_ID:
+            with self._lock:
+                for key, value in first.items():
+                    if re.fullmatch(r"new-n\d+-name", key) and value.strip():
+                        self._add_category(value.strip())
+                    elif key.startswith("pos-") and value.strip():
+                        category = self._categories.get(key[4:])
+                        if category is not None:
+                            category["position"] = int(value)
+            return 303, back, ""
+
+        if target == "category":
+            with self._lock:
+                category = self._categories.get(query.get("id"))
+                if category is None:
+                    return 404, {}, ""
+                category["description"] = first.get("description", "")
+                category["clean_url"] = first.get("cleanurl", "")
+                category["show_search"] = "showsearchbox" in first
+            return 303, back, ""
+
+        with self._lock:
+            vendor = self._vendors.get(query.get("profile_id"))
+            if vendor is None:
+                return 404, {}, ""
+            if target == "companyAddress":
+                vendor["questions_email"] = first.get("questions_email", "")
+            elif target == "vendor":
+                for field in ("trusted", "location", "website", "description",
+                              "instagram", "minimum_order", "page_url"):
+                    vendor[field] = first.get(field, "")
+                vendor["categories"] = form.get("categories", [])
+            else:
+                return 404, {}, ""
+        return 200, {"Content-Type": "application/json"}, '{"ok": true}'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    '''Hands requests to the server's MockBackend.'''
+
+    def log_message(self, format, *args):
+        pass
+
+    def _session(self) -> str:
+        for cookie in self.headers.get("Cookie", "").split(";"):
+            name, _, value = cookie.strip().partition("=")
+            if name == "xid":
+                return value
+        return ""
+
+    def _query(self) -> dict:
+        query = parse_qs(urlsplit(self.path).query)
+        return {key: values[0] for key, values in query.items()}
+
+    def _respond(self, status: int, headers: dict, body: str) -> None:
+        time.sleep(self.server.backend.latency)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type",
+                         headers.pop("Content-Type", "text/html; charset=utf-8"))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if urlsplit(self.path).path != "/admin.php":
+            return self._respond(404, {}, "")
+        self._respond(*self.server.backend.handle_get(self._query(),
+                                                      self._session()))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8"),
+                        keep_blank_values=True)
+        self._respond(*self.server.backend.handle_post(
+            self._query(), form, self._session()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the mock backend.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--vendors", type=int, default=5,
+                        help="Number of sample vendors to add")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds added to every response")
+    parser.add_argument("--save_latency", type=float, default=0.0,
+                        help="Extra seconds added to every form submission")
+    args = parser.parse_args()
+
+    backend = MockBackend(port=args.port, latency=args.latency,
+                          save_latency=args.save_latency)
+    emails = backend.seed_vendors(args.vendors)
+    print(f"BACKEND_LOGIN_URL={backend.login_url}")
+    print(f"BACKEND_LANDING_URL={backend.landing_url}")
+    print(f"Vendors: {', '.join(emails)}")
+    try:
+        backend._server.serve_forever()
+    except KeyboardInterrupt:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()
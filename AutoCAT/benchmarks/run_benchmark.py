@@ -0,0 +1,239 @@
+'''
+run_benchmark.py
+------------
+    Runs the approval process end-to-end against the local mock backend
+    under headless Chrome, reporting vendors/minute and per-step timings.
+
+    From the 'AutoCAT' folder:
+
+        python -m benchmarks.run_benchmark --vendors 10 --workers 2
+
+    Results are written as JSON (see --output) so runs can be compared for
+    regressions.
+'''
+import argparse
+import json
+import os
+import sys
+import tempfile
+from time import time
+
+# Run from a scratch folder (so the vendor index, checkpoints & cookie cache
+#   start empty), but keep importing from the 'AutoCAT' folder:
+AUTOCAT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if AUTOCAT_DIR not in sys.path:
+    sys.path.insert(0, AUTOCAT_DIR)
+
+from benchmarks.mock_backend import MockBackend
+from pages.locators import get_registry
+from procedures.approve_vendor import ApproveVendorProcess
+from procedures.batch import BatchApproveProcess, VendorResult
+from utils.metrics import MetricsCollector
+from utils.profiler import ResourceProfiler
+from utils.tracing import NetworkTracer
+from utils.webdriver import MyWebDriver, PERFORMANCE
+
+
+SINGLE = "single"
+BATCH = "batch"
+
+DEFAULT_OUTPUT = "benchmark_results.json"
+
+
+class BenchmarkProcess(ApproveVendorProcess):
+    '''The approval process without the MongoDB step.'''
+    STEPS = tuple(step for step in ApproveVendorProcess.STEPS
+                  if step != "save_stats_to_db")
+
+
+def _configure(backend: MockBackend, search_url: bool,
+               http_reads: bool) -> None:
+    '''Points the approval process at the mock backend.'''
+    os.environ.update({
+        "HTTP_READS": "1" if http_reads else "0",
+        "BACKEND_LOGIN_URL": backend.login_url,
+        "BACKEND_LANDING_URL": backend.landing_url,
+        "ADMIN_EMAIL": "admin@example.com",
+        "ADMIN_PASSWORD": "benchmark",
+        "VENDOR_SEARCH_URL": backend.search_url if search_url else "",
+    })
+
+
+def run_single(emails: list, process_class, profile: str,
+               step_hooks: list, parallel_steps: bool,
+               trace: bool = False) -> list:
+    '''Runs every vendor one after another on a single driver (plus an aux
+    driver, with parallel steps).'''
+    new_driver = MyWebDriver(profile=profile, trace=trace).initialize_driver
+    driver = new_driver()
+    aux_driver = new_driver() if parallel_steps else None
+    results = []
+    try:
+        for i, email in enumerate(emails):
+            start = time()
+            try:
+                process_class(driver, step_hooks=step_hooks,
+                              aux_driver=aux_driver)\
+                    .run_all(email, login=(i == 0))
+                results.append(VendorResult(email, True, time() - start, None))
+            except Exception as err:
+                results.append(
+                    VendorResult(email, False, time() - start, str(err)))
+            # Start the next vendor from a single tab:
+            for handle in driver.window_handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+    finally:
+        driver.quit()
+        if aux_driver is not None:
+            aux_driver.quit()
+    return results
+
+
+def run_batch(emails: list, process_class, profile: str,
+              step_hooks: list, workers: int,
+              parallel_steps: bool, batch_categories: bool,
+              trace: bool = False) -> list:
+    '''Runs the vendors over a pool of parallel workers.'''
+    batch = BatchApproveProcess(workers=workers,
+                                driver_factory=lambda: MyWebDriver(
+                                    profile=profile, trace=trace)
+                                .initialize_driver(),
+                                skip_done=False, step_hooks=step_hooks,
+                                process_class=process_class,
+                                parallel_steps=parallel_steps,
+                                batch_categories=batch_categories)
+    return batch.run(emails)
+
+
+def benchmark(mode: str, args) -> dict:
+    '''Runs one benchmark mode against a freshly seeded mock backend.'''
+    process_class = ApproveVendorProcess if args.with_db else \
+        BenchmarkProcess
+    metrics = MetricsCollector()
+    # (Made absolute, as we run from a scratch folder)
+    profiler = ResourceProfiler(os.path.abspath(
+        os.path.join(args.profile_resources, mode))) \
+        if args.profile_resources else None
+    tracer = NetworkTracer(os.path.abspath(
+        os.path.join(args.trace_network, mode))) \
+        if args.trace_network else None
+    step_hooks = [hook for hook in (metrics, profiler, tracer) if hook]
+    trace = tracer is not None
+
+    with MockBackend(latency=args.latency,
+                     save_latency=args.save_latency) as backend, \
+            tempfile.TemporaryDirectory(prefix="autocat-bench-") as workdir:
+        emails = backend.seed_vendors(args.vendors)
+        _configure(backend, args.search_url, args.http_reads)
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            print(f"\n ==== {mode} ({len(emails)} vendors) ====")
+            start = time()
+            if mode == SINGLE:
+                results = run_single(emails, process_class, args.profile,
+                                     step_hooks, args.parallel_steps, trace)
+            else:
+                results = run_batch(emails, process_class, args.profile,
+                                    step_hooks, args.workers,
+                                    args.parallel_steps,
+                                    args.batch_categories, trace)
+            elapsed = time() - start
+        finally:
+            os.chdir(cwd)
+
+        problems = {r.email: backend.verify(r.email)
+                    for r in results if r.success}
+
+    BatchApproveProcess.print_summary(results, elapsed)
+    for email, issues in problems.items():
+        if issues:
+            print(f"UNVERIFIED {email}: {'; '.join(issues)}")
+    metrics.print_summary()
+    get_registry().print_report()
+    for reporter in (profiler, tracer):
+        if reporter is not None:
+            reporter.print_summary()
+            reporter.export()
+
+    verified = sum(1 for issues in problems.values() if not issues)
+    return {
+        "vendors": len(emails),
+        "workers": 1 if mode == SINGLE else args.workers,
+        "succeeded": sum(1 for r in results if r.success),
+        "verified": verified,
+        "elapsed": elapsed,
+        "vendors_per_minute": verified / elapsed * 60 if elapsed else 0.0,
+        "failures": {r.email: r.error for r in results if not r.success},
+        "unverified": {e: issues for e, issues in problems.items() if issues},
+        "steps": metrics.summary(),
+        "locator_fallbacks": get_registry().report(),
+        "resources": profiler.summary() if profiler else None,
+        "network": tracer.summary() if tracer else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the approval process against a mock backend.")
+    parser.add_argument("--vendors", type=int, default=5,
+                        help="Vendors to process per mode")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="Parallel workers in batch mode")
+    parser.add_argument("--mode", choices=[SINGLE, BATCH, "both"],
+                        default="both")
+    parser.add_argument("--profile", default=PERFORMANCE,
+                        help="Driver profile to run Chrome with")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Seconds added to every mock response")
+    parser.add_argument("--save_latency", type=float, default=0.2,
+                        help="Extra seconds added to every form submission")
+    parser.add_argument("--search_url", action="store_true",
+                        help="Look vendors up through VENDOR_SEARCH_URL")
+    parser.add_argument("--http_reads", action="store_true",
+                        help="Read the account tabs over HTTP (HTTP_READS)")
+    parser.add_argument("--parallel_steps", action="store_true",
+                        help="Overlap independent steps on a second driver")
+    parser.add_argument("--batch_categories", action="store_true",
+                        help="Create the batch's categories together")
+    parser.add_argument("--with_db", action="store_true",
+                        help="Also save each vendor to MongoDB (MONGO_HOST)")
+    parser.add_argument("--profile_resources", nargs="?", const="profiles",
+                        metavar="DIR",
+                        help="Profile each step's CPU & memory into DIR "
+                             "(default 'profiles')")
+    parser.add_argument("--trace_network", nargs="?", const="traces",
+                        metavar="DIR",
+                        help="Write each step's network waterfall into DIR "
+                             "(default 'traces')")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT,
+                        help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    modes = [SINGLE, BATCH] if args.mode == "both" else [args.mode]
+    report = {
+        "started_at": time(),
+        "settings": {"latency": args.latency,
+                     "save_latency": args.save_latency,
+                     "profile": args.profile,
+                     "search_url": args.search_url,
+                     "http_reads": args.http_reads,
+                     "parallel_steps": args.parallel_steps,
+                     "batch_categories": args.batch_categories},
+        "results": {mode: benchmark(mode, args) for mode in modes},
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print()
+    for mode, result in report["results"].items():
+        print(f"{mode}: {result['verified']}/{result['vendors']} vendors, "
+              f"{round(result['vendors_per_minute'], 2)} vendors/min")
+    print(f"Results written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+cli.py
+------
+    A command line entry point for running AutoCAT without the Gooey GUI (ex.
+    from cron or another process). Only the standard library is imported up
+    front -- the procedures (Selenium, MongoDB, ...) are imported once the
+    arguments check out, and never Gooey / wxPython.
+
+        python cli.py vendor@example.com
+        python cli.py --file vendors.csv --workers 3
+        some_command | python cli.py -
+        python cli.py --daemon --watch inbox --workers 2
+
+    Exits with 1 if anything failed.
+"""
+import argparse
+import sys
+from time import perf_counter, time
+
+# When we started (for the startup time report):
+_STARTED = perf_counter()
+
+# Stands in for the vendor emails (or a file) to read them from stdin:
+STDIN = "-"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    '''Returns the parser for our command line arguments.'''
+    parser = argparse.ArgumentParser(
+        prog="autocat",
+        description="Runs the Boutsy category build for one or more vendors "
+                    "without the GUI.")
+
+    parser.add_argument(
+        "emails", nargs="*", metavar="EMAIL",
+        help="Vendor email address(es), or '-' to read them from stdin")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--file", metavar="PATH",
+        help="CSV / newline separated file of vendor email addresses "
+             "('-' for stdin)")
+    source.add_argument(
+        "--queue", action="store_true",
+        help="Process vendors from the shared MongoDB work queue")
+    source.add_argument(
+        "--watch", metavar="DIR",
+        help="With --daemon, process batch files dropped into this folder")
+    parser.add_argument(
+        "--retry_failed", action="store_true",
+        help="With --queue, put the vendors that failed back in the queue "
+             "first")
+    parser.add_argument(
+        "--enqueue", action="store_true",
+        help="Add the vendors to the shared work queue instead of "
+             "processing them here")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Number of parallel browsers for batches (default 2)")
+    parser.add_argument(
+        "--profile", default=None,
+        help="Browser profile, 'interactive' or 'performance' (default "
+             "performance)")
+    parser.add_argument(
+        "--safe_mode", action="store_true",
+        help="Add fixed delays between steps (for flaky connections)")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Skip the steps a previous (failed) run already completed "
+             "(--queue & --daemon runs always do)")
+    parser.add_argument(
+        "--parallel_steps", action="store_true",
+        help="Run independent steps at the same time in a second "
+             "(headless) browser")
+    parser.add_argument(
+        "--batch_categories", action="store_true",
+        help="Create a batch's Coming Soon categories together")
+    parser.add_argument(
+        "--profile_resources", action="store_true",
+        help="Record the CPU & memory of Chrome, chromedriver & Python per "
+             "step (in PROFILE_DIR, default 'profiles')")
+    parser.add_argument(
+        "--trace_network", action="store_true",
+        help="Record each step's network waterfall from Chrome's performance "
+             "log (in TRACE_DIR, default 'traces')")
+
+    daemon = parser.add_argument_group(
+        "daemon", "Keep running on warm browsers, recycling any that grow "
+                  "past these limits between vendors (0 for no limit)")
+    daemon.add_argument(
+        "--daemon", action="store_true",
+        help="Keep processing --queue / --watch vendors until stopped")
+    daemon.add_argument(
+        "--max_rss_mb", type=float, default=None,
+        help="Memory per browser, in MB (default DRIVER_MAX_RSS_MB or 1536)")
+    daemon.add_argument(
+        "--max_page_loads", type=int, default=None,
+        help="Page loads per browser (default DRIVER_MAX_PAGE_LOADS or 400)")
+    daemon.add_argument(
+        "--max_vendors", type=int, default=None,
+        help="Vendors per browser (default DRIVER_MAX_VENDORS or none)")
+    return parser
+
+
+def _check_args(parser: argparse.ArgumentParser, args) -> None:
+    '''Rejects argument combinations we can't run (before importing
+    anything heavy).'''
+    if args.retry_failed and not args.queue:
+        parser.error("--retry_failed needs --queue")
+    if args.daemon:
+        if not (args.queue or args.watch) or args.emails or args.enqueue:
+            parser.error("--daemon takes either --queue or --watch (and no "
+                         "vendor emails)")
+        return
+    if args.watch:
+        parser.error("--watch needs --daemon")
+    if args.queue and (args.emails or args.enqueue):
+        parser.error("--queue can't be combined with vendor emails or "
+                     "--enqueue")
+    if args.file and args.emails:
+        parser.error("give either vendor emails or --file, not both")
+    if not (args.queue or args.file or args.emails):
+        # [CASE] Nothing given, but something is piped in -> Read it:
+        if sys.stdin.isatty():
+            parser.error("give vendor email(s), --file or --queue")
+        args.emails = [STDIN]
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+
+def _read_emails(args, parse_vendor_emails, load_vendor_emails) -> list:
+    '''Returns the vendor emails from the command line, file or stdin.'''
+    if args.file == STDIN or args.emails == [STDIN]:
+        return parse_vendor_emails(sys.stdin)
+    if args.file:
+        return load_vendor_emails(args.file)
+    return parse_vendor_emails(args.emails)
+
+
+def main(argv: list = None) -> int:
+    '''Runs AutoCAT from the command line, returning the exit code.'''
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    _check_args(parser, args)
+    parsed = perf_counter()
+
+    # Only now pay for Selenium, MongoDB & co.:
+    from procedures import runner
+    from procedures.batch import (DEFAULT_WORKERS, load_vendor_emails,
+                                  parse_vendor_emails)
+    from utils.webdriver import PERFORMANCE, PROFILES
+    imported = perf_counter()
+
+    print(f"Started in {round(imported - _STARTED, 3)} sec. "
+          f"({round(imported - parsed, 3)} sec. importing the procedures)")
+
+    if args.profile is not None and args.profile not in PROFILES:
+        parser.error(f"unknown profile '{args.profile}' (choose from "
+                     f"{', '.join(PROFILES)})")
+    profile = args.profile or PERFORMANCE
+    workers = args.workers or DEFAULT_WORKERS
+    start = time()
+
+    # [CASE] Daemon mode --> Keep going until we're stopped:
+    if args.daemon:
+        from procedures.daemon import ApprovalDaemon, MAX_REPORTED_STEPS
+        from utils.resources import policy_from_env
+        policy = policy_from_env(max_rss_mb=args.max_rss_mb,
+                                 max_page_loads=args.max_page_loads,
+                                 max_vendors=args.max_vendors)
+        # (No metrics collector -- its samples would grow without end. The
+        #   reporters keep only the latest steps for their summaries)
+        reporters = runner.step_hooks(args.profile_resources,
+                                      args.trace_network,
+                                      max_finished=MAX_REPORTED_STEPS)[1:]
+        results = ApprovalDaemon(
+            workers=args.workers or 1, watch_dir=args.watch,
+            driver_factory=runner.driver_factory(profile,
+                                                 args.trace_network),
+            recycle_policy=policy, step_hooks=reporters,
+            retry_failed=args.retry_failed, safe_mode=args.safe_mode,
+            parallel_steps=args.parallel_steps).run()
+        for reporter in reporters:
+            # (Each vendor's file was written when their run ended, so this
+            #   only adds those stopped mid-run & the summary)
+            reporter.print_summary()
+            reporter.export()
+        return 0 if all(r.success for r in results) else 1
+
+    # [CASE] Queue mode --> Work through the shared queue with the others:
+    if args.queue:
+        results = runner.run_queue(workers, profile=profile,
+                                   parallel_steps=args.parallel_steps,
+                                   start=start,
+                                   profile_resources=args.profile_resources,
+                                   trace_network=args.trace_network,
+                                   retry_failed=args.retry_failed,
+                                   safe_mode=args.safe_mode)
+        return 0 if all(r.success for r in results) else 1
+
+    emails = _read_emails(args, parse_vendor_emails, load_vendor_emails)
+    if not emails:
+        print("No vendor email addresses to process!")
+        return 1
+
+    # [CASE] Only enqueue them, for the queue workers to pick up:
+    if args.enqueue:
+        runner.enqueue_batch(emails)
+        return 0
+
+    # [CASE] A single vendor --> No need for a worker pool:
+    if len(emails) == 1 and not args.batch_categories:
+        runner.run_vendor(emails[0], profile=profile,
+                          safe_mode=args.safe_mode, resume=args.resume,
+                          parallel_steps=args.parallel_steps, start=start,
+                          profile_resources=args.profile_resources,
+                          trace_network=args.trace_network)
+        return 0
+
+    results = runner.run_batch(emails, workers, profile=profile,
+                               safe_mode=args.safe_mode, resume=args.resume,
+                               parallel_steps=args.parallel_steps,
+                               batch_categories=args.batch_categories,
+                               start=start,
+                               profile_resources=args.profile_resources,
+                               trace_network=args.trace_network)
+    return 0 if all(r.success for r in results) else 1
+
+
+if __name__ == "__main__":
+
+    try:
+        sys.exit(main())
+
+    except KeyboardInterrupt:
+        print("CANCELLED!")
+        sys.exit(1)
+
+    except ValueError as err:
+        print(f"\nVALUE ERROR: {str(err)}")
+        sys.exit(1)
+
+    except Exception as err:
+        print(f"\nERROR ENCOUNTERED! CLOSING ...\n{err}")
+        sys.exit(1)
@@ -0,0 +1,31 @@
+'''
+approved_pages.py
+------------
+    Page objects for the pages the approval process works through, built
+    from the xpaths in xpaths/approved_paths.py.
+'''
+from pages.base import Page
+from xpaths.approved_paths import (category_page, clean_up, coming_soon_page,
+                                   complete_vendor_account, login_portal,
+                                   vendor_search)
+
+
+class BackendPage(Page):
+    '''The login form & the search bar found in every backend page's
+    header.'''
+    LOCATORS = {**login_portal, **vendor_search}
+
+
+class AccountPage(Page):
+    '''The tabs of a vendor's account (Company Address & Company Details).'''
+    LOCATORS = {**complete_vendor_account, **clean_up}
+
+
+class ComingSoonPage(Page):
+    '''The Coming Soon category's page, listing its subcategories.'''
+    LOCATORS = coming_soon_page
+
+
+class CategoryPage(Page):
+    '''A category's edit page.'''
+    LOCATORS = category_page
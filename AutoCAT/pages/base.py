@@ -0,0 +1,193 @@
+'''
+base.py
+------------
+    The page object machinery: pages that look their elements up lazily and
+    keep the handles until the page is navigated away from.
+'''
+import time
+from collections import Counter
+
+from selenium.common.exceptions import (NoSuchElementException,
+                                        StaleElementReferenceException,
+                                        TimeoutException)
+from selenium.webdriver.support.ui import WebDriverWait
+
+from pages.locators import get_registry
+from utils.helper_funcs import READY_POLL
+from utils.metrics import record_wait
+
+
+class CachedElement:
+    '''A stand-in for one of a page's web elements. It's only looked up when
+    first used, and looked up again (once) if the handle has gone stale, ie.
+    the page reloaded underneath us.
+
+    Anything else is passed through to the selenium WebElement, so it can be
+    used just like one (ex. `.click()`, `.send_keys(...)`, `.text`).
+    '''
+
+    def __init__(self, page, name: str, params: tuple):
+        self._page = page
+        self._name = name
+        self._params = params
+
+    @property
+    def element(self):
+        '''The underlying selenium WebElement.'''
+        return self._page._resolve(self._name, self._params)
+
+
+    def _retry(self, use):
+        '''Calls `use` with the element, looking it up again if it's stale.'''
+        try:
+            return use(self.element)
+        except StaleElementReferenceException:
+            self._page._forget(self._name, self._params)
+            return use(self.element)
+
+
+    def __getattr__(self, attr: str):
+        value = self._retry(lambda element: getattr(element, attr))
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            try:
+                return value(*args, **kwargs)
+            except StaleElementReferenceException:
+                self._page._forget(self._name, self._params)
+                return getattr(self.element, attr)(*args, **kwargs)
+        return call
+
+
+class Page:
+    '''The base class for a page of the backend, built from one of the xpath
+    groups in xpaths/approved_paths.py.
+
+    Elements are looked up lazily, the first time they're used, and their
+    handles are kept until the page is navigated away from (see load() &
+    invalidate()) or they go stale.
+
+    Attributes
+    ----------
+        LOCATORS : dict
+            (class attribute) Maps each element's name to its xpath. Xpaths
+            may be templates, filled in with element()'s keyword arguments.
+
+        driver : selenium.webdriver.Chrome
+            The webdriver, sitting on (or about to load) this page.
+
+        registry : pages.locators.LocatorRegistry, optional
+            Finds the elements through their chain of strategies (default
+            the registry shared by every page).
+
+    Methods
+    -------
+        element(name, **params):
+            Returns the (lazily looked up) element with the given name.
+
+        wait_for(name, clickable=False, timeout=5, **params):
+            Waits for the element to be visible (or clickable) & caches it.
+
+        load(url):
+            Navigates to the given URL, forgetting any cached elements.
+
+        invalidate():
+            Forgets every cached element (ex. after the page reloads).
+    '''
+    LOCATORS: dict = {}
+
+    def __init__(self, driver, registry=None):
+        self._driver = driver
+        self._cache: dict = {}
+        self._lookups = Counter()
+        self._registry = registry or get_registry()
+
+    @property
+    def driver(self):
+        return self._driver
+
+    @property
+    def lookups(self) -> Counter:
+        '''How many times each element has been looked up on the page.'''
+        return self._lookups
+
+
+    def xpath(self, name: str, **params) -> str:
+        '''Returns the xpath of the element with the given name.'''
+        xpath = self.LOCATORS[name]
+        return xpath.format(**params) if params else xpath
+
+
+    def _resolve(self, name: str, params: tuple):
+        '''Returns the element's cached handle, looking it up if needed.'''
+        key = (name, params)
+        if key not in self._cache:
+            self._lookups[name] += 1
+            self._cache[key] = self._registry.find(
+                self._driver, type(self).__name__, name,
+                self.xpath(name, **dict(params)))
+        return self._cache[key]
+
+
+    def _forget(self, name: str, params: tuple) -> None:
+        '''Drops the element's cached handle.'''
+        self._cache.pop((name, params), None)
+
+
+    def element(self, name: str, **params) -> CachedElement:
+        '''Returns the element with the given name (filling the xpath
+        template in with any params), looked up the first time it's used.'''
+        return CachedElement(self, name, tuple(sorted(params.items())))
+
+
+    def wait_for(self, name: str, clickable: bool = False,
+                 timeout: float = 5, **params) -> CachedElement:
+        '''Waits for the element to be visible (or clickable), caching the
+        element the wait found so it isn't looked up again.
+
+        Raises
+        ------
+            selenium.common.exceptions.TimeoutException
+                When no strategy finds a visible (or clickable) element
+                within `timeout` seconds.
+        '''
+        if clickable:
+            condition = lambda e: e.is_displayed() and e.is_enabled()
+        else:
+            condition = lambda e: e.is_displayed()
+        xpath = self.xpath(name, **params)
+
+        def find(driver):
+            try:
+                return self._registry.find(driver, type(self).__name__, name,
+                                           xpath, condition)
+            except NoSuchElementException:
+                return False
+
+        start = time.time()
+        try:
+            found = WebDriverWait(self._driver, timeout,
+                                  poll_frequency=READY_POLL).until(find)
+        except TimeoutException:
+            raise TimeoutException(
+                f"'{name}' never became {'clickable' if clickable else 'visible'}"
+                f" on {type(self).__name__} (xpath: {xpath})")
+        finally:
+            record_wait(time.time() - start)
+
+        key = tuple(sorted(params.items()))
+        self._lookups[name] += 1
+        self._cache[(name, key)] = found
+        return CachedElement(self, name, key)
+
+
+    def load(self, url: str) -> None:
+        '''Navigates to the given URL, forgetting any cached elements.'''
+        self.invalidate()
+        self._driver.get(url)
+
+
+    def invalidate(self) -> None:
+        '''Forgets every cached element (ex. after a full page reload).'''
+        self._cache.clear()
@@ -0,0 +1,240 @@
+'''
+locators.py
+------------
+    Turns our xpaths into ordered chains of lookup strategies (id, CSS,
+    relative xpath, then the original xpath), and resolves elements with the
+    fastest strategy that works, remembering it per page.
+'''
+import re
+import threading
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+from selenium.common.exceptions import (NoSuchElementException,
+                                        StaleElementReferenceException)
+from selenium.webdriver.common.by import By
+
+from xpaths.approved_paths import fallback_paths
+
+
+# The kinds of strategy, fastest first:
+ID = "id"
+CSS = "css"
+RELATIVE = "relative"
+XPATH = "xpath"
+
+# A way of finding an element. Relative strategies only count when they
+#   match exactly one element, since they're looser than the original xpath:
+Strategy = namedtuple("Strategy", ["kind", "by", "value"])
+
+_ID_XPATH = re.compile(r"//(?:\*|[a-z]+)\[@id='([A-Za-z][\w-]*)'\]")
+_STEP = re.compile(r"(\*|[a-z][\w-]*)(?:\[(\d+)\])?((?:\[@[\w-]+='[^']*'\])*)")
+_ATTR = re.compile(r"\[@([\w-]+)='([^']*)'\]")
+
+
+def xpath_to_css(xpath: str) -> str:
+    '''Converts a simple xpath (tag names, positions & attribute equality)
+    into the equivalent CSS selector.
+
+    Returns
+    -------
+        str
+            The CSS selector, or None if the xpath uses anything else (ex.
+            functions or axes).
+    '''
+    parts = re.split(r"(//|/)", xpath)
+    if parts[0] or len(parts) < 3:
+        return None
+
+    selector = ""
+    for separator, step in zip(parts[1::2], parts[2::2]):
+        match = _STEP.fullmatch(step)
+        if not match:
+            return None
+        tag, position, attrs = match.groups()
+        # [CASE] ex. '*[2]' -> CSS can't count siblings of any tag:
+        if position and tag == "*":
+            return None
+
+        compound = "" if tag == "*" else tag
+        for name, value in _ATTR.findall(attrs):
+            if name == "id" and re.fullmatch(r"[A-Za-z][\w-]*", value):
+                compound += f"#{value}"
+            else:
+                compound += f"[{name}='{value}']"
+        if position:
+            compound += f":nth-of-type({position})"
+
+        combinator = " " if separator == "//" else " > "
+        selector += combinator + (compound or "*")
+
+    # A leading '/' (ie. the document root) needs no combinator:
+    return selector.lstrip(" >")
+
+
+@lru_cache(maxsize=None)
+def compile_xpath(xpath: str, fallbacks: tuple = ()) -> tuple:
+    '''Compiles an xpath into its chain of strategies, fastest first.
+
+    Parameters
+    ----------
+        xpath : str
+            The element's (original) xpath.
+
+        fallbacks : tuple [str], optional
+            Hand written relative xpaths to try before the original.
+
+    Returns
+    -------
+        tuple [Strategy]
+    '''
+    chain = []
+    id_match = _ID_XPATH.fullmatch(xpath)
+    if id_match:
+        chain.append(Strategy(ID, By.ID, id_match.group(1)))
+    else:
+        css = xpath_to_css(xpath)
+        if css:
+            chain.append(Strategy(CSS, By.CSS_SELECTOR, css))
+
+    for fallback in fallbacks:
+        chain.append(Strategy(RELATIVE, By.XPATH, fallback))
+
+    chain.append(Strategy(XPATH, By.XPATH, xpath))
+    return tuple(chain)
+
+
+class LocatorRegistry:
+    '''A class for finding elements through their chain of strategies.
+
+    The strategy that last worked for an element on a page is tried first
+    next time. Every time an element is found by something other than the
+    first strategy in its chain, it's counted as a fallback.
+
+    Attributes
+    ----------
+        fallbacks : dict, optional
+            Maps element names to hand written relative xpaths to try before
+            the original xpath. (default fallback_paths)
+
+    Methods
+    -------
+        strategies(name, xpath):
+            Returns the element's chain of strategies.
+
+        find(driver, page, name, xpath, condition=None):
+            Finds the element with the best working strategy.
+
+        report():
+            Returns the fallbacks hit so far.
+
+        print_report():
+            Prints the fallbacks hit so far.
+    '''
+
+    def __init__(self, fallbacks: dict = None):
+        self._fallbacks = fallback_paths if fallbacks is None else fallbacks
+        # The index of the strategy that last worked, as {(page, name): i}:
+        self._preferred: dict = {}
+        self._fallback_hits = Counter()
+        self._lock = threading.Lock()
+
+
+    def strategies(self, name: str, xpath: str) -> tuple:
+        '''Returns the element's chain of strategies, fastest first.'''
+        return compile_xpath(xpath, tuple(self._fallbacks.get(name, ())))
+
+
+    def _match(self, driver, strategy: Strategy, condition):
+        '''Returns the element the strategy finds (and that meets the
+        condition), or None.'''
+        found = driver.find_elements(strategy.by, strategy.value)
+        if strategy.kind == RELATIVE and len(found) != 1:
+            return None
+        if not found or (condition is not None and not condition(found[0])):
+            return None
+        return found[0]
+
+
+    def find(self, driver, page: str, name: str, xpath: str,
+             condition=None):
+        '''Finds the element with the best working strategy.
+
+        Parameters
+        ----------
+            driver : selenium.webdriver.Chrome
+                The webdriver, sitting on the page.
+
+            page : str
+                The page's name (strategies are remembered per page).
+
+            name : str
+                The element's name.
+
+            xpath : str
+                The element's original xpath.
+
+            condition : callable, optional
+                Given a found element, returns whether it's the one we want
+                yet (ex. it's visible).
+
+        Raises
+        ------
+            selenium.common.exceptions.NoSuchElementException
+                When no strategy finds the element.
+        '''
+        chain = self.strategies(name, xpath)
+        key = (page, name)
+        preferred = self._preferred.get(key, 0)
+        order = [preferred] + [i for i in range(len(chain)) if i != preferred]
+
+        for i in order:
+            try:
+                element = self._match(driver, chain[i], condition)
+            except StaleElementReferenceException:
+                element = None
+            if element is None:
+                continue
+            with self._lock:
+                self._preferred[key] = i
+                if i:
+                    self._fallback_hits[(page, name, chain[i].kind)] += 1
+            return element
+
+        raise NoSuchElementException(
+            f"No strategy found '{name}' on {page} (xpath: {xpath})")
+
+
+    def report(self) -> dict:
+        '''Returns the fallbacks hit so far.
+
+        Returns
+        -------
+            dict
+                Maps 'page.name' to {strategy kind: times used}.
+        '''
+        report = {}
+        with self._lock:
+            for (page, name, kind), hits in sorted(self._fallback_hits.items()):
+                report.setdefault(f"{page}.{name}", {})[kind] = hits
+        return report
+
+
+    def print_report(self) -> None:
+        '''Prints the fallbacks hit so far (if any).'''
+        report = self.report()
+        if not report:
+            return
+        print("\n ---- Locator Fallbacks ----")
+        for element, kinds in report.items():
+            used = ", ".join(f"{kind} x{hits}" for kind, hits in kinds.items())
+            print(f"{element}: {used}")
+
+
+# The registry shared by every page:
+_registry = LocatorRegistry()
+
+
+def get_registry() -> LocatorRegistry:
+    '''Returns the locator registry shared by every page.'''
+    return _registry
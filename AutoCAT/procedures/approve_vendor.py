@@ -4,39 +4,57 @@ approve_vendor.py
     This module focuses on procedures necessary to complete the
     category approval process.
 """
+import copy
 import os
+import threading
+from collections import Counter
 from time import sleep
+from urllib.parse import quote
 
 from xpaths.approved_paths import (
     # Backend Admin Login:
-    EMAIL_INPUT_FIELD, PASSWORD_INPUT_FIELD, LOGIN_BUTTON, SEARCH_IN_BUTTON,
-
-    # Vendor Email Search:
-    SEARCH_IN_USERS_DD, SEARCH_BAR_FIELD,
+    EMAIL_INPUT_FIELD, SEARCH_IN_BUTTON,
 
     # Complete Vendor Account:
     ACCOUNT_HEADER, QUESTIONS_EMAIL_FIELD, COUNTRY_DD, STATE_AS_DD,
     STATE_AS_FIELD, CITY_FIELD, CA_SUBMIT_BUTTON,
 
-    TRUSTED_DD, LOCATION_FIELD, WEBSITE_FIELD, INSTAGRAM_FIELD, 
+    LOCATION_FIELD, WEBSITE_FIELD, INSTAGRAM_FIELD, 
     COMPANY_DESC_FIELD, CD_UPDATE_BUTTON,
 
     # Complete Coming Soon Page:
-    NEW_CATEGORY_BUTTON, NEW_CATEGORY_FIELD, SAVE_CHANGES_BUTTON,
-    FIRST_POS_NAME, FIRST_POS_DIV, FIRST_CAT_POS_INPUT,
+    NEW_CATEGORY_FIELD, SAVE_CHANGES_BUTTON, FIRST_POS_NAME,
+    NEW_CATEGORY_FIELD_N, POS_NAMES, CAT_POS_INPUT,
 
     # Complete Category Page:
-    CLEAN_URL_FIELD, SHOW_SEARCH_BOX_SWITCH, CATEGORY_UPDATE_BUTTON,
+    DESCRIPTION_TEXTAREA, CLEAN_URL_FIELD, SHOW_SEARCH_BOX_SWITCH, CATEGORY_UPDATE_BUTTON,
 
     # Clean Up:
-    VENDOR_PAGE_URL_FIELD, VENDOR_CATEGORIES_FIELD, CATEGORY_INPUT_FIELD,
+    VENDOR_CATEGORIES_FIELD, CATEGORY_AUTOCOMPLETE_OPTION,
 )
 from dotenv import load_dotenv
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.keys import Keys
-from utils.helper_funcs import (address_handler, check_condition, 
-                                check_is_clickable, format_instagram_handle,
-                                timer, wait_for_save)
-from utils.database import add_vendor_to_db
+from selenium.webdriver.support.expected_conditions import (
+    invisibility_of_element_located,
+    number_of_windows_to_be,
+    visibility_of_element_located,
+)
+from selenium.webdriver.common.by import By
+from utils.helper_funcs import (address_handler, element_lacks_class,
+                                format_instagram_handle, timer, title_key,
+                                wait_for_save, wait_until)
+from pages.approved_pages import (AccountPage, BackendPage, CategoryPage,
+                                  ComingSoonPage)
+from procedures.step_scheduler import ANY, Step, StepScheduler
+from utils.backend_client import BackendClient
+from utils.checkpoint import CheckpointStore
+from utils.cookie_cache import CookieCache, restore_session, share_session
+from utils.database import add_vendor_to_db, queue_vendor_for_db
+from utils.metrics import record_wait
+from utils.vendor_index import VendorIndex
+from utils.dom import (DATA_OPTION, SELECTED, TEXT, VALUE, fill_fields,
+                       read_all, read_fields)
 
 class ApproveVendorProcess:
     """Class used to trigger actions for the approval process using the
@@ -47,6 +65,42 @@ class ApproveVendorProcess:
         driver : selenium.webdriver.Chrome
             The web browser object used to pass in procedures.
 
+        safe_mode : bool, optional
+            Whether to also pause for SUBMISSION_DELAY around submission
+            events, for flaky environments where the readiness checks alone
+            aren't enough. (default False)
+
+        fast_input : bool, optional
+            Whether to fill in text fields with a single script call rather
+            than typing them out key by key. (default True)
+
+        vendor_index : VendorIndex, optional
+            Where known vendors' profile ids are remembered, letting us skip
+            the backend search. (default VendorIndex())
+
+        checkpoints : CheckpointStore, optional
+            Where each vendor's progress is saved after every step, so a
+            failed run can be resumed. (default CheckpointStore())
+
+        write_behind : bool, optional
+            Whether to hand the vendor's stats to the background database
+            writer instead of saving them before returning. (default False)
+
+        step_hooks : list, optional
+            Objects notified before & after every timed step (see
+            utils.helper_funcs.timer), ex. a utils.metrics.MetricsCollector.
+
+        http_reads : bool, optional
+            Whether to read the Company Address & Company Details tabs over
+            plain HTTP (in the background, with the browser's cookies)
+            instead of from the browser. (default HTTP_READS environ.
+            variable, or False)
+
+        aux_driver : selenium.webdriver.Chrome, optional
+            A second webdriver, logged into the same backend, used to run
+            steps that don't depend on each other at the same time (see
+            STEP_GRAPH). Without one, the steps run one after another.
+
     Methods:
     -------
         backend_admin_login():
@@ -55,13 +109,26 @@ class ApproveVendorProcess:
         vendor_email_search(email):
             Looks up a vendor using their email address.
         
+        read_account_header():
+            Reads the vendor's email & brand name off their account page.
+
+        complete_company_address():
+            Completes the vendor's Company Address tab.
+
+        complete_company_details():
+            Completes the vendor's Company Details tab.
+
         complete_vendor_account():
-            Executes the steps required to finish setting up a vendor's
+            Executes the three steps above, finishing setting up a vendor's
             account.
 
         complete_coming_soon_page():
             Completes the Coming Soon page portion of a category build.
 
+        create_categories(brand_names):
+            Adds & positions the Coming Soon categories of many vendors at
+            once (for batches).
+
         complete_category_page():
             Completes the category page.
         
@@ -69,18 +136,102 @@ class ApproveVendorProcess:
             Finishes the CAT build process. Tears down any unnecessary
             resources.
 
-        run_all():
-            Runs all of the above methods in order.
+        run_all(email, login=True, resume=False, steps=None):
+            Runs all of the above steps in dependency order, optionally
+            skipping the steps a previous run already completed.
     """
 
     # Wait time (in seconds) for WebDriverWait events:
     TIMEOUT = 5
-    # Time (in seconds) for the delay between submission events:
+    # Time (in seconds) for the delay between submission events (safe mode):
     SUBMISSION_DELAY = 0.3
 
-
-    def __init__(self, driver):
+    # The Coming Soon parent category & where new categories are moved to:
+    COMING_SOON_ID = "1845"
+    CATEGORY_POSITION = "15000"
+
+    # The steps of the process run by run_all, as {name: Step}. Each step
+    #   declares the steps it must run after, the instance variables it
+    #   reads & writes (copied to & from the aux driver's process) and
+    #   whether it must run on the main driver. Listed in sequential order:
+    STEP_GRAPH = {
+        "vendor_email_search": Step(
+            outputs=("_profile_id", "_from_index")),
+        "read_account_header": Step(
+            requires=("vendor_email_search",),
+            outputs=("_profile_id", "_vendor_email_address", "_brand_name")),
+        "complete_company_address": Step(
+            requires=("read_account_header",),
+            outputs=("_company_country", "_company_state",
+                     "_company_city")),
+        "complete_company_details": Step(
+            requires=("complete_company_address",),
+            outputs=("_website_url", "_company_description",
+                     "_instagram_handle")),
+        "complete_coming_soon_page": Step(
+            requires=("read_account_header",),
+            inputs=("_brand_name", "_category_id"),
+            outputs=("_category_id",),
+            lane=ANY),
+        "complete_category_page": Step(
+            requires=("complete_coming_soon_page",
+                      "complete_company_details"),
+            inputs=("_category_id", "_company_description"),
+            lane=ANY),
+        "clean_up": Step(
+            requires=("complete_category_page",)),
+        "save_stats_to_db": Step(
+            requires=("clean_up",)),
+    }
+    STEPS = tuple(STEP_GRAPH)
+
+    # The steps complete_vendor_account was split into (checkpoints saved
+    #   before the split list it as a single step):
+    ACCOUNT_STEPS = ("read_account_header",
+                     "complete_company_address",
+                     "complete_company_details",
+                    )
+
+    # The instance variables the steps produce, saved in each checkpoint:
+    CHECKPOINT_FIELDS = ("_searched_email", "_profile_id",
+                         "_vendor_email_address", "_brand_name",
+                         "_company_country", "_company_state",
+                         "_company_city", "_website_url", "_instagram_handle",
+                         "_company_description", "_category_id",
+                        )
+
+
+    def __init__(self, driver, safe_mode: bool = False,
+                 fast_input: bool = True, vendor_index: VendorIndex = None,
+                 checkpoints: CheckpointStore = None,
+                 write_behind: bool = False, step_hooks: list = None,
+                 http_reads: bool = None, aux_driver=None):
         self._driver = driver
+        self._aux_driver = aux_driver
+        # Set on the copy of the process running steps on the aux driver:
+        self._parent = None
+        # The outputs of the step the aux driver's copy is running:
+        self._shared_outputs: tuple = ()
+        # Guards our checkpointed state while steps run concurrently:
+        self._state_lock = threading.RLock()
+        if http_reads is None:
+            load_dotenv()
+            http_reads = os.environ.get("HTTP_READS", "").lower() \
+                in ("1", "true", "yes")
+        self._http_reads = http_reads
+        # The vendor's tabs being read over HTTP, as {tab: Future}:
+        self._prefetch: dict = {}
+        self._step_hooks = list(step_hooks or [])
+        self._write_behind = write_behind
+        self._safe_mode = safe_mode
+        self._fast_input = fast_input
+        self._vendor_index = vendor_index or VendorIndex()
+        self._checkpoints = checkpoints or CheckpointStore()
+        self._completed_steps: list = []
+        # The email we searched for & whether its profile id came from the
+        #   index (in which case we're already on the Company Address tab):
+        self._searched_email: str = ""
+        self._from_index: bool = False
         self._profile_id: str = ""
         self._vendor_email_address: str = ""
         self._brand_name: str = ""
@@ -92,11 +243,272 @@ class ApproveVendorProcess:
         self._minimum_order_amount: str = ""
         self._company_description: str = ""
         self._category_id: str = ""
+        # Handles of the windows we open, so they can all be closed again:
+        self._main_window: str = ""
+        self._coming_soon_window: str = ""
+        self._category_window: str = ""
+        # Seconds spent in each wait for a save, as (xpath, seconds) pairs:
+        self._save_wait_times: list = []
+        # The pages we work on, which keep their elements between uses:
+        self._new_pages()
+
+
+    @property
+    def driver(self):
+        return self._driver
+
+    @property
+    def step_hooks(self) -> list:
+        return self._step_hooks
+
+    @property
+    def parent(self) -> "ApproveVendorProcess":
+        '''The process we're running steps alongside (or None).'''
+        return self._parent
+
+    @property
+    def vendor_email(self) -> str:
+        '''The email of the vendor being processed.'''
+        return self._searched_email
+
+    @property
+    def save_wait_times(self) -> list:
+        return self._save_wait_times
+
+    @property
+    def element_lookups(self) -> Counter:
+        '''How many times each element has been looked up on our pages.'''
+        return sum((page.lookups for page in self._pages()), Counter())
+
+
+    def _new_pages(self) -> None:
+        '''Creates the page objects for our driver.'''
+        self._backend_page = BackendPage(self._driver)
+        self._account_page = AccountPage(self._driver)
+        self._coming_soon_page = ComingSoonPage(self._driver)
+        self._category_page = CategoryPage(self._driver)
+
+
+    def _pages(self) -> tuple:
+        return (self._backend_page, self._account_page,
+                self._coming_soon_page, self._category_page)
+
+
+    def _await(self, condition=None, delay: float = None) -> None:
+        '''Waits for the page to be ready for our next action.
+
+        Parameters
+        ----------
+            condition : callable, optional
+                An expected condition to wait for (ex. a button is enabled).
+
+            delay : float, optional
+                Fixed pause (in seconds) used in safe mode, on top of the
+                condition. (default SUBMISSION_DELAY)
+        '''
+        if condition is not None:
+            wait_until(self._driver, condition)
+        if self._safe_mode:
+            delay = self.SUBMISSION_DELAY if delay is None else delay
+            sleep(delay)
+            record_wait(delay)
+
+
+    def _save_checkpoint(self) -> None:
+        '''Saves the steps completed so far & the state they produced.'''
+        # [CASE] We're the aux driver's copy -> Hand the running step's
+        #   outputs back & checkpoint the vendor's main process:
+        if self._parent is not None:
+            with self._state_lock:
+                for field in self._shared_outputs:
+                    setattr(self._parent, field, getattr(self, field))
+            self._parent._save_checkpoint()
+            return
+
+        if not self._searched_email:
+            return
+        with self._state_lock:
+            state = {field: getattr(self, field)
+                     for field in self.CHECKPOINT_FIELDS}
+            self._checkpoints.save(self._searched_email,
+                                   self._completed_steps, state)
+
+
+    def _complete_step(self, step: str) -> None:
+        '''Marks the step as completed & checkpoints it.'''
+        with self._state_lock:
+            self._completed_steps.append(step)
+        self._save_checkpoint()
+
+
+    def share_outputs(self, outputs: tuple) -> None:
+        '''Sets the instance variables handed back to the vendor's main
+        process whenever the aux driver's copy saves a checkpoint (ie. the
+        outputs of the step it's running).'''
+        self._shared_outputs = tuple(outputs)
+
+
+    def _restore_checkpoint(self, email: str) -> bool:
+        '''Rehydrates our state & completed steps from the vendor's
+        checkpoint, returning whether there was one.'''
+        checkpoint = self._checkpoints.load(email)
+        if not checkpoint:
+            return False
+
+        for field, value in checkpoint.get("state", {}).items():
+            if field in self.CHECKPOINT_FIELDS:
+                setattr(self, field, value)
+        completed = list(checkpoint["completed"])
+        # [CASE] Saved before the account steps were split up:
+        if "complete_vendor_account" in completed:
+            completed += self.ACCOUNT_STEPS
+        self._completed_steps = [step for step in self.STEPS
+                                 if step in completed]
+
+        # [CASE] Didn't get past the account page -> The search only left the
+        #   browser on that page, so it has to be redone:
+        if "read_account_header" not in self._completed_steps:
+            self._completed_steps = []
+        return True
+
+
+    def _spawn(self, driver) -> "ApproveVendorProcess":
+        '''Returns a copy of the process bound to the given driver, for
+        running steps alongside us. It shares our settings, hooks & lock and
+        checkpoints through us.'''
+        clone = copy.copy(self)
+        clone._driver = driver
+        clone._aux_driver = None
+        clone._parent = self
+        clone._shared_outputs = ()
+        clone._prefetch = {}
+        clone._main_window = ""
+        clone._coming_soon_window = clone._category_window = ""
+        clone._new_pages()
+        return clone
+
+
+    def _login_aux(self) -> None:
+        '''Logs the aux driver in with our session's cookies, falling back
+        to the login form.'''
+        landing_url = os.environ.get("BACKEND_LANDING_URL")
+        if share_session(self._driver, self._aux_driver, landing_url,
+                         self.is_logged_in):
+            return
+        self._spawn(self._aux_driver).backend_admin_login()
+
+
+    def _tab_url(self, target: str) -> str:
+        '''Forms the URL for one of the vendor's account tabs.'''
+        return "{root}?target={target}&profile_id={id}".format(
+            root=os.environ.get("BACKEND_LANDING_URL"),
+            target=target,
+            id=self._profile_id)
+
+
+    def _fill(self, fields: dict) -> None:
+        '''Fills in the given {name: (xpath, value)} fields, typing them out
+        key by key when fast input is turned off.'''
+        typed = () if self._fast_input else tuple(fields)
+        fill_fields(self._driver, fields, typed=typed)
+
+
+    def _open_window(self, page, url: str) -> str:
+        '''Opens the given URL in a new tab, switches to it & loads it as the
+        given page.
+
+        Returns
+        -------
+            str
+                The new window's handle.
+        '''
+        _driver = self._driver
+        if not self._main_window:
+            self._main_window = _driver.current_window_handle
+
+        existing = set(_driver.window_handles)
+        _driver.execute_script("window.open('');")
+        self._await(number_of_windows_to_be(len(existing) + 1))
+
+        new_window = (set(_driver.window_handles) - existing).pop()
+        _driver.switch_to.window(new_window)
+        page.load(url)
+        return new_window
+
+
+    def _close_window(self, handle: str) -> None:
+        '''Closes one of the windows we opened (if it's still open).'''
+        _driver = self._driver
+        if not handle or handle not in _driver.window_handles:
+            return
+        window_count = len(_driver.window_handles)
+        _driver.switch_to.window(handle)
+        self._await()
+        _driver.close()
+        self._await(number_of_windows_to_be(window_count - 1))
+
+
+    def _start_prefetch(self) -> None:
+        '''Starts reading the vendor's account tabs over HTTP in the
+        background (when HTTP reads are turned on).'''
+        self._prefetch = {}
+        if not self._http_reads:
+            return
+        try:
+            client = BackendClient.from_driver(self._driver)
+            self._prefetch = client.read_vendor_async(self._profile_id)
+        except Exception as err:
+            print(f"Couldn't start reading over HTTP: {err}")
+
+
+    def _prefetched(self, tab: str) -> dict:
+        '''Returns the fields read over HTTP from the given tab, or None if
+        they weren't (in which case we read them from the browser).'''
+        future = self._prefetch.pop(tab, None)
+        if future is None:
+            return None
+        try:
+            fields = future.result()
+        except Exception as err:
+            print(f"Reading the {tab} tab over HTTP failed ({err}) -- "
+                  "reading it from the browser instead.")
+            return None
+        # [CHECK] The page had our fields (ie. it looks like we expected):
+        if all(value is None for value in fields.values()):
+            return None
+        return fields
+
+
+    def _close_opened_windows(self) -> None:
+        '''Closes the Coming Soon & Category windows (if we opened them) and
+        switches back to the main window.'''
+        _driver = self._driver
+        self._close_window(self._coming_soon_window)
+        self._close_window(self._category_window)
+        self._coming_soon_window = self._category_window = ""
+        _driver.switch_to.window(self._main_window or _driver.window_handles[0])
+
+
+    def _wait_for_save(self, xpath: str) -> None:
+        '''Waits for the page to indicate it saved successfully, recording
+        how long we waited.'''
+        latency = wait_for_save(self._driver, xpath)
+        self._save_wait_times.append((xpath, latency))
+
+
+    @staticmethod
+    def is_logged_in(driver) -> bool:
+        '''Returns whether the given driver (having just loaded the backend
+        landing page) is logged in, ie. wasn't bounced to the login form.'''
+        if driver.find_elements_by_xpath(EMAIL_INPUT_FIELD):
+            return False
+        return bool(driver.find_elements_by_xpath(SEARCH_IN_BUTTON))
 
 
     @timer
     def backend_admin_login(self) -> None:
-        '''The process required to log into the backend of the website.'''
+        '''The process required to log into the backend of the website.
+        Reuses cached session cookies when they're still valid.'''
 
         print("\n⚙️  Backend Admin Login")
         _driver = self._driver
@@ -104,13 +516,21 @@ class ApproveVendorProcess:
         # Load our environ. variables:
         load_dotenv()
 
+        # [CASE] Our cached session is still good -> Skip the login form:
+        cache = CookieCache()
+        landing_url = os.environ.get("BACKEND_LANDING_URL")
+        if restore_session(_driver, cache, landing_url, self.is_logged_in):
+            print("Restored cached backend session.")
+            return
+
         # Open browser to the login portal:
-        _driver.get(os.environ.get("BACKEND_LOGIN_URL"))
+        _page = self._backend_page
+        _page.load(os.environ.get("BACKEND_LOGIN_URL"))
 
-        # Grab the necessary web elements via xpaths:
-        _email_field = _driver.find_element_by_xpath(EMAIL_INPUT_FIELD)
-        _pswd_field = _driver.find_element_by_xpath(PASSWORD_INPUT_FIELD)
-        _login_btn = _driver.find_element_by_xpath(LOGIN_BUTTON)
+        # Grab the necessary web elements:
+        _email_field = _page.element("EMAIL_INPUT_FIELD")
+        _pswd_field = _page.element("PASSWORD_INPUT_FIELD")
+        _login_btn = _page.element("LOGIN_BUTTON")
 
         # [CHECK] ADMIN_EMAIL environ. variable was found:
         if os.environ.get("ADMIN_EMAIL"):
@@ -127,257 +547,489 @@ class ApproveVendorProcess:
 
         # Click Login Button:
         _login_btn.click()
+        _page.invalidate()
 
         # [CHECK] Confirm that we successfully logged in:
-        check_condition(_driver, SEARCH_IN_BUTTON)
+        _page.wait_for("SEARCH_IN_BUTTON")
 
         # [CHECK] The current page is the backend landing page:
-        assert _driver.current_url == os.environ.get("BACKEND_LANDING_URL")
+        assert _driver.current_url == landing_url
+
+        # Cache our session cookies for next time:
+        cache.save(_driver.get_cookies())
 
 
     @timer
-    def vendor_email_search(self, email: str) -> None:
-        '''The process for looking up a vendor by email address with the
-        backend search engine.
+    def vendor_email_search(self, email: str = None) -> None:
+        '''The process for looking up a vendor by email address. Vendors
+        we've seen before go straight to their Company Address tab, anyone
+        else is looked up with the backend search engine.
 
         Parameters
         ----------
-            email : str
-                The vendor's email address.
+            email : str, optional
+                The vendor's email address. (default the email run_all was
+                given)
         '''
         
         print("\n🐱  Vendor Email Search")
         _driver = self._driver
-        
+        email = email or self._searched_email
+        self._searched_email = email.strip().lower()
+
+        # [CASE] We know their profile id -> Skip the search entirely:
+        profile_id = self._vendor_index.get(email)
+        if profile_id:
+            print(f"Found profile id {profile_id} in the vendor index.")
+            self._profile_id = profile_id
+            self._from_index = True
+            self._account_page.load(self._tab_url("companyAddress"))
+            return
+
+        self._search_backend(email)
+
+
+    def _search_backend(self, email: str) -> None:
+        '''Looks up a vendor with the backend search engine, landing on
+        their account page. Uses the VENDOR_SEARCH_URL environ. variable to
+        load the results directly when it's set, otherwise clicks through
+        the 'Search in' dropdown.'''
+        _page = self._backend_page
+        self._from_index = False
+        # We're about to land on a new account page:
+        self._account_page.invalidate()
+
+        # [CASE] Direct search URL configured -> Load the results page:
+        search_url = os.environ.get("VENDOR_SEARCH_URL")
+        if search_url:
+            _page.load(search_url.format(
+                root=os.environ.get("BACKEND_LANDING_URL"),
+                email=quote(email)))
+            return
+
         # [CHECK] Confirm that we've successfully logged in:
-        check_is_clickable(_driver, SEARCH_IN_BUTTON)
+        _searchin_btn = _page.wait_for("SEARCH_IN_BUTTON", clickable=True)
 
         # Select search bar and enter vendor's email address:
-        _search_bar = _driver.find_element_by_xpath(SEARCH_BAR_FIELD)
+        _search_bar = _page.element("SEARCH_BAR_FIELD")
         _search_bar.send_keys(email)
 
         # Click 'Search in' button:
-        _searchin_btn = _driver.find_element_by_xpath(SEARCH_IN_BUTTON)
         _searchin_btn.click()
 
         # Choose to search in 'Users' from the dropdown menu:
-        _searchin_dd_opt = _driver.find_element_by_xpath(SEARCH_IN_USERS_DD)
-        _searchin_dd_opt.click()
+        _page.element("SEARCH_IN_USERS_DD").click()
 
         # Selecting the Users option SHOULD automatically put the cursor back
         #   into the search bar.
         _search_bar.send_keys(Keys.RETURN)
+        _page.invalidate()
+
+
+    def _read_account_header(self) -> tuple:
+        '''Parses the vendor's email & brand name out of the account page's
+        "email (Brand Name)" header.'''
+        header = read_fields(self._driver, {"header": (ACCOUNT_HEADER, TEXT)})
+        header_parsed = header["header"].split('(')
+        email_address = header_parsed[0].strip().lower()
+        brand_name = header_parsed[1].replace(')',  '').strip()
+        return email_address, brand_name
 
 
-    @timer
     def complete_vendor_account(self) -> None:
         '''Executes the steps required to finish setting up a vendor's
         account by completing / editting fields found in the different
         tabs.'''
+        self.read_account_header()
+        self.complete_company_address()
+        self.complete_company_details()
+
+
+    @timer
+    def read_account_header(self) -> None:
+        '''Grabs the vendor's email & brand name from the 'Account Details'
+        tab's header, & remembers their profile id.'''
 
         print("\n🐱  Complete Vendor Account")
         _driver = self._driver
 
-        ''' * * * * * Grab Info from 'Account Details' tab * * * * * '''
         # [CHECK] Confirm we successfully loaded the page:
-        check_condition(_driver, ACCOUNT_HEADER)
+        self._account_page.wait_for("ACCOUNT_HEADER")
 
         # Grab email and brand name from header:
-        _header = _driver.find_element_by_xpath(ACCOUNT_HEADER)
-        header_parsed = _header.text.split('(')
-        email_address = header_parsed[0].strip().lower()
-        brand_name = header_parsed[1].replace(')',  '').strip()
+        email_address, brand_name = self._read_account_header()
+
+        # [CASE] The indexed profile id belongs to someone else -> Forget it
+        #   and search for the vendor instead:
+        if self._from_index and self._searched_email \
+                and email_address != self._searched_email:
+            print("Vendor index is out of date -- searching instead.")
+            self._vendor_index.remove(self._searched_email)
+            self._profile_id = ""
+            self._search_backend(self._searched_email)
+            self._account_page.wait_for("ACCOUNT_HEADER")
+            email_address, brand_name = self._read_account_header()
+
         print(f"Brand Name: {brand_name}\nEmail Address: {email_address}")
 
         # Save properties to instance variables:
-        current_url = _driver.current_url
-        self._profile_id = current_url.split('=')[-1]
+        if not self._from_index:
+            current_url = _driver.current_url
+            self._profile_id = current_url.split('=')[-1]
         self._vendor_email_address = email_address
         self._brand_name = brand_name
 
+        # Remember their profile id so next time we can skip the search:
+        self._vendor_index.set(email_address, self._profile_id)
 
-        ''' * * * * * Complete 'Company Address' tab * * * * * '''
-        # Form the URL for the Company Address tab:
-        address_tab_url = "{root}?target=companyAddress&profile_id={id}"\
-                            .format(
-                                root=os.environ.get("BACKEND_LANDING_URL"),
-                                id=self._profile_id)
+        # Read the address & details tabs over HTTP while we fill the form:
+        self._start_prefetch()
 
-        # Go to our tab via URL:
-        _driver.get(address_tab_url)
+
+    @timer
+    def complete_company_address(self) -> None:
+        '''Completes the vendor's 'Company Address' tab & copies their
+        location.'''
+        _driver = self._driver
+        _page = self._account_page
+
+        # [CASE] We didn't come straight here from the index -> Go to our
+        #   tab via URL:
+        if not self._from_index:
+            _page.load(self._tab_url("companyAddress"))
 
         # [CHECK] Confirm we successfully found our vendor page:
-        check_condition(_driver, QUESTIONS_EMAIL_FIELD)
+        _email_field = _page.wait_for("QUESTIONS_EMAIL_FIELD")
 
         # PASTE email address into 'Product questions e-mail' field:
-        _email_field =  _driver.find_element_by_xpath(QUESTIONS_EMAIL_FIELD)
-        _email_field.clear()
-        _email_field.send_keys(self._vendor_email_address)
+        self._fill({
+            "email": (QUESTIONS_EMAIL_FIELD, self._vendor_email_address),
+        })
 
-        # Submit:
-        sleep(self.SUBMISSION_DELAY)
+        # Submit once the form registers our change:
+        self._await(element_lacks_class(CA_SUBMIT_BUTTON))
         _email_field.send_keys(Keys.RETURN)
-        sleep(self.SUBMISSION_DELAY)
+        self._await()
 
         # Wait for page to indicate it successfully saved our input:
-        wait_for_save(_driver, CA_SUBMIT_BUTTON)
+        self._wait_for_save(CA_SUBMIT_BUTTON)
 
-        # Copy value in the 'Country' dropdown:
-        _country_dd = _driver.find_element_by_xpath(COUNTRY_DD)
-        _val_selected = _country_dd\
-                        .find_element_by_xpath("//*[@selected='selected']")
-        self._company_country = _val_selected.text
+        # Copy the 'Country', 'State' & 'City' values in one go:
+        address = self._prefetched("address") or read_fields(_driver, {
+            "country": (COUNTRY_DD, SELECTED),
+            "state_dd": (STATE_AS_DD, DATA_OPTION),
+            "state_field": (STATE_AS_FIELD, VALUE),
+            "city": (CITY_FIELD, VALUE),
+        })
+        self._company_country = address["country"] or ""
 
         # Copy value for the 'State' field:
-        # [CASE] Country is United States --> Use the dropdown XPATH:
+        # [CASE] Country is United States --> Use the dropdown's value:
         if (self._company_country == 'United States'):
-            _state_dd = _driver.find_element_by_xpath(STATE_AS_DD)
-            data_val = _state_dd.get_attribute('data-value')
-            _state_option = _state_dd\
-                            .find_element_by_xpath(f"//*[@value='{data_val}']")
-            self._company_state = _state_option.text
-        # [CASE] Country is NOT the U.S. --> Use the field XPATH:
+            self._company_state = address["state_dd"] or ""
+        # [CASE] Country is NOT the U.S. --> Use the field's value:
         else:
-            _state_field = _driver.find_element_by_xpath(STATE_AS_FIELD)
-            self._company_state = _state_field.get_attribute('value')
+            self._company_state = address["state_field"] or ""
 
         # Copy value for the 'City' field:
-        _city_field = _driver.find_element_by_xpath(CITY_FIELD)
-        self._company_city = _city_field.get_attribute('value')
+        self._company_city = address["city"] or ""
         print("City: " + self._company_city)
         print("State: " + self._company_state)
         print("Country: " + self._company_country)
 
 
-        ''' * * * * * Complete 'Company Details' tab * * * * * '''
-        # Form the URL for the Company Details tab:
-        company_details_url = "{root}?target=vendor&profile_id={id}"\
-                                .format(
-                                    root=os.environ.get("BACKEND_LANDING_URL"),
-                                    id=self._profile_id)
+    @timer
+    def complete_company_details(self) -> None:
+        '''Completes the vendor's 'Company Details' tab & copies their
+        website, description & Instagram handle.'''
+        _driver = self._driver
+        _page = self._account_page
 
         # Go to our tab via URL:
-        _driver.get(company_details_url)
+        _page.load(self._tab_url("vendor"))
 
         # [CHECK] The next page successfully Loaded:
-        check_condition(_driver, LOCATION_FIELD)
+        _page.wait_for("LOCATION_FIELD")
+
+        # Read the website, description & Instagram fields in one go:
+        details = self._prefetched("details") or read_fields(_driver, {
+            "website": (WEBSITE_FIELD, VALUE),
+            "description": COMPANY_DESC_FIELD,
+            "instagram": (INSTAGRAM_FIELD, VALUE),
+        })
 
         # Handle the 'Trusted vendor' dropdown:
-        _trusted_dd = _driver.find_element_by_xpath(TRUSTED_DD)
+        _trusted_dd = _page.element("TRUSTED_DD")
         _trusted_dd.click()
         _trusted_option = _trusted_dd\
                             .find_element_by_xpath("option[@value='1']")
         _trusted_option.click()
 
         # Handle the 'Location' field:
-        _location_field = _driver.find_element_by_xpath(LOCATION_FIELD)
         location = address_handler(
             country=self._company_country,
             state=self._company_state,
             city=self._company_city
         )
         print("Location:  " + location)
-        # Replace location info:
-        _location_field.clear()
-        _location_field.send_keys(location)
 
         # Store website URL so we can (possibly) launch it later:
-        _website_field = _driver.find_element_by_xpath(WEBSITE_FIELD)
-        site =  _website_field.get_attribute('value')
+        site = details["website"] or ""
         # Force to lowercase:
         self._website_url = site.lower()
-        _website_field.clear()
-        _website_field.send_keys(self._website_url)
         print(f"Site URL:  {self._website_url}")
 
+        # Replace the location info & website URL:
+        self._fill({
+            "location": (LOCATION_FIELD, location),
+            "website": (WEBSITE_FIELD, self._website_url),
+        })
+
         # Copy description from 'Company Description':
-        _descr_field = _driver.find_element_by_xpath(COMPANY_DESC_FIELD)
-        self._company_description = _descr_field.text
+        self._company_description = details["description"] or ""
 
         # Handle formatting & storing Instagram handle (if applicable):
-        _instagram_field = _driver.find_element_by_xpath(INSTAGRAM_FIELD)
-        gram = _instagram_field.get_attribute('value')
-        instagram = format_instagram_handle(gram)
+        instagram = format_instagram_handle(details["instagram"])
         print(f"Instagram:  {instagram}")
 
         # Store the Instagram handle:
         self._instagram_handle = instagram
 
         # Submit the Company Details tab:
-        _update_btn = _driver.find_element_by_xpath(CD_UPDATE_BUTTON)
-        _update_btn.click()
-        sleep(self.SUBMISSION_DELAY)
+        _page.element("CD_UPDATE_BUTTON").click()
+        self._await()
 
         # Wait for the page to successfully save our info:
-        wait_for_save(_driver, CD_UPDATE_BUTTON)
+        self._wait_for_save(CD_UPDATE_BUTTON)
 
 
-    @timer
-    def complete_coming_soon_page(self) -> None:
-        '''Completes the Coming Soon page portion of a category build.'''
+    def _coming_soon_url(self) -> str:
+        '''Forms the URL to the Coming Soon page.'''
+        return "{root}?target=categories&id={id}".format(
+            root=os.environ.get("BACKEND_LANDING_URL"),
+            id=self.COMING_SOON_ID)
 
-        print("\n🐱  Completing Coming Soon Page")
-        _driver = self._driver
 
-        coming_soon_url = "{root}?target=categories&id=1845".format(
-                            root=os.environ.get("BACKEND_LANDING_URL"))
+    def _save_coming_soon(self) -> None:
+        '''Saves the Coming Soon page's changes & waits for it to reload.'''
+        _page = self._coming_soon_page
+        self._await(element_lacks_class(SAVE_CHANGES_BUTTON))
+        _page.element("SAVE_CHANGES_BUTTON").click()
+        self._await()
+        self._wait_for_save(SAVE_CHANGES_BUTTON)
+        # The save reloads the page:
+        _page.invalidate()
 
-        # Open a new tab to the 'Coming Soon' page:
-        _driver.execute_script("window.open('');")
-        coming_soon_window = _driver.window_handles[1]
-        _driver.switch_to.window(coming_soon_window)
-        _driver.get(coming_soon_url)
 
-        # [CHECK] Make sure new category button is loaded:
-        check_is_clickable(_driver, NEW_CATEGORY_BUTTON)
+    def _coming_soon_rows(self) -> list:
+        '''Reads the Coming Soon page's categories, in table order.
+
+        Returns
+        -------
+            list [tuple (str, str)]
+                The (title, category id) of each row.
+        '''
+        rows = read_all(self._driver, {
+            "titles": (POS_NAMES, '@title'),
+            "hrefs": (POS_NAMES, '@href'),
+        })
+        return [(title, (href or "").split('=')[-1])
+                for title, href in zip(rows["titles"], rows["hrefs"])]
+
+
+    def _create_category(self) -> None:
+        '''Adds the vendor's category on the Coming Soon page & stores its
+        category id.
+
+            * Used as a part of complete_coming_soon_page. *
+        '''
+        _driver = self._driver
+        _page = self._coming_soon_page
 
         # Click 'New category' button:
-        _new_cat_btn = _driver.find_element_by_xpath(NEW_CATEGORY_BUTTON)
-        _new_cat_btn.click()
+        _page.element("NEW_CATEGORY_BUTTON").click()
 
         # [CHECK] Make sure new category field is present:
-        check_condition(_driver, NEW_CATEGORY_FIELD)
+        _page.wait_for("NEW_CATEGORY_FIELD")
 
         # Enter brand name into new category field:
-        _new_cat_field = _driver.find_element_by_xpath(NEW_CATEGORY_FIELD)
-        _new_cat_field.send_keys(self._brand_name)
+        self._fill({"name": (NEW_CATEGORY_FIELD, self._brand_name)})
 
-        # Hit 'Save changes' button:
-        _save_btn = _driver.find_element_by_xpath(SAVE_CHANGES_BUTTON)
-        sleep(self.SUBMISSION_DELAY)
-        _save_btn.click()
-        sleep(self.SUBMISSION_DELAY)
-
-        # Wait for page to load after adding category:
-        wait_for_save(_driver, SAVE_CHANGES_BUTTON)
+        # Hit 'Save changes' & wait for page to load after adding category:
+        self._save_coming_soon()
 
         # [CHECK] Confirm element exists:
-        check_condition(_driver, FIRST_POS_NAME)
-        el = _driver.find_element_by_xpath(FIRST_POS_NAME)
-        assert el.get_attribute('title') == self._brand_name
+        _page.wait_for("FIRST_POS_NAME")
 
-        # Grab the first position's brand name:
-        _first_pos_bname = _driver.find_element_by_xpath(FIRST_POS_NAME)
+        # Grab the first position's brand name & link:
+        first_pos = read_fields(_driver, {
+            "title": (FIRST_POS_NAME, '@title'),
+            "href": (FIRST_POS_NAME, '@href'),
+        })
+        assert first_pos["title"] == self._brand_name
 
         # Store the category_id:
-        link_href = _first_pos_bname.get_attribute('href')
+        link_href = first_pos["href"]
         splitted = link_href.split('=')
         self._category_id = splitted[-1]
 
+        # Checkpoint the category id right away, so a failure from here on
+        #   can't lead to a duplicate category when resuming:
+        self._save_checkpoint()
+
+
+    @timer
+    def complete_coming_soon_page(self) -> None:
+        '''Completes the Coming Soon page portion of a category build.'''
+
+        print("\n🐱  Completing Coming Soon Page")
+        _driver = self._driver
+        _page = self._coming_soon_page
+
+        # Open a new tab to the 'Coming Soon' page:
+        self._coming_soon_window = self._open_window(_page,
+                                                     self._coming_soon_url())
+
+        # [CHECK] Make sure new category button is loaded:
+        _page.wait_for("NEW_CATEGORY_BUTTON", clickable=True)
+
+        # [CASE] Resuming after the category was created -> Don't create a
+        #   duplicate, just finish positioning it:
+        if self._category_id:
+            print(f"Category {self._category_id} already exists -- "
+                  "skipping creation.")
+            first_pos = read_fields(_driver, {
+                "title": (FIRST_POS_NAME, '@title'),
+            })
+            if first_pos["title"] != self._brand_name:
+                print("It's no longer in the first position -- please set "
+                      f"its position to {self.CATEGORY_POSITION} by hand.")
+                return
+        else:
+            self._create_category()
+
         # Change category position to 15,000:
-        _pos_div = _driver.find_element_by_xpath(FIRST_POS_DIV)
-        _pos_div.click()
-        _pos_input = _driver.find_element_by_xpath(FIRST_CAT_POS_INPUT)
-        _pos_input.send_keys('15000')
+        _page.element("FIRST_POS_DIV").click()
+        _page.element("FIRST_CAT_POS_INPUT").send_keys(self.CATEGORY_POSITION)
+
+        # Save changes & wait for page to load after entering the position:
+        self._save_coming_soon()
+
+
+    def _new_category_rows(self, names: list, existing: set) -> dict:
+        '''Finds the rows of the categories just added for the given names,
+        by title (see title_key) -- the newest, if a title shows up more
+        than once.
+
+        Returns
+        -------
+            dict
+                Maps each name found to its (row, category id).
+        '''
+        names = {title_key(name): name for name in names}
+        rows = {}
+        for row, (title, category_id) in \
+                enumerate(self._coming_soon_rows(), start=1):
+            name = names.get(title_key(title))
+            # [CASE] No link (so no id) yet, not ours, or already there:
+            if not category_id or name is None or category_id in existing:
+                continue
+            if name not in rows or int(category_id) > int(rows[name][1]):
+                rows[name] = (row, category_id)
+        return rows
+
+
+    @timer
+    def create_categories(self, brand_names: list, on_saved=None) -> dict:
+        '''Adds a Coming Soon category for each brand name in a single save,
+        then moves them all into position in a second one, so a batch of
+        vendors costs two Coming Soon saves rather than two per vendor.
+
+        The new categories are matched back to their brand names by title.
 
-        # Save changes:
-        _save_btn = _driver.find_element_by_xpath(SAVE_CHANGES_BUTTON)
-        sleep(self.SUBMISSION_DELAY)
-        _save_btn.click()
-        sleep(self.SUBMISSION_DELAY)
+        Parameters
+        ----------
+            brand_names : list [str]
+                The names of the categories to create (duplicates, including
+                names only differing by whitespace or HTML entities, are
+                only created once).
+
+            on_saved : callable, optional
+                Called with the {brand name: category id} of the categories
+                matched as soon as they're saved, before they're positioned
+                -- or with what was matched, if saving or matching them
+                fails. From then on the categories may exist, so they need
+                checkpointing.
+
+        Returns
+        -------
+            dict
+                Maps each brand name to its new category's id. Names whose
+                category couldn't be found after saving are left out.
+        '''
 
-        # Wait for page to load after entering the new position:
-        wait_for_save(_driver, SAVE_CHANGES_BUTTON)
+        print("\n🐱  Creating Coming Soon Categories")
+        _page = self._coming_soon_page
+        # (Names with the same title_key can't be told apart, so only the
+        #   first is created)
+        titles = {}
+        for name in brand_names:
+            if name:
+                titles.setdefault(title_key(name), name)
+        names = list(titles.values())
+        if not names:
+            return {}
+
+        _page.load(self._coming_soon_url())
+
+        # [CHECK] Make sure new category button is loaded:
+        _new_cat_btn = _page.wait_for("NEW_CATEGORY_BUTTON", clickable=True)
+
+        # Remember which categories were already there (ex. with the same
+        #   name), so they aren't mistaken for ours:
+        existing = {category_id for _, category_id in self._coming_soon_rows()}
+
+        # Add a new category row per brand name:
+        for _ in names:
+            _new_cat_btn.click()
+
+        # [CHECK] Make sure every new category field is present:
+        _page.wait_for("NEW_CATEGORY_FIELD_N", n=len(names))
+
+        # Enter the brand names & save them all at once:
+        self._fill({
+            f"name-{n}": (NEW_CATEGORY_FIELD_N.format(n=n), name)
+            for n, name in enumerate(names, start=1)
+        })
+
+        # Once saving starts the categories may exist, so hand over what's
+        #   found of them (if anything) before anything else can fail:
+        rows = {}
+        try:
+            self._save_coming_soon()
+            rows = self._new_category_rows(names, existing)
+        finally:
+            if on_saved is not None:
+                on_saved({name: category_id
+                          for name, (_, category_id) in rows.items()})
+
+        missing = [name for name in names if name not in rows]
+        if missing:
+            print(f"Couldn't find the new categories for: {', '.join(missing)}")
+        if not rows:
+            return {}
+
+        # Move every new category into position & save them all at once:
+        for row, _ in rows.values():
+            _page.element("POS_DIV", row=row).click()
+        self._fill({
+            f"position-{row}": (CAT_POS_INPUT.format(row=row),
+                                self.CATEGORY_POSITION)
+            for row, _ in rows.values()
+        })
+        self._save_coming_soon()
+
+        return {name: category_id for name, (_, category_id) in rows.items()}
 
 
     @timer
@@ -393,33 +1045,36 @@ class ApproveVendorProcess:
                                     cat_id=self._category_id)
 
         # Open a new tab to the newly created category page:
-        _driver.execute_script("window.open('');")
-        category_window = _driver.window_handles[2]
-        _driver.switch_to.window(category_window)
-        _driver.get(category_page_url)
+        _page = self._category_page
+        self._category_window = self._open_window(_page, category_page_url)
 
         # [CHECK] The category page successfully loaded:
-        check_condition(_driver, CLEAN_URL_FIELD)
+        _clean_url_field = _page.wait_for("CLEAN_URL_FIELD")
 
-        # (1) TODO: 
-        # Paste the description into the 'Description' textarea element:
+        # Read the current 'Clean URL' & 'Show search box' values in one go:
+        current = read_fields(_driver, {
+            "clean_url": (CLEAN_URL_FIELD, VALUE),
+            "show_search": (SHOW_SEARCH_BOX_SWITCH, '@checked'),
+        })
 
-        # (2) Complete the 'Clean URL' field:
-        _clean_url_field = _driver.find_element_by_xpath(CLEAN_URL_FIELD)
-        clean_value = _clean_url_field.get_attribute('value')
+        # (1) Complete the 'Clean URL' field:
+        clean_value = current["clean_url"]
 
         # [CASE] Current slug ends in '-' already:
         if (clean_value[-1] == '-'):
             clean_value = clean_value[ :-1]
         new_val = f"{clean_value}-wholesale"
+        fields = {"clean_url": (CLEAN_URL_FIELD, new_val)}
 
-        _clean_url_field.clear()
-        _clean_url_field.send_keys(new_val)
+        # (2) Paste the description into the 'Description' textarea element:
+        if self._company_description:
+            fields["description"] = (DESCRIPTION_TEXTAREA,
+                                     self._company_description)
+
+        self._fill(fields)
 
         # (3) Click 'Show search box' switch -> change to 'YES':
-        _show_search_switch = _driver\
-                                .find_element_by_xpath(SHOW_SEARCH_BOX_SWITCH)
-        checked = _show_search_switch.get_attribute('checked')
+        checked = current["show_search"]
         # [CASE] 'Show search box' switch is not set to 'YES':
         if not checked:
             js_script = """
@@ -431,13 +1086,13 @@ class ApproveVendorProcess:
 
             _driver.execute_script(js_script)
 
-        _clean_url_field = _driver.find_element_by_xpath(CLEAN_URL_FIELD)
-        sleep(self.SUBMISSION_DELAY)
+        self._await(element_lacks_class(CATEGORY_UPDATE_BUTTON))
         _clean_url_field.send_keys(Keys.RETURN)
-        sleep(self.SUBMISSION_DELAY)
+        self._await()
 
-        # Wait for page to save:
-        wait_for_save(_driver, CATEGORY_UPDATE_BUTTON)
+        # Wait for page to save (which reloads it):
+        self._wait_for_save(CATEGORY_UPDATE_BUTTON)
+        _page.invalidate()
 
 
     @timer
@@ -447,37 +1102,34 @@ class ApproveVendorProcess:
 
         print("\n🧼  Cleaning Up")
         _driver = self._driver
+        _page = self._account_page
 
-        # Close the Coming Soon window:
-        _driver.switch_to_window(_driver.window_handles[1])
-        sleep(self.SUBMISSION_DELAY)
-
-        _driver.close()
-        sleep(self.SUBMISSION_DELAY)
-
+        # Close the Coming Soon & Category windows:
+        self._close_opened_windows()
 
         # [CHECK] Confirm element exists:
-        _driver.switch_to_window(_driver.window_handles[0])
-        sleep(self.SUBMISSION_DELAY)
-        check_condition(_driver, VENDOR_CATEGORIES_FIELD)
-
-        _vendor_cat_field = _driver\
-                            .find_element_by_xpath(CATEGORY_INPUT_FIELD)
+        self._await()
+        # [CASE] Resumed run -> We aren't on the Company Details tab yet:
+        if not _driver.find_elements_by_xpath(VENDOR_CATEGORIES_FIELD):
+            _page.load(self._tab_url("vendor"))
+        # (select2 hides the field itself, so wait on its search input)
+        _vendor_cat_field = _page.wait_for("CATEGORY_INPUT_FIELD")
         _vendor_cat_field.send_keys(self._brand_name)
 
-        sleep(1)
+        # Wait for the autocomplete to suggest our category, then pick it:
+        autocomplete = (By.XPATH, CATEGORY_AUTOCOMPLETE_OPTION)
+        self._await(visibility_of_element_located(autocomplete), delay=1)
         _vendor_cat_field.send_keys(Keys.RETURN)
-        sleep(self.SUBMISSION_DELAY)
+        self._await(invisibility_of_element_located(autocomplete))
 
-        _vendor_url_field = _driver\
-                            .find_element_by_xpath(VENDOR_PAGE_URL_FIELD)
+        _vendor_url_field = _page.element("VENDOR_PAGE_URL_FIELD")
 
-        sleep(self.SUBMISSION_DELAY)
+        self._await(element_lacks_class(CD_UPDATE_BUTTON))
         _vendor_url_field.send_keys(Keys.RETURN)
-        sleep(self.SUBMISSION_DELAY)
+        self._await()
 
         # Wait for page to finish loading after saving changes:
-        wait_for_save(_driver, CD_UPDATE_BUTTON)
+        self._wait_for_save(CD_UPDATE_BUTTON)
 
 
     @timer
@@ -496,22 +1148,67 @@ class ApproveVendorProcess:
         web_url = self._website_url
         instagram = self._instagram_handle
 
-        add_vendor_to_db(profile_id, category_id, email, brand_name, location,
-                         web_url, instagram)
+        save = queue_vendor_for_db if self._write_behind else add_vendor_to_db
+        save(profile_id, category_id, email, brand_name, location, web_url,
+             instagram)
 
 
-    def run_all(self, email: str) -> None:
+    @timer
+    def run_all(self, email: str, login: bool = True,
+                resume: bool = False, steps: tuple = None) -> None:
         '''Runs the entire CAT build process.
         
         Parameters
         ----------
             email : str
                 The vendor's email address.
+
+            login : bool, optional
+                Whether to log into the backend first. Pass False when the
+                driver is already logged in & sitting on the landing page.
+                (default True)
+
+            resume : bool, optional
+                Whether to pick up from the vendor's last checkpoint, skipping
+                the steps that already completed. (default False)
+
+            steps : tuple [str], optional
+                Only run these steps (ex. to finish the rest later with
+                resume). The vendor's checkpoint is kept until every step
+                has completed. (default STEPS)
         '''
-        self.backend_admin_login()
-        self.vendor_email_search(email)
-        self.complete_vendor_account()
-        self.complete_coming_soon_page()
-        self.complete_category_page()
-        self.clean_up()
-        self.save_stats_to_db()
+        email = email.strip().lower()
+        self._completed_steps = []
+
+        # [CASE] Resuming -> Rehydrate our state from the last checkpoint:
+        if resume and self._restore_checkpoint(email):
+            print(f"\nResuming {email} -- skipping "
+                  f"{', '.join(self._completed_steps) or 'nothing'}.")
+        self._searched_email = email
+
+        if login:
+            self.backend_admin_login()
+
+        # [CASE] We have a second driver -> Run independent steps on it:
+        aux = None
+        if self._aux_driver is not None:
+            if login:
+                self._login_aux()
+            aux = self._spawn(self._aux_driver)
+
+        # Steps we weren't asked to run count as done, for scheduling:
+        skipped = [step for step in self.STEPS
+                   if steps is not None and step not in steps]
+        try:
+            StepScheduler(self, aux).run(self._completed_steps + skipped,
+                                         on_complete=self._complete_step)
+        finally:
+            if aux is not None:
+                try:
+                    aux._close_opened_windows()
+                except WebDriverException as err:
+                    print(f"Couldn't close the aux driver's windows: {err}")
+
+        # All done -> Nothing left to resume:
+        if all(step in self._completed_steps for step in self.STEPS):
+            self._checkpoints.clear(email)
@@ -0,0 +1,453 @@
+"""
+batch.py
+--------
+    This module fans a list of vendor emails out over a pool of parallel
+    webdriver workers, each running the full approval process on a warm,
+    logged-in session.
+"""
+import csv
+import queue
+import threading
+from collections import namedtuple
+from time import time
+
+import validators
+
+from procedures.approve_vendor import ApproveVendorProcess
+from procedures.session import SessionPool
+from utils.checkpoint import CheckpointStore
+from utils.database import close_vendor_writer, find_done_emails
+from utils.helper_funcs import title_key
+from utils.webdriver import MyWebDriver, PERFORMANCE
+
+
+# Default number of parallel Chrome workers for batch runs:
+DEFAULT_WORKERS = 2
+
+# The outcome of running the approval process for a single vendor:
+VendorResult = namedtuple("VendorResult",
+                          ["email", "success", "duration", "error",
+                           "skipped"],
+                          defaults=(False,))
+
+
+def load_vendor_emails(file_path: str) -> list:
+    '''Reads vendor email addresses from a CSV or newline separated file
+    (see parse_vendor_emails).
+
+    Parameters
+    ----------
+        file_path : str
+            The path to the file containing our vendor emails.
+
+    Returns
+    -------
+        list [str]
+    '''
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        return parse_vendor_emails(f)
+
+
+def parse_vendor_emails(lines) -> list:
+    '''Reads vendor email addresses from CSV or newline separated lines (ex.
+    an open file or sys.stdin).
+
+    Blank cells, duplicates and lines starting with '#' are skipped. Any cell
+    that isn't a valid email address (ex. a CSV header) is reported & ignored.
+
+    Parameters
+    ----------
+        lines : iterable [str]
+            The lines containing our vendor emails.
+
+    Returns
+    -------
+        list [str]
+    '''
+    emails = []
+    seen = set()
+
+    for row in csv.reader(lines):
+        for cell in row:
+            cell = cell.strip()
+            # [CASE] Empty cell or commented out line:
+            if not cell or cell.startswith('#'):
+                continue
+            # [CHECK] Cell contains an email address:
+            if not validators.email(cell):
+                print(f"Skipping '{cell}' -- not an email address.")
+                continue
+            email = cell.lower()
+            if email not in seen:
+                seen.add(email)
+                emails.append(email)
+
+    return emails
+
+
+class BatchApproveProcess:
+    """Class used to run the approval process for many vendors at once over
+    a pool of parallel webdriver workers.
+
+    Attributes:
+    ----------
+        workers : int, optional
+            The number of Chrome instances to run in parallel.
+            (default DEFAULT_WORKERS)
+
+        driver_factory : callable, optional
+            A callable returning a new selenium webdriver. Each worker logs
+            its driver in once & reuses it for every vendor it processes.
+            (default MyWebDriver using the given profile)
+
+        profile : str, optional
+            The driver profile used when no driver_factory is given.
+            (default PERFORMANCE)
+
+        safe_mode : bool, optional
+            Whether each vendor's process runs in safe mode. (default False)
+
+        resume : bool, optional
+            Whether vendors pick up from their last checkpoint, skipping the
+            steps a previous (failed) run already completed. (default False)
+
+        skip_done : bool, optional
+            Whether to check the batch against MongoDB first & skip vendors
+            already marked DONE. (default True)
+
+        step_hooks : list, optional
+            Step hooks handed to every vendor's process, ex. a shared
+            utils.metrics.MetricsCollector.
+
+        process_class : type, optional
+            The class run for each vendor. (default ApproveVendorProcess)
+
+        parallel_steps : bool, optional
+            Whether each worker also runs a second webdriver, so the steps of
+            a vendor that don't depend on each other run at the same time.
+            (default False)
+
+        batch_categories : bool, optional
+            Whether to create every vendor's Coming Soon category together:
+            the vendors' account steps run first, then all their categories
+            are added in one save & positioned in a second, and then each
+            vendor resumes from its checkpoint. (default False)
+
+    Methods:
+    -------
+        run(emails):
+            Runs the approval process for every email, returning a list of
+            VendorResult objects.
+
+        print_summary(results, elapsed):
+            Prints a per-vendor result summary and the aggregate throughput.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, driver_factory=None,
+                 safe_mode: bool = False, profile: str = PERFORMANCE,
+                 resume: bool = False, skip_done: bool = True,
+                 step_hooks: list = None,
+                 process_class: type = ApproveVendorProcess,
+                 parallel_steps: bool = False,
+                 batch_categories: bool = False):
+        self._workers = max(1, int(workers))
+        self._parallel_steps = parallel_steps
+        self._batch_categories = batch_categories
+        self._process_class = process_class
+        self._step_hooks = list(step_hooks or [])
+        self._skip_done = skip_done
+        self._safe_mode = safe_mode
+        self._resume = resume
+        self._driver_factory = driver_factory or \
+            (lambda: MyWebDriver(profile=profile).initialize_driver())
+        self._results: list = []
+        self._results_lock = threading.Lock()
+
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+
+    def _new_process(self, driver, aux_driver=None):
+        '''Creates the process run on a pooled driver.'''
+        return self._process_class(driver, safe_mode=self._safe_mode,
+                                   write_behind=True,
+                                   step_hooks=self._step_hooks,
+                                   aux_driver=aux_driver)
+
+
+    def _process_vendor(self, pool: SessionPool, email: str,
+                        resume: bool, steps: tuple = None) -> VendorResult:
+        '''Runs the approval process (or the given steps of it) for a single
+        vendor on a pooled, logged-in driver, capturing (rather than
+        raising) any errors.'''
+        start = time()
+        try:
+            with pool.session() as session:
+                self._new_process(session.driver, session.aux_driver)\
+                    .run_all(email, login=False, resume=resume, steps=steps)
+            return VendorResult(email, True, time() - start, None)
+        except Exception as err:
+            return VendorResult(email, False, time() - start, str(err))
+
+
+    def _worker(self, pool: SessionPool, jobs: queue.Queue, results: list,
+                label: str, **kwargs) -> None:
+        '''Pulls vendor emails off the job queue until it is empty.'''
+        while True:
+            try:
+                email = jobs.get_nowait()
+            except queue.Empty:
+                return
+
+            result = self._process_vendor(pool, email, **kwargs)
+            status = label if result.success else f"FAILED ({result.error})"
+            print(f"\n[{threading.current_thread().name}] {email}: {status}")
+
+            with self._results_lock:
+                results.append(result)
+            jobs.task_done()
+
+
+    def run(self, emails: list) -> list:
+        '''Runs the approval process for every given vendor email.
+
+        Parameters
+        ----------
+            emails : list [str]
+                The vendors' email addresses.
+
+        Returns
+        -------
+            list [VendorResult]
+                The results, in the same order as the given emails.
+        '''
+        self._results = []
+        order = {email: i for i, email in enumerate(emails)}
+
+        # [CHECK] Skip anyone who's already done -- before launching Chrome:
+        if self._skip_done:
+            done = self._find_done(emails)
+            self._results = [VendorResult(email, True, 0.0, None, True)
+                             for email in emails if email in done]
+            emails = [email for email in emails if email not in done]
+
+        worker_count = min(self._workers, len(emails))
+        if not worker_count:
+            return sorted(self._results, key=lambda r: order[r.email])
+
+        pool = SessionPool(worker_count, self._driver_factory,
+                           aux=self._parallel_steps)
+        try:
+            resume = self._resume
+            # [CASE] Batching categories -> Get everyone ready for their
+            #   category first, then finish them off from their checkpoints:
+            if self._batch_categories:
+                emails, durations = self._prepare_categories(pool, emails)
+                resume = True
+            else:
+                durations = {}
+
+            finished = []
+            self._run_workers(pool, emails, finished, "DONE", resume=resume)
+            self._results += [
+                r._replace(duration=r.duration + durations.get(r.email, 0.0))
+                for r in finished]
+        finally:
+            pool.close()
+            # Make sure every vendor's stats made it to the database:
+            close_vendor_writer()
+
+        return sorted(self._results, key=lambda r: order[r.email])
+
+
+    def _run_workers(self, pool: SessionPool, emails: list, results: list,
+                     label: str, **kwargs) -> None:
+        '''Starts the workers (each with a pooled session) & waits for them
+        to work through the given vendors.'''
+        jobs = queue.Queue()
+        for email in emails:
+            jobs.put(email)
+
+        threads = [
+            threading.Thread(target=self._worker,
+                             args=(pool, jobs, results, label),
+                             kwargs=kwargs,
+                             name=f"worker-{i + 1}", daemon=True)
+            for i in range(min(pool.size, len(emails)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+    def _prepare_categories(self, pool: SessionPool, emails: list) -> tuple:
+        '''Runs every vendor up to (but not including) the Coming Soon page,
+        then creates all of their categories together, checkpointing each
+        vendor's category id & the Coming Soon step as completed.
+
+        Vendors that fail are added to the results. Anyone whose category
+        couldn't be batched creates it themselves when they resume -- unless
+        the categories were saved but theirs couldn't be found, in which
+        case they fail (to be reconciled by hand) rather than risk a
+        duplicate. Each category id is checkpointed as soon as it's found,
+        so only positioning is left if a later step of the batch fails.
+
+        Returns
+        -------
+            tuple (list [str], dict)
+                The emails left to finish & the seconds each one has taken
+                so far.
+        '''
+        graph = self._process_class.STEP_GRAPH
+        coming_soon = "complete_coming_soon_page"
+        account_steps = tuple(
+            step for step in self._process_class.STEPS
+            if step != coming_soon
+            and coming_soon not in self._dependencies(graph, step))
+
+        prepared = []
+        self._run_workers(pool, emails, prepared, "READY",
+                          resume=self._resume, steps=account_steps)
+        self._results += [r for r in prepared if not r.success]
+        ready = [r.email for r in prepared if r.success]
+        durations = {r.email: r.duration for r in prepared}
+
+        # Find the brand names still needing a category. A name shared by
+        #   several vendors (see title_key) can't be told apart by title, so
+        #   those vendors create theirs themselves:
+        store = CheckpointStore()
+        checkpoints, titles = {}, {}
+        for email in ready:
+            checkpoint = store.load(email)
+            if not checkpoint \
+                    or coming_soon in checkpoint["completed"] \
+                    or checkpoint["state"].get("_category_id"):
+                continue
+            checkpoints[email] = checkpoint
+            name = checkpoint["state"].get("_brand_name")
+            if name:
+                titles.setdefault(title_key(name), []).append((name, email))
+        # (As {brand name: email})
+        names = dict(found[0] for found in titles.values() if len(found) == 1)
+
+        if names:
+            start = time()
+            # The categories matched once they were saved (None until then):
+            created = None
+
+            def checkpoint_ids(category_ids: dict) -> None:
+                '''Checkpoints each vendor's category id as soon as it
+                exists, so nobody creates it again.'''
+                nonlocal created
+                created = category_ids
+                for name, category_id in category_ids.items():
+                    checkpoint = checkpoints[names[name]]
+                    checkpoint["state"]["_category_id"] = category_id
+                    store.save(names[name], checkpoint["completed"],
+                               checkpoint["state"])
+
+            try:
+                with pool.session() as session:
+                    positioned = self._new_process(session.driver)\
+                        .create_categories(list(names),
+                                           on_saved=checkpoint_ids)
+            except Exception as err:
+                positioned = {}
+                if created is None:
+                    print(f"\nCouldn't create the categories together ({err})"
+                          " -- each vendor will create their own.")
+                else:
+                    print(f"\nCouldn't position the new categories ({err}) "
+                          "-- each vendor will position their own.")
+
+            # The positioned vendors are done with the Coming Soon page:
+            for name in positioned:
+                checkpoint = checkpoints[names[name]]
+                store.save(names[name],
+                           checkpoint["completed"] + [coming_soon],
+                           checkpoint["state"])
+
+            # Share the time spent between the vendors it was spent on:
+            share = (time() - start) / len(names)
+            for email in names.values():
+                durations[email] += share
+
+            # [CASE] Saved, but some categories couldn't be matched -> They
+            #   may well exist, so rather than create them again, leave them
+            #   to be reconciled by hand:
+            if created is not None:
+                unmatched = {email for name, email in names.items()
+                             if name not in created}
+                for email in unmatched:
+                    print(f"\n{email}: FAILED (couldn't find their new "
+                          "category -- please check the Coming Soon page)")
+                self._results += [
+                    VendorResult(email, False, durations[email],
+                                 "Couldn't find the new category on the "
+                                 "Coming Soon page")
+                    for email in ready if email in unmatched]
+                ready = [email for email in ready if email not in unmatched]
+
+        return ready, durations
+
+
+    @staticmethod
+    def _dependencies(graph: dict, step: str) -> set:
+        '''Returns every step the given one (indirectly) requires.'''
+        found, stack = set(), list(graph[step].requires)
+        while stack:
+            required = stack.pop()
+            if required in found or required not in graph:
+                continue
+            found.add(required)
+            stack.extend(graph[required].requires)
+        return found
+
+
+    @staticmethod
+    def _find_done(emails: list) -> set:
+        '''Returns the emails already marked DONE in MongoDB (or none of
+        them, if the database can't be reached).'''
+        try:
+            done = find_done_emails(emails)
+        except Exception as err:
+            print(f"\nCouldn't check MongoDB for finished vendors: {err}")
+            return set()
+        if done:
+            print(f"\nSkipping {len(done)} vendor(s) that are already done.")
+        return done
+
+
+    @staticmethod
+    def print_summary(results: list, elapsed: float) -> None:
+        '''Prints a per-vendor result summary and the aggregate throughput.
+
+        Parameters
+        ----------
+            results : list [VendorResult]
+                The results returned by run().
+
+            elapsed : float
+                The total wall time (in seconds) of the batch.
+        '''
+        processed = [r for r in results if not r.skipped]
+        succeeded = [r for r in processed if r.success]
+
+        print("\n ---- Batch Summary ----")
+        for r in results:
+            if r.skipped:
+                print(f"SKIPPED {r.email} (already done)")
+                continue
+            status = "OK    " if r.success else "FAILED"
+            line = f"{status} {r.email} ({round(r.duration, 2)} sec.)"
+            if r.error:
+                line += f" -- {r.error}"
+            print(line)
+
+        per_minute = (len(succeeded) / elapsed * 60) if elapsed else 0.0
+        print(f"\n{len(succeeded)}/{len(processed)} vendors completed in "
+              f"{round(elapsed, 3)} seconds "
+              f"({round(per_minute, 2)} vendors/min).")
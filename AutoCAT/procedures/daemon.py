@@ -0,0 +1,415 @@
+"""
+daemon.py
+---------
+    This module keeps a pool of warm, logged in webdrivers working through a
+    continuous feed of vendors -- batch files dropped into a watched folder,
+    or the shared MongoDB work queue -- until it's stopped. Drivers that
+    outgrow their RecyclePolicy (memory, page loads, vendors) are swapped for
+    fresh ones between vendors, so throughput holds steady over long runs.
+"""
+import csv
+import itertools
+import os
+import queue
+import shutil
+import threading
+from time import time
+
+from procedures.approve_vendor import ApproveVendorProcess
+from procedures.batch import VendorResult, load_vendor_emails
+from procedures.session import SessionPool
+from procedures.work_queue import DEFAULT_POLL_INTERVAL, QueueApproveProcess
+from utils.resources import policy_from_env
+from utils.webdriver import MyWebDriver, PERFORMANCE
+
+
+# Seconds between the daemon's status reports:
+DEFAULT_STATUS_INTERVAL = 300
+
+# How many finished steps (the latest) the daemon's step reporters keep for
+#   their summaries, so they don't grow without end:
+MAX_REPORTED_STEPS = 10000
+
+# Batch files the daemon picks up from its watched folder:
+BATCH_SUFFIXES = (".csv", ".txt")
+
+# Sub-folders (of the watched folder) for batch files being worked on &
+#   finished ones (along with their results):
+PROCESSING_DIR = "processing"
+DONE_DIR = "done"
+
+
+def _unique_name(directory: str, name: str) -> str:
+    '''Returns the file name, numbered (ex. 'vendors.2.csv') if the folder
+    already has a file by that name.'''
+    stem, suffix = os.path.splitext(name)
+    unique = name
+    for n in itertools.count(2):
+        if not os.path.exists(os.path.join(directory, unique)):
+            return unique
+        unique = f"{stem}.{n}{suffix}"
+
+
+class ApprovalDaemon:
+    """Class used to run the approval process for a continuous feed of
+    vendors on long-lived, warm webdrivers.
+
+    With a watched folder, each batch file (CSV / newline separated, see
+    load_vendor_emails) dropped into it is moved to its 'processing' folder
+    and its vendors are handed to the workers. A file is only picked up once
+    its size & modification time have held steady for a poll, so one still
+    being written isn't read half way -- writing it under another name (or
+    elsewhere) then renaming it into the folder avoids the wait. Once they're all done, the
+    file moves to the 'done' folder next to a '.results.csv' of how each
+    vendor went. Files left in 'processing' (ex. by a crash) are picked up
+    again on start, resuming each vendor from its checkpoint.
+
+    Without one, the workers claim vendors from the shared MongoDB work queue
+    and keep waiting for new ones once it's empty.
+
+    Attributes:
+    ----------
+        workers : int, optional
+            The number of Chrome instances to run in parallel. (default 1)
+
+        watch_dir : str, optional
+            The folder to watch for batch files. (default None, ie. work the
+            MongoDB queue)
+
+        driver_factory : callable, optional
+            A callable returning a new selenium webdriver.
+            (default MyWebDriver using the given profile)
+
+        profile : str, optional
+            The driver profile used when no driver_factory is given.
+            (default PERFORMANCE)
+
+        recycle_policy : utils.resources.RecyclePolicy, optional
+            When to recycle each worker's webdriver(s) between vendors.
+            (default policy_from_env())
+
+        poll_interval : float, optional
+            Seconds between checks for new batch files / queued vendors.
+            (default DEFAULT_POLL_INTERVAL)
+
+        status_interval : float, optional
+            Seconds between status reports. (default DEFAULT_STATUS_INTERVAL)
+
+        step_hooks : list, optional
+            Step hooks handed to every vendor's process, ex. a shared
+            utils.metrics.MetricsCollector.
+
+        parallel_steps : bool, optional
+            Whether each worker also runs a second webdriver, so the steps of
+            a vendor that don't depend on each other run at the same time.
+            (default False)
+
+        retry_failed : bool, optional
+            Without a watched folder, whether to put the queue's FAILED
+            vendors back in it before starting. (default False)
+
+        safe_mode : bool, optional
+            Whether each vendor's process runs in safe mode. (default False)
+
+    Methods:
+    -------
+        run():
+            Processes vendors until stopped, returning a list of
+            VendorResult objects.
+
+        stop():
+            Asks the workers to stop once their current vendor is done.
+
+        print_status():
+            Prints the vendors processed so far & each worker's resource use.
+    """
+
+    def __init__(self, workers: int = 1, watch_dir: str = None,
+                 driver_factory=None, profile: str = PERFORMANCE,
+                 recycle_policy=None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 status_interval: float = DEFAULT_STATUS_INTERVAL,
+                 step_hooks: list = None, parallel_steps: bool = False,
+                 retry_failed: bool = False, safe_mode: bool = False):
+        self._workers = max(1, int(workers))
+        self._watch_dir = watch_dir
+        self._driver_factory = driver_factory or \
+            (lambda: MyWebDriver(profile=profile).initialize_driver())
+        self._recycle_policy = recycle_policy or policy_from_env()
+        self._poll_interval = poll_interval
+        self._status_interval = status_interval
+        self._step_hooks = list(step_hooks or [])
+        self._parallel_steps = parallel_steps
+        self._retry_failed = retry_failed
+        self._safe_mode = safe_mode
+        self._stop = threading.Event()
+        self._started = time()
+
+        self._pool = None
+        self._queue_process = None
+        self._results: list = []
+        # The batch files being worked on, as {batch id: (file name, emails
+        #   left, results)}:
+        self._batches: dict = {}
+        self._batch_ids = itertools.count(1)
+        # The (size, modification time) of each batch file in the watched
+        #   folder at the last poll:
+        self._file_stats: dict = {}
+        self._lock = threading.Lock()
+
+    @property
+    def recycle_policy(self):
+        return self._recycle_policy
+
+
+    def stop(self) -> None:
+        '''Asks the workers to stop once their current vendor is done.'''
+        self._stop.set()
+        if self._queue_process is not None:
+            self._queue_process.stop()
+
+
+    def run(self) -> list:
+        '''Processes vendors until stopped (ex. with Ctrl+C).
+
+        Returns
+        -------
+            list [VendorResult]
+                The results, in the order the vendors finished.
+        '''
+        print(f"\nDaemon started with {self._workers} worker(s) -- "
+              f"recycling drivers past {self._describe_policy()}.")
+        self._started = time()
+        reporter = threading.Thread(target=self._report_status,
+                                    name="status", daemon=True)
+        reporter.start()
+        try:
+            if self._watch_dir is None:
+                return self._run_queue()
+            return self._run_folder()
+        finally:
+            self._stop.set()
+            self.print_status()
+
+
+    def _describe_policy(self) -> str:
+        policy = self._recycle_policy
+        limits = [f"{policy.max_rss_mb} MB" if policy.max_rss_mb else None,
+                  f"{policy.max_page_loads} page loads"
+                  if policy.max_page_loads else None,
+                  f"{policy.max_vendors} vendors"
+                  if policy.max_vendors else None]
+        return ", ".join(limit for limit in limits if limit) or "nothing"
+
+
+    def _run_queue(self) -> list:
+        '''Works the shared MongoDB queue, waiting for new vendors.'''
+        self._queue_process = QueueApproveProcess(
+            workers=self._workers, driver_factory=self._driver_factory,
+            wait=True, poll_interval=self._poll_interval,
+            step_hooks=self._step_hooks,
+            parallel_steps=self._parallel_steps,
+            recycle_policy=self._recycle_policy,
+            retry_failed=self._retry_failed, safe_mode=self._safe_mode)
+        # Run it off the main thread, so Ctrl+C lets the workers finish
+        #   their current vendors:
+        worker = threading.Thread(target=self._queue_process.run,
+                                  name="queue", daemon=True)
+        worker.start()
+        try:
+            while worker.is_alive():
+                worker.join(timeout=1)
+        except KeyboardInterrupt:
+            print("\nStopping once the current vendors are done . . .")
+            self.stop()
+            worker.join()
+
+        self._results = self._queue_process.results
+        return self._results
+
+
+    def _run_folder(self) -> list:
+        '''Watches the folder for batch files & works their vendors.'''
+        processing = os.path.join(self._watch_dir, PROCESSING_DIR)
+        os.makedirs(processing, exist_ok=True)
+        os.makedirs(os.path.join(self._watch_dir, DONE_DIR), exist_ok=True)
+
+        jobs = queue.Queue()
+        # [CASE] Files left over from a previous run -> Pick them up again:
+        for name in sorted(os.listdir(processing)):
+            self._add_batch(name, jobs)
+
+        self._pool = SessionPool(self._workers, self._driver_factory,
+                                 aux=self._parallel_steps,
+                                 recycle_policy=self._recycle_policy)
+        threads = [
+            threading.Thread(target=self._worker, args=(jobs,),
+                             name=f"worker-{i + 1}", daemon=True)
+            for i in range(self._workers)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            while not self._stop.is_set():
+                for name in self._new_batch_files():
+                    self._pick_up_batch(name, jobs)
+                self._stop.wait(self._poll_interval)
+        except KeyboardInterrupt:
+            print("\nStopping once the current vendors are done . . .")
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            self._pool.close()
+            self._pool = None
+
+        return self._results
+
+
+    def _new_batch_files(self) -> list:
+        '''Returns the batch files dropped into the watched folder that are
+        no longer being written (unchanged since the last poll), oldest
+        first.'''
+        stats = {}
+        for name in os.listdir(self._watch_dir):
+            path = os.path.join(self._watch_dir, name)
+            if not name.lower().endswith(BATCH_SUFFIXES) \
+                    or not os.path.isfile(path):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            stats[name] = (stat.st_size, stat.st_mtime_ns)
+
+        # [CHECK] Unchanged since the last poll:
+        names = [name for name, stat in stats.items()
+                 if self._file_stats.get(name) == stat]
+        self._file_stats = stats
+        return sorted(names, key=lambda name: stats[name][1])
+
+
+    def _pick_up_batch(self, name: str, jobs: queue.Queue) -> None:
+        '''Moves a batch file dropped into the watched folder to the
+        'processing' folder (renamed if a file of the same name is still
+        being worked on) & queues up its vendors.'''
+        processing = os.path.join(self._watch_dir, PROCESSING_DIR)
+        moved = _unique_name(processing, name)
+        os.replace(os.path.join(self._watch_dir, name),
+                   os.path.join(processing, moved))
+        self._add_batch(moved, jobs)
+
+
+    def _add_batch(self, name: str, jobs: queue.Queue) -> None:
+        '''Queues up a batch file's vendors (the file being in the
+        'processing' folder).'''
+        path = os.path.join(self._watch_dir, PROCESSING_DIR, name)
+        try:
+            emails = load_vendor_emails(path)
+        except (OSError, UnicodeDecodeError) as err:
+            print(f"\nCouldn't read batch file '{name}': {err}")
+            emails = []
+
+        print(f"\nPicked up '{name}' ({len(emails)} vendors).")
+        with self._lock:
+            batch_id = next(self._batch_ids)
+            self._batches[batch_id] = (name, len(emails), [])
+        if not emails:
+            self._finish_batch(batch_id)
+            return
+        for email in emails:
+            jobs.put((batch_id, email))
+
+
+    def _worker(self, jobs: queue.Queue) -> None:
+        '''Processes queued vendors until the daemon is stopped.'''
+        while not self._stop.is_set():
+            try:
+                batch_id, email = jobs.get(timeout=self._poll_interval)
+            except queue.Empty:
+                continue
+
+            result = self._process_vendor(email)
+            status = "DONE" if result.success else f"FAILED ({result.error})"
+            print(f"\n[{threading.current_thread().name}] {email}: {status}")
+
+            with self._lock:
+                self._results.append(result)
+                name, left, results = self._batches[batch_id]
+                results.append(result)
+                self._batches[batch_id] = (name, left - 1, results)
+                finished = left == 1
+            if finished:
+                self._finish_batch(batch_id)
+
+
+    def _process_vendor(self, email: str) -> VendorResult:
+        '''Runs the approval process for a single vendor on a pooled driver,
+        capturing (rather than raising) any errors.'''
+        start = time()
+        try:
+            with self._pool.session() as session:
+                # Resume, in case the vendor was interrupted last time:
+                ApproveVendorProcess(session.driver,
+                                     safe_mode=self._safe_mode,
+                                     step_hooks=self._step_hooks,
+                                     aux_driver=session.aux_driver)\
+                    .run_all(email, login=False, resume=True)
+            return VendorResult(email, True, time() - start, None)
+        except Exception as err:
+            return VendorResult(email, False, time() - start, str(err))
+
+
+    def _finish_batch(self, batch_id: int) -> None:
+        '''Moves a finished batch file to the 'done' folder, alongside its
+        results.'''
+        with self._lock:
+            name, _, results = self._batches.pop(batch_id)
+        done_dir = os.path.join(self._watch_dir, DONE_DIR)
+        # (Renamed if an earlier batch of the same name is already done)
+        done_name = _unique_name(done_dir, name)
+        with open(os.path.join(done_dir, f"{done_name}.results.csv"), "w",
+                  newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["email", "success", "duration", "error"])
+            for r in results:
+                writer.writerow([r.email, r.success, round(r.duration, 2),
+                                 r.error or ""])
+        shutil.move(os.path.join(self._watch_dir, PROCESSING_DIR, name),
+                    os.path.join(done_dir, done_name))
+
+        succeeded = sum(1 for r in results if r.success)
+        print(f"\nFinished '{name}': {succeeded}/{len(results)} vendors "
+              f"completed.")
+
+
+    def _report_status(self) -> None:
+        '''Prints the daemon's status every status_interval seconds.'''
+        while not self._stop.wait(self._status_interval):
+            self.print_status()
+
+
+    def print_status(self) -> None:
+        '''Prints the vendors processed so far & each worker's resource
+        use.'''
+        if self._queue_process is not None:
+            results = self._queue_process.results
+        else:
+            with self._lock:
+                results = list(self._results)
+        succeeded = sum(1 for r in results if r.success)
+        elapsed = time() - self._started
+        per_minute = succeeded / elapsed * 60 if elapsed else 0.0
+
+        print(f"\n ---- Daemon Status ({round(elapsed / 60, 1)} min.) ----")
+        print(f"{succeeded}/{len(results)} vendors completed "
+              f"({round(per_minute, 2)} vendors/min).")
+
+        pool = self._pool if self._queue_process is None \
+            else self._queue_process.pool
+        for i, stats in enumerate(pool.stats() if pool else []):
+            memory = f"{stats['rss_mb']} MB, {stats['cpu_percent']}% CPU" \
+                if stats["rss_mb"] is not None else "not running"
+            print(f"worker-{i + 1}: {memory}, {stats['page_loads']} page "
+                  f"loads / {stats['vendors']} vendors on this driver, "
+                  f"recycled {stats['recycles']}x")
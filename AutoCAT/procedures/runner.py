@@ -0,0 +1,201 @@
+"""
+runner.py
+---------
+    The runs shared by both entry points (the Gooey GUI in app.py & the
+    command line in cli.py): a single vendor, a batch of vendors, or the
+    shared work queue.
+"""
+from time import time
+
+import validators
+
+from pages.locators import get_registry
+from procedures.approve_vendor import ApproveVendorProcess
+from procedures.batch import BatchApproveProcess
+from procedures.work_queue import QueueApproveProcess
+from utils.database import enqueue_vendors
+from utils.metrics import MetricsCollector
+from utils.profiler import ResourceProfiler
+from utils.tracing import NetworkTracer
+from utils.webdriver import INTERACTIVE, PERFORMANCE, MyWebDriver
+
+
+def step_hooks(profile_resources: bool = False,
+               trace_network: bool = False, max_finished: int = None) -> list:
+    '''Returns the step hooks for a run: a metrics collector first, then a
+    resource profiler and / or network tracer if asked for (keeping the
+    latest `max_finished` steps for their summaries, or every one).'''
+    hooks = [MetricsCollector()]
+    if profile_resources:
+        hooks.append(ResourceProfiler(max_finished=max_finished))
+    if trace_network:
+        hooks.append(NetworkTracer(max_finished=max_finished))
+    return hooks
+
+
+def driver_factory(profile: str, trace_network: bool = False):
+    '''Returns a callable launching webdrivers with the given profile (&
+    tracing, if asked for).'''
+    return lambda: MyWebDriver(profile=profile,
+                               trace=trace_network).initialize_driver()
+
+
+def report_metrics(metrics: MetricsCollector, *reporters) -> None:
+    '''Prints the step metrics (& any locator fallbacks hit), exporting the
+    metrics as JSON / Prometheus files. Any other reporters (ex. a
+    ResourceProfiler or NetworkTracer) are printed & exported too.'''
+    metrics.print_summary()
+    get_registry().print_report()
+    try:
+        paths = metrics.export()
+        print(f"\nMetrics written to: {', '.join(paths)}")
+    except OSError as err:
+        print(f"\nCouldn't write the metrics files: {err}")
+
+    for reporter in reporters:
+        reporter.print_summary()
+        try:
+            reporter.export()
+            print(f"\n{type(reporter).__name__} output written to: "
+                  f"{reporter.directory}")
+        except OSError as err:
+            print(f"\nCouldn't write the {type(reporter).__name__} output: "
+                  f"{err}")
+
+
+def run_queue(workers: int, profile: str = None,
+              parallel_steps: bool = False, start: float = None,
+              profile_resources: bool = False,
+              trace_network: bool = False,
+              retry_failed: bool = False,
+              safe_mode: bool = False) -> list:
+    '''Works through the shared MongoDB work queue with the other workers,
+    first putting the vendors that failed back in it with `retry_failed`.
+    Vendors always resume from their checkpoints (they may have been
+    reclaimed from a worker that died).
+
+    Returns
+    -------
+        list [VendorResult]
+    '''
+    start = start or time()
+    hooks = step_hooks(profile_resources, trace_network)
+
+    print(f"\nProcessing the vendor work queue over {workers} workers . . .")
+    results = QueueApproveProcess(workers=workers,
+                                  driver_factory=driver_factory(
+                                      profile or PERFORMANCE, trace_network),
+                                  step_hooks=hooks,
+                                  parallel_steps=parallel_steps,
+                                  retry_failed=retry_failed,
+                                  safe_mode=safe_mode)\
+                .run()
+    BatchApproveProcess.print_summary(results, time() - start)
+    report_metrics(*hooks)
+    return results
+
+
+def enqueue_batch(emails: list) -> int:
+    '''Adds the vendors to the shared work queue (for the queue workers to
+    pick up), returning how many were added.'''
+    added = enqueue_vendors(emails)
+    print(f"\nAdded {added} of {len(emails)} vendors to the work queue "
+          f"({len(emails) - added} were already there).")
+    return added
+
+
+def run_batch(emails: list, workers: int, profile: str = None,
+              safe_mode: bool = False, resume: bool = False,
+              parallel_steps: bool = False, batch_categories: bool = False,
+              start: float = None, profile_resources: bool = False,
+              trace_network: bool = False) -> list:
+    '''Fans the vendors out over a pool of parallel workers.
+
+    Returns
+    -------
+        list [VendorResult]
+
+    Raises
+    ------
+        ValueError
+            When there are no vendor email addresses to process.
+    '''
+    start = start or time()
+    if not emails:
+        print("Batch doesn't contain any vendor email addresses!")
+        raise ValueError
+
+    hooks = step_hooks(profile_resources, trace_network)
+    print(f"\nLaunching Approval Process for {len(emails)} vendors "
+          f"over {workers} workers . . .")
+    batch = BatchApproveProcess(workers=workers,
+                                driver_factory=driver_factory(
+                                    profile or PERFORMANCE, trace_network),
+                                safe_mode=safe_mode,
+                                resume=resume,
+                                step_hooks=hooks,
+                                parallel_steps=parallel_steps,
+                                batch_categories=batch_categories)
+    results = batch.run(emails)
+    batch.print_summary(results, time() - start)
+    report_metrics(*hooks)
+    return results
+
+
+def run_vendor(email: str, profile: str = None, safe_mode: bool = False,
+               resume: bool = False, parallel_steps: bool = False,
+               start: float = None, warm=None,
+               profile_resources: bool = False,
+               trace_network: bool = False) -> None:
+    '''Runs the approval process for a single vendor. The browser is left
+    open for review afterwards with the 'interactive' profile (the default).
+
+    A `warm` procedures.warm_start.WarmHandoff (ex. from the GUI's warm
+    start) is used instead of launching a new browser, skipping the login
+    when it's logged in already (it isn't traced, so don't pass one with
+    `trace_network`).
+
+    Raises
+    ------
+        ValueError
+            When the given vendor isn't an email address.
+    '''
+    start = start or time()
+    profile = profile or INTERACTIVE
+
+    # [CHECK] Validation for Vendor Emails:
+    if (not validators.email(email or "")):
+        print("Vendor field may only contain email addresses!")
+        raise ValueError
+
+    print("\nLaunching Approval Process . . .")
+
+    hooks = step_hooks(profile_resources, trace_network)
+    # Initialize our WebDriver + Procedures classes:
+    if warm is not None:
+        driver = warm.driver
+    else:
+        driver = driver_factory(profile, trace_network)()
+    # [CASE] Parallel steps --> Run the independent ones in a headless
+    #   second browser:
+    aux_driver = driver_factory(PERFORMANCE, trace_network)() \
+        if parallel_steps else None
+    approve = ApproveVendorProcess(driver, safe_mode=safe_mode,
+                                   step_hooks=hooks,
+                                   aux_driver=aux_driver)
+
+    # Run all procedures:
+    try:
+        # A logged in warm driver can skip the login (unless there's an aux
+        #   driver, which is logged in alongside it):
+        login = warm is None or not warm.logged_in or aux_driver is not None
+        approve.run_all(email, resume=resume, login=login)
+    finally:
+        if aux_driver is not None:
+            aux_driver.quit()
+        # Only the interactive window stays open, for review:
+        if profile != INTERACTIVE:
+            driver.quit()
+        report_metrics(*hooks)
+    delta = round(time() - start, 3)
+    print(f"\n ---- Completed in {delta} seconds total. ----")
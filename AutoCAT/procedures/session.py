@@ -0,0 +1,327 @@
+"""
+session.py
+----------
+    This module keeps webdrivers logged into the backend between vendors, so
+    a warm driver can process vendors back-to-back.
+"""
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from selenium.common.exceptions import WebDriverException
+
+from procedures.approve_vendor import ApproveVendorProcess
+from utils.cookie_cache import CookieCache, share_session
+from utils.metrics import instrument_driver, page_load_count
+from utils.resources import ResourceMonitor, recycle_reason
+from utils.webdriver import MyWebDriver
+from xpaths.approved_paths import SEARCH_IN_BUTTON
+
+
+class DriverSession:
+    """A webdriver that logs into the backend once and is returned to a
+    clean, single-tab state on the landing page before every vendor.
+
+    Attributes:
+    ----------
+        driver_factory : callable, optional
+            A callable returning a new selenium webdriver.
+            (default MyWebDriver)
+
+        aux : bool, optional
+            Whether to also keep a second, auxiliary webdriver logged in
+            (sharing the first one's cookies), for running independent steps
+            of the process at the same time. (default False)
+
+        recycle_policy : utils.resources.RecyclePolicy, optional
+            When given, the webdriver(s) are quit & relaunched between
+            vendors once they pass any of the policy's limits (memory, page
+            loads or vendors). (default None, ie. never)
+
+    Methods:
+    -------
+        start():
+            Launches the webdriver (if it isn't running already).
+
+        login():
+            Logs the webdriver into the backend.
+
+        prepare():
+            Closes any extra windows and makes sure we're logged in & on the
+            backend landing page, logging in again if the session expired.
+
+        close():
+            Quits the webdriver(s).
+
+        stats():
+            Returns the session's vendor & page load counts, recycles and
+            current resource use.
+    """
+
+    def __init__(self, driver_factory=None, aux: bool = False,
+                 recycle_policy=None):
+        self._driver_factory = driver_factory or \
+                               (lambda: MyWebDriver().initialize_driver())
+        self._driver = None
+        self._aux = aux
+        self._aux_driver = None
+        self._logged_in: bool = False
+        self._logins: int = 0
+        self._recycle_policy = recycle_policy
+        self._monitor = ResourceMonitor()
+        # Vendors processed on the current driver, & times it was recycled:
+        self._vendors: int = 0
+        self._recycles: int = 0
+
+
+    @property
+    def driver(self):
+        return self.start()
+
+    @property
+    def aux_driver(self):
+        '''The logged in auxiliary webdriver, or None if we don't keep one.'''
+        return self._aux_driver
+
+    @property
+    def logins(self) -> int:
+        '''The number of times this session has had to log in.'''
+        return self._logins
+
+    @property
+    def recycles(self) -> int:
+        '''The number of times this session's webdriver was recycled.'''
+        return self._recycles
+
+
+    def start(self):
+        '''Launches the webdriver (if it isn't running already).'''
+        if self._driver is None:
+            # (Instrumented so we can count its page loads)
+            self._driver = instrument_driver(self._driver_factory())
+            self._logged_in = False
+            self._vendors = 0
+        return self._driver
+
+
+    def login(self) -> None:
+        '''Logs the webdriver into the backend.'''
+        _driver = self.start()
+        ApproveVendorProcess(_driver).backend_admin_login()
+
+        # [CHECK] backend_admin_login bails out early on missing credentials:
+        if not _driver.find_elements_by_xpath(SEARCH_IN_BUTTON):
+            raise RuntimeError("Backend login failed!")
+
+        self._logged_in = True
+        self._logins += 1
+
+        if self._aux:
+            self._login_aux()
+
+
+    def _login_aux(self) -> None:
+        '''Launches the auxiliary webdriver (if it isn't running already) &
+        logs it in with the main webdriver's cookies.'''
+        if self._aux_driver is None:
+            self._aux_driver = instrument_driver(self._driver_factory())
+        landing_url = os.environ.get("BACKEND_LANDING_URL")
+        if not share_session(self._driver, self._aux_driver, landing_url,
+                             ApproveVendorProcess.is_logged_in):
+            ApproveVendorProcess(self._aux_driver).backend_admin_login()
+
+
+    @staticmethod
+    def _reset_windows(_driver) -> None:
+        '''Closes every window but the first & switches back to it.'''
+        handles = _driver.window_handles
+        for handle in handles[1:]:
+            _driver.switch_to.window(handle)
+            _driver.close()
+        _driver.switch_to.window(handles[0])
+
+
+    def _on_landing_page(self) -> bool:
+        '''Loads the backend landing page, returning whether we're still
+        logged in (ie. weren't bounced to the login form).'''
+        load_dotenv()
+        _driver = self._driver
+        _driver.get(os.environ.get("BACKEND_LANDING_URL"))
+        return ApproveVendorProcess.is_logged_in(_driver)
+
+
+    def prepare(self) -> None:
+        '''Returns the webdriver to a single tab, logged in & sitting on the
+        backend landing page, ready for the next vendor.'''
+        # [CASE] The webdriver has outgrown our policy -> Swap it out:
+        if self._driver is not None and self._recycle_policy is not None:
+            reason = recycle_reason(self._recycle_policy, self._sample(),
+                                    self._page_loads(), self._vendors)
+            if reason:
+                self.recycle(reason)
+
+        self.start()
+        self._vendors += 1
+        try:
+            self._reset_windows(self._driver)
+            if self._aux_driver is not None:
+                self._reset_windows(self._aux_driver)
+            # [CASE] Fresh login -> We're already on the landing page:
+            if not self._logged_in:
+                self.login()
+                return
+            # [CASE] Session expired -> Log in again:
+            if not self._on_landing_page():
+                print("\nBackend session expired -- logging in again.")
+                CookieCache().clear()
+                self.login()
+        except WebDriverException:
+            # [CASE] The browser crashed or was closed -> Start over:
+            print("\nWebdriver is unresponsive -- restarting it.")
+            self.close()
+            self.start()
+            self.login()
+
+
+    def _page_loads(self) -> int:
+        '''Returns the page loads of the busiest of our webdrivers.'''
+        return max(page_load_count(self._driver),
+                   page_load_count(self._aux_driver))
+
+
+    def _sample(self):
+        '''Samples the resources used by the session's webdriver(s).'''
+        return self._monitor.sample(self._driver, self._aux_driver)
+
+
+    def recycle(self, reason: str = "") -> None:
+        '''Quits the webdriver(s), to be relaunched (& logged in) fresh by
+        the next prepare().'''
+        print(f"\nRecycling the webdriver{f' ({reason})' if reason else ''}.")
+        self.close()
+        self._recycles += 1
+
+
+    def stats(self) -> dict:
+        '''Returns the session's vendor & page load counts (on its current
+        webdriver, or the busier of the two), recycles and current resource
+        use.'''
+        sample = self._sample() if self._driver is not None else None
+        return {
+            "vendors": self._vendors,
+            "page_loads": self._page_loads(),
+            "recycles": self._recycles,
+            "rss_mb": sample.rss_mb if sample else None,
+            "cpu_percent": sample.cpu_percent if sample else None,
+        }
+
+
+    def close(self) -> None:
+        '''Quits the webdriver(s).'''
+        for _driver in (self._driver, self._aux_driver):
+            if _driver is not None:
+                try:
+                    _driver.quit()
+                except WebDriverException:
+                    pass
+        self._driver = self._aux_driver = None
+        self._logged_in = False
+
+
+class SessionPool:
+    """A fixed size pool of logged-in DriverSessions shared between threads.
+
+    Attributes:
+    ----------
+        size : int
+            The maximum number of sessions (Chrome instances) in the pool.
+
+        driver_factory : callable, optional
+            A callable returning a new selenium webdriver.
+            (default MyWebDriver)
+
+        aux : bool, optional
+            Whether each session keeps an auxiliary webdriver too.
+            (default False)
+
+        recycle_policy : utils.resources.RecyclePolicy, optional
+            When to recycle each session's webdriver(s) between vendors.
+            (default None, ie. never)
+
+    Methods:
+    -------
+        session():
+            Context manager lending out a prepared session.
+
+        stats():
+            Returns each session's stats (see DriverSession.stats).
+
+        close():
+            Quits every session in the pool.
+    """
+
+    def __init__(self, size: int, driver_factory=None, aux: bool = False,
+                 recycle_policy=None):
+        self._size = max(1, int(size))
+        self._driver_factory = driver_factory
+        self._aux = aux
+        self._recycle_policy = recycle_policy
+        self._idle = queue.Queue()
+        self._sessions: list = []
+        self._lock = threading.Lock()
+
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+
+    def acquire(self) -> DriverSession:
+        '''Takes an idle session from the pool, creating one if the pool
+        isn't full yet, otherwise waiting for one to be released.'''
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._sessions) < self._size:
+                session = DriverSession(self._driver_factory, aux=self._aux,
+                                        recycle_policy=self._recycle_policy)
+                self._sessions.append(session)
+                return session
+
+        return self._idle.get()
+
+
+    def release(self, session: DriverSession) -> None:
+        '''Returns a session to the pool.'''
+        self._idle.put(session)
+
+
+    @contextmanager
+    def session(self):
+        '''Lends out a session that's logged in, on the landing page & has a
+        single tab open.'''
+        session = self.acquire()
+        try:
+            session.prepare()
+            yield session
+        finally:
+            self.release(session)
+
+
+    def stats(self) -> list:
+        '''Returns each session's stats (see DriverSession.stats).'''
+        with self._lock:
+            sessions = list(self._sessions)
+        return [session.stats() for session in sessions]
+
+
+    def close(self) -> None:
+        '''Quits every session in the pool.'''
+        with self._lock:
+            for session in self._sessions:
+                session.close()
@@ -0,0 +1,173 @@
+"""
+step_scheduler.py
+-----------------
+    This module runs the approval process's steps as a dependency graph,
+    overlapping steps that don't depend on each other on a second
+    (auxiliary) webdriver.
+"""
+import threading
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+# Which driver a step may run on:
+#   - 'main': Only the vendor's main driver (ex. steps that leave it on a
+#       page a later step relies on).
+#   - 'any': The main or the auxiliary driver, whichever is free.
+MAIN = "main"
+ANY = "any"
+AUX = "aux"
+
+# A step of the process: the steps it must run after, the instance variables
+#   it reads & writes, and which driver it may run on:
+Step = namedtuple("Step", ["requires", "inputs", "outputs", "lane"],
+                  defaults=((), (), (), MAIN))
+
+
+class StepScheduler:
+    """Class used to run a process's steps in dependency order, running
+    independent steps at the same time when there is an auxiliary process
+    (the same process, bound to a second logged-in webdriver) to run them
+    on.
+
+    A step is started as soon as every step it requires has finished. Steps
+    on the auxiliary process get their declared inputs copied over before
+    they run, and hand their declared outputs back once they finish. Without
+    an auxiliary process, steps run one at a time in the order they're
+    listed.
+
+    Attributes:
+    ----------
+        process : ApproveVendorProcess
+            The process to run. Its STEP_GRAPH maps each name in its STEPS to
+            a Step.
+
+        aux_process : ApproveVendorProcess, optional
+            A copy of the process on a second webdriver, for the steps that
+            may run on 'any' driver.
+
+    Methods:
+    -------
+        run(completed, on_complete):
+            Runs every step not already completed.
+    """
+
+    def __init__(self, process, aux_process=None):
+        self._process = process
+        self._aux_process = aux_process
+        self._steps = list(process.STEPS)
+        self._graph = process.STEP_GRAPH
+        # Serialises copying state between the processes:
+        self._state_lock = threading.Lock()
+
+
+    def _requirements_met(self, step: str, done: set) -> bool:
+        '''Whether every step the given one requires has finished (steps
+        missing from STEPS count as finished).'''
+        return all(req in done or req not in self._steps
+                   for req in self._graph[step].requires)
+
+
+    def _pick_lane(self, step: str, idle: set) -> str:
+        '''Returns the idle lane the step should run on, or None.'''
+        lane = self._graph[step].lane
+        if lane == MAIN:
+            return MAIN if MAIN in idle else None
+        # Keep the main driver free for the steps only it can run:
+        for candidate in (AUX, MAIN):
+            if candidate in idle:
+                return candidate
+        return None
+
+
+    def _run_step(self, step: str, lane: str) -> None:
+        '''Runs a single step on the given lane's process.'''
+        if lane == MAIN:
+            getattr(self._process, step)()
+            return
+
+        aux, spec = self._aux_process, self._graph[step]
+        with self._state_lock:
+            for field in spec.inputs:
+                setattr(aux, field, getattr(self._process, field))
+        aux.share_outputs(spec.outputs)
+        try:
+            getattr(aux, step)()
+        finally:
+            aux.share_outputs(())
+        with self._state_lock:
+            for field in spec.outputs:
+                setattr(self._process, field, getattr(aux, field))
+
+
+    def run(self, completed: list, on_complete=None) -> None:
+        '''Runs every step not already completed.
+
+        Parameters
+        ----------
+            completed : list [str]
+                The steps a previous run already completed.
+
+            on_complete : callable, optional
+                Called with each step's name as it finishes (from this
+                thread), ex. to save a checkpoint.
+
+        Raises
+        ------
+            Exception
+                The first error raised by a step, once every running step
+                has finished. No new steps are started after an error.
+        '''
+        done = set(completed)
+        pending = [step for step in self._steps if step not in done]
+
+        # [CASE] Only the one driver -> Run the steps in order, right here:
+        if self._aux_process is None:
+            for step in pending:
+                self._run_step(step, MAIN)
+                if on_complete is not None:
+                    on_complete(step)
+            return
+
+        idle = {MAIN, AUX}
+        running = {}
+        error = None
+
+        with ThreadPoolExecutor(max_workers=len(idle),
+                                thread_name_prefix="step") as executor:
+            while pending or running:
+                # Start everything that's ready & has a free driver:
+                for step in list(pending):
+                    if error is not None:
+                        break
+                    if not self._requirements_met(step, done):
+                        continue
+                    lane = self._pick_lane(step, idle)
+                    if lane is None:
+                        continue
+                    pending.remove(step)
+                    idle.discard(lane)
+                    future = executor.submit(self._run_step, step, lane)
+                    running[future] = (step, lane)
+
+                if not running:
+                    if error is None:
+                        raise RuntimeError(
+                            f"Steps can't be scheduled: {', '.join(pending)}")
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step, lane = running.pop(future)
+                    idle.add(lane)
+                    try:
+                        future.result()
+                    except Exception as err:
+                        error = error or err
+                        continue
+                    done.add(step)
+                    if on_complete is not None:
+                        on_complete(step)
+
+        if error is not None:
+            raise error
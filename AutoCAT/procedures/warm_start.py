@@ -0,0 +1,262 @@
+"""
+warm_start.py
+-------------
+    This module launches (and logs in) the webdriver in the background while
+    the operator is still filling in the Gooey form, and hands it to the run
+    once they click Start.
+
+    Gooey runs the program again, as a child process, when Start is clicked,
+    so the driver can't be handed over as an object. Instead the GUI process
+    writes the driver's session to a handoff file (named in the
+    AUTOCAT_WARM_HANDOFF environ. variable, which the child inherits) and the
+    child attaches to it. Opt in with AUTOCAT_WARM_START=1.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+from collections import namedtuple
+from time import sleep, time
+
+from dotenv import load_dotenv
+from selenium.common.exceptions import WebDriverException
+
+from procedures.session import DriverSession
+from utils.webdriver import (INTERACTIVE, MyWebDriver, attach_driver,
+                             session_info)
+
+
+# Environ. variables turning warm starts on & naming the handoff file:
+WARM_START_VAR = "AUTOCAT_WARM_START"
+HANDOFF_VAR = "AUTOCAT_WARM_HANDOFF"
+
+# Upper bound (in seconds) a run waits for a warm driver that's still
+#   starting up, and the pause between checks:
+WARM_WAIT = 60
+WARM_POLL = 0.25
+
+# The states a handoff file can be in:
+STARTING = "starting"
+READY = "ready"
+FAILED = "failed"
+
+# The suffix a handoff file is renamed with once a run has claimed it:
+CLAIMED_SUFFIX = ".claimed"
+
+# A warm driver claimed by a run, and whether it's logged in already:
+WarmHandoff = namedtuple("WarmHandoff", ["driver", "logged_in"])
+
+
+def warm_start_enabled() -> bool:
+    '''Returns whether warm starts are turned on (AUTOCAT_WARM_START).'''
+    load_dotenv()
+    return os.environ.get(WARM_START_VAR, "").strip().lower() in \
+        ("1", "true", "yes", "on")
+
+
+def _write_handoff(path: str, handoff: dict) -> None:
+    '''Replaces the handoff file in one step, so it's never read half
+    written.'''
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(handoff, f)
+    os.replace(tmp_path, path)
+
+
+def _read_handoff(path: str) -> dict:
+    '''Returns the handoff file's contents, or None if it's gone.'''
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class WarmDriver:
+    """Class used (in the GUI process) to launch & log in a webdriver in the
+    background, and publish its session for the run to claim.
+
+    If no run claims the driver by the time the GUI closes (ex. the form was
+    cancelled), it's quit.
+
+    Attributes:
+    ----------
+        profile : str, optional
+            The driver profile to launch. Runs asking for another profile
+            start their own driver. (default INTERACTIVE)
+
+        driver_factory : callable, optional
+            A callable returning a new selenium webdriver.
+            (default MyWebDriver using the given profile)
+
+        handoff_path : str, optional
+            Where to write the handoff file. (default a new temporary file)
+
+    Methods:
+    -------
+        start():
+            Starts warming the driver up in the background.
+
+        close():
+            Quits the driver (and removes the handoff file) unless a run
+            claimed it.
+    """
+
+    def __init__(self, profile: str = INTERACTIVE, driver_factory=None,
+                 handoff_path: str = None):
+        self._profile = profile
+        self._session = DriverSession(
+            driver_factory or
+            (lambda: MyWebDriver(profile=profile).initialize_driver()))
+        if handoff_path is None:
+            fd, handoff_path = tempfile.mkstemp(prefix="autocat-warm-",
+                                                suffix=".json")
+            os.close(fd)
+        self._handoff_path = handoff_path
+        self._lock = threading.Lock()
+        self._closed: bool = False
+        self._thread = None
+
+    @property
+    def profile(self) -> str:
+        return self._profile
+
+    @property
+    def handoff_path(self) -> str:
+        return self._handoff_path
+
+
+    def start(self) -> None:
+        '''Starts warming the driver up in the background, pointing any
+        child processes at the handoff file.'''
+        _write_handoff(self._handoff_path,
+                       {"state": STARTING, "profile": self._profile})
+        os.environ[HANDOFF_VAR] = self._handoff_path
+        atexit.register(self.close)
+
+        self._thread = threading.Thread(target=self._warm, name="warm-start",
+                                        daemon=True)
+        self._thread.start()
+
+
+    def _warm(self) -> None:
+        '''Launches the driver & logs it in, then publishes its session.'''
+        start = time()
+        try:
+            driver = self._session.start()
+        except Exception as err:
+            print(f"Couldn't warm up the browser: {err}")
+            self._publish({"state": FAILED, "profile": self._profile})
+            return
+
+        # [CASE] Closed while Chrome was starting -> Nobody wants it:
+        with self._lock:
+            if self._closed:
+                self._session.close()
+                return
+
+        logged_in = True
+        try:
+            self._session.login()
+        except Exception as err:
+            # The run will log in itself:
+            print(f"Couldn't log the warm browser in: {err}")
+            logged_in = False
+
+        self._publish(dict(session_info(driver), state=READY,
+                           profile=self._profile, logged_in=logged_in))
+        print(f"Browser warmed up in {round(time() - start, 2)} sec.")
+
+
+    def _publish(self, handoff: dict) -> None:
+        '''Writes the handoff file, unless we've been closed.'''
+        with self._lock:
+            if not self._closed:
+                _write_handoff(self._handoff_path, handoff)
+
+
+    def close(self) -> None:
+        '''Quits the driver (and removes the handoff file) unless a run
+        claimed it.'''
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            claimed = os.path.exists(self._handoff_path + CLAIMED_SUFFIX)
+            for path in (self._handoff_path,
+                         self._handoff_path + CLAIMED_SUFFIX):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        # [CASE] Nobody claimed it (ex. the form was cancelled) -> Quit it:
+        if not claimed:
+            self._session.close()
+
+
+def claim_warm_driver(profile: str = INTERACTIVE,
+                      timeout: float = WARM_WAIT) -> WarmHandoff:
+    '''Claims the driver the GUI process warmed up, waiting for it if it's
+    still starting.
+
+    Parameters
+    ----------
+        profile : str, optional
+            The driver profile the run wants. A warm driver with another
+            profile is quit instead. (default INTERACTIVE)
+
+        timeout : float, optional
+            Upper bound (in seconds) to wait for a driver that's still
+            starting. (default WARM_WAIT)
+
+    Returns
+    -------
+        WarmHandoff
+            The attached driver & whether it's logged in, or None if there's
+            no warm driver to claim.
+    '''
+    path = os.environ.get(HANDOFF_VAR)
+    if not path:
+        return None
+
+    deadline = time() + timeout
+    while True:
+        handoff = _read_handoff(path)
+        # [CASE] Already claimed (ex. by an earlier run) or failed to start:
+        if handoff is None or handoff.get("state") == FAILED:
+            return None
+        if handoff.get("state") == READY:
+            break
+        if time() >= deadline:
+            print("The warm browser is taking too long -- starting a new one.")
+            return None
+        sleep(WARM_POLL)
+
+    # Claim it, unless another run beat us to it:
+    try:
+        os.replace(path, path + CLAIMED_SUFFIX)
+    except OSError:
+        return None
+
+    try:
+        driver = attach_driver(handoff["executor_url"],
+                               handoff["session_id"], handoff["w3c"])
+        driver.current_url
+    except (KeyError, WebDriverException) as err:
+        print(f"Couldn't attach to the warm browser: {err}")
+        return None
+
+    # [CASE] The run wants another profile -> Don't leave it lying around:
+    if handoff.get("profile") != profile:
+        print(f"The warm browser uses the '{handoff.get('profile')}' "
+              f"profile -- starting a new one.")
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+        return None
+
+    print("Using the warmed up browser.")
+    return WarmHandoff(driver, bool(handoff.get("logged_in")))
@@ -0,0 +1,208 @@
+"""
+work_queue.py
+-------------
+    This module lets any number of AutoCAT processes (on one or many hosts)
+    share the vendors in MongoDB as a work queue.
+"""
+import os
+import socket
+import threading
+from time import time
+
+from procedures.approve_vendor import ApproveVendorProcess
+from procedures.batch import VendorResult
+from procedures.session import SessionPool
+from utils.database import (DEFAULT_LEASE_SECONDS, claim_vendor,
+                            complete_vendor, fail_vendor,
+                            reclaim_expired_leases, requeue_failed_vendors)
+from utils.webdriver import MyWebDriver, PERFORMANCE
+
+
+# Seconds to wait before checking an empty queue again (when we're told to
+#   keep waiting for new vendors):
+DEFAULT_POLL_INTERVAL = 10
+
+
+class QueueApproveProcess:
+    """Class used to claim vendors from the shared MongoDB work queue and run
+    the approval process for them until the queue is empty.
+
+    Each worker atomically claims a NEW vendor (marking it INPROGRESS with a
+    lease), runs it, and marks it DONE -- as long as it still holds the
+    lease. Failures are marked FAILED, and only go back in the queue when
+    asked to (retry_failed). Vendors whose lease runs out (ex. their worker
+    crashed) are reclaimed by whoever asks next.
+
+    Attributes:
+    ----------
+        workers : int, optional
+            The number of Chrome instances to run in parallel in this
+            process. (default 1)
+
+        driver_factory : callable, optional
+            A callable returning a new selenium webdriver.
+            (default MyWebDriver using the given profile)
+
+        profile : str, optional
+            The driver profile used when no driver_factory is given.
+            (default PERFORMANCE)
+
+        lease_seconds : int, optional
+            How long a claimed vendor is ours before others may reclaim it.
+            (default DEFAULT_LEASE_SECONDS)
+
+        wait : bool, optional
+            Whether to keep polling for new vendors once the queue is empty,
+            instead of returning. (default False)
+
+        collection : pymongo.collection.Collection, optional
+            The vendors collection to use (ex. a mock, for testing).
+
+        step_hooks : list, optional
+            Step hooks handed to every vendor's process, ex. a shared
+            utils.metrics.MetricsCollector.
+
+        parallel_steps : bool, optional
+            Whether each worker also runs a second webdriver, so the steps of
+            a vendor that don't depend on each other run at the same time.
+            (default False)
+
+        recycle_policy : utils.resources.RecyclePolicy, optional
+            When to recycle each worker's webdriver(s) between vendors, for
+            long running workers. (default None, ie. never)
+
+        retry_failed : bool, optional
+            Whether to put the FAILED vendors back in the queue before
+            starting. (default False)
+
+        safe_mode : bool, optional
+            Whether each vendor's process runs in safe mode. (default False)
+
+    Methods:
+    -------
+        run():
+            Processes vendors until the queue is empty, returning a list of
+            VendorResult objects.
+    """
+
+    def __init__(self, workers: int = 1, driver_factory=None,
+                 profile: str = PERFORMANCE,
+                 lease_seconds: int = DEFAULT_LEASE_SECONDS,
+                 wait: bool = False,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 collection=None, step_hooks: list = None,
+                 parallel_steps: bool = False, recycle_policy=None,
+                 retry_failed: bool = False, safe_mode: bool = False):
+        self._workers = max(1, int(workers))
+        self._retry_failed = retry_failed
+        self._safe_mode = safe_mode
+        self._recycle_policy = recycle_policy
+        self._parallel_steps = parallel_steps
+        self._step_hooks = list(step_hooks or [])
+        self._driver_factory = driver_factory or \
+            (lambda: MyWebDriver(profile=profile).initialize_driver())
+        self._lease_seconds = lease_seconds
+        self._wait = wait
+        self._poll_interval = poll_interval
+        self._collection = collection
+        self._host_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._results: list = []
+        self._results_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pool = None
+
+    @property
+    def results(self) -> list:
+        '''The results so far, in the order the vendors finished.'''
+        with self._results_lock:
+            return list(self._results)
+
+    @property
+    def pool(self):
+        '''The session pool, while run() is running.'''
+        return self._pool
+
+
+    def stop(self) -> None:
+        '''Asks the workers to stop once their current vendor is done.'''
+        self._stop.set()
+
+
+    def _claim(self, worker_id: str) -> str:
+        '''Claims the next vendor, waiting for one if we were told to.'''
+        while not self._stop.is_set():
+            email = claim_vendor(worker_id, self._lease_seconds,
+                                 collection=self._collection)
+            if email or not self._wait:
+                return email
+            self._stop.wait(self._poll_interval)
+        return None
+
+
+    def _worker(self, pool: SessionPool) -> None:
+        '''Claims & processes vendors until the queue is empty.'''
+        worker_id = f"{self._host_id}:{threading.current_thread().name}"
+
+        while True:
+            email = self._claim(worker_id)
+            if not email:
+                return
+
+            start = time()
+            try:
+                with pool.session() as session:
+                    # Resume, in case this vendor was reclaimed from a
+                    #   worker on this host that died partway through:
+                    ApproveVendorProcess(session.driver,
+                                         safe_mode=self._safe_mode,
+                                         step_hooks=self._step_hooks,
+                                         aux_driver=session.aux_driver)\
+                        .run_all(email, login=False, resume=True)
+                # (Raises if our lease ran out & someone else has it now)
+                complete_vendor(email, worker_id, collection=self._collection)
+                result = VendorResult(email, True, time() - start, None)
+            except Exception as err:
+                fail_vendor(email, worker_id, str(err),
+                            collection=self._collection)
+                result = VendorResult(email, False, time() - start, str(err))
+
+            status = "DONE" if result.success else f"FAILED ({result.error})"
+            print(f"\n[{worker_id}] {email}: {status}")
+            with self._results_lock:
+                self._results.append(result)
+
+
+    def run(self) -> list:
+        '''Processes vendors from the queue until it's empty.
+
+        Returns
+        -------
+            list [VendorResult]
+                The results, in the order the vendors finished.
+        '''
+        self._results = []
+        if self._retry_failed:
+            retried = requeue_failed_vendors(collection=self._collection)
+            print(f"\nPut {retried} failed vendor(s) back in the queue.")
+        reclaimed = reclaim_expired_leases(collection=self._collection)
+        if reclaimed:
+            print(f"\nReclaimed {reclaimed} vendor(s) with expired leases.")
+
+        pool = self._pool = SessionPool(self._workers, self._driver_factory,
+                                        aux=self._parallel_steps,
+                                        recycle_policy=self._recycle_policy)
+        threads = [
+            threading.Thread(target=self._worker, args=(pool,),
+                             name=f"worker-{i + 1}", daemon=True)
+            for i in range(self._workers)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            pool.close()
+            self._pool = None
+
+        return self._results
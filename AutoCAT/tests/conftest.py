@@ -0,0 +1,119 @@
+'''
+conftest.py
+------------
+    Lets the tests import from the 'AutoCAT' folder, like the app does, and
+    provides the webdriver & process stand-ins the tests share.
+'''
+import copy
+import json
+import os
+import sys
+
+import pytest
+
+AUTOCAT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if AUTOCAT_DIR not in sys.path:
+    sys.path.insert(0, AUTOCAT_DIR)
+
+from selenium.webdriver.remote.command import Command
+
+from procedures.approve_vendor import ApproveVendorProcess
+from utils.helper_funcs import timer
+
+
+class FakeDriver:
+    '''Stands in for a webdriver: answers every command, finds the elements
+    it was given and hands out its performance log (once).'''
+
+    def __init__(self, found: dict = None):
+        # Maps (by, value) to the elements found with them:
+        self.found = dict(found or {})
+        self.lookups = []
+        self.performance_log = []
+
+    def execute(self, driver_command, params=None):
+        if driver_command == Command.GET_LOG:
+            entries, self.performance_log = self.performance_log, []
+            return {"value": entries}
+        return {"value": None}
+
+    def find_elements(self, by, value):
+        self.lookups.append((by, value))
+        return self.found.get((by, value), [])
+
+    def log_event(self, method: str, params: dict) -> None:
+        '''Adds an event to the performance log.'''
+        self.performance_log.append({"message": json.dumps(
+            {"message": {"method": method, "params": params}})})
+
+
+class FakeProcess:
+    '''Stands in for an ApproveVendorProcess (with its STEPS) without a
+    browser. Steps run through @timer, so step hooks see them as they would
+    the real ones.
+
+    Steps given as {name: callable(process)} can be called as methods, ex.
+    for a StepScheduler along with a `graph` (a STEP_GRAPH).
+    '''
+    STEPS = ApproveVendorProcess.STEPS
+
+    def __init__(self, driver=None, step_hooks: list = (),
+                 vendor_email: str = "a@x.com", steps: dict = None,
+                 graph: dict = None):
+        self.driver = driver
+        self.step_hooks = list(step_hooks)
+        self.vendor_email = vendor_email
+        self.parent = None
+        self.outputs = ()
+        self._steps = dict(steps or {})
+        if graph is not None:
+            self.STEP_GRAPH = graph
+            self.STEPS = tuple(graph)
+
+    def __getattr__(self, name):
+        steps = self.__dict__.get("_steps", {})
+        if name not in steps:
+            raise AttributeError(name)
+        return lambda: self.run(name, steps[name])
+
+    def run(self, step: str, body=None):
+        '''Runs a step of the given name, calling `body` (with the process)
+        within it.'''
+        def run_step(process):
+            if body is not None:
+                return body(process)
+        run_step.__name__ = step
+        return timer(run_step)(self)
+
+    def run_all(self, body=None):
+        '''Runs every one of STEPS within run_all, as the real process does,
+        calling `body` (with the process) first.'''
+        def run_steps(process):
+            if body is not None:
+                body(process)
+            for step in self.STEPS:
+                self.run(step)
+        self.run("run_all", run_steps)
+
+    def spawn(self, driver=None) -> "FakeProcess":
+        '''Returns a copy for running steps alongside us (ex. on the aux
+        driver).'''
+        clone = copy.copy(self)
+        clone.driver = driver
+        clone.parent = self
+        return clone
+
+    def share_outputs(self, outputs: tuple) -> None:
+        self.outputs = outputs
+
+
+@pytest.fixture
+def make_driver():
+    '''Returns FakeDriver, to make webdriver stand-ins with.'''
+    return FakeDriver
+
+
+@pytest.fixture
+def make_process():
+    '''Returns FakeProcess, to make process stand-ins with.'''
+    return FakeProcess
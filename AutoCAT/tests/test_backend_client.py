@@ -0,0 +1,95 @@
+'''
+test_backend_client.py
+------------
+    Reading the backend's pages without a browser, against the mock backend.
+'''
+import pytest
+
+from benchmarks.mock_backend import MockBackend
+from utils.backend_client import (
+    ADDRESS_FIELDS, DETAILS_FIELDS, SessionExpired, parse_fields,
+)
+from utils.dom import TEXT, VALUE
+
+
+@pytest.fixture
+def backend():
+    with MockBackend() as backend:
+        yield backend
+
+
+def _pages(backend, email):
+    vendor = backend.find_vendor(email)
+    return (backend._company_address_page(vendor),
+            backend._vendor_page(vendor))
+
+
+def test_reads_a_us_vendors_address(backend):
+    backend.add_vendor("us@example.com", "US Brand", state="CA",
+                       city="Los Angeles")
+    address, _ = _pages(backend, "us@example.com")
+    assert parse_fields(address, ADDRESS_FIELDS) == {
+        "country": "United States", "state_dd": "California",
+        "state_field": "", "city": "Los Angeles"}
+
+
+def test_reads_a_foreign_vendors_address(backend):
+    backend.add_vendor("ca@example.com", "CA Brand", country="Canada",
+                       state="Ontario", city="Toronto")
+    address, _ = _pages(backend, "ca@example.com")
+    fields = parse_fields(address, ADDRESS_FIELDS)
+    assert fields["country"] == "Canada"
+    assert fields["state_field"] == "Ontario"
+    assert fields["city"] == "Toronto"
+
+
+def test_reads_company_details(backend):
+    backend.add_vendor("d@example.com", "D Brand",
+                       website="www.d.example.com",
+                       description="Lovely & handmade.", instagram="@d")
+    _, details = _pages(backend, "d@example.com")
+    assert parse_fields(details, DETAILS_FIELDS) == {
+        "website": "www.d.example.com", "description": "Lovely & handmade.",
+        "instagram": "@d"}
+
+
+def test_markup_in_a_textarea_is_kept_as_text(backend):
+    description = "<b>Bold</b> & <i>brave</i>\n<p>Since 2001</p>"
+    backend.add_vendor("m@example.com", "M Brand", description=description)
+    _, details = _pages(backend, "m@example.com")
+    assert parse_fields(details, DETAILS_FIELDS)["description"] == \
+        description
+
+
+def test_a_raw_textarea_closes_on_its_own_end_tag():
+    page = ("<textarea id='desc'><div>not a tag</div></textarea>"
+            "<input id='after' value='still read'>")
+    fields = parse_fields(page, {"desc": ("//*[@id='desc']", TEXT),
+                                 "after": ("//*[@id='after']", "@value")})
+    assert fields == {"desc": "<div>not a tag</div>", "after": "still read"}
+
+
+def test_nested_tags_of_the_same_name_keep_their_text():
+    page = ("<div id='outer'>one <div>two <div>three</div></div> four</div>"
+            "<div>outside</div>")
+    fields = parse_fields(page, {"outer": ("//*[@id='outer']", TEXT)})
+    assert fields["outer"] == "one two three four"
+
+
+def test_nested_tracked_elements_are_both_read():
+    page = ("<div id='box'>Pick: <select id='pick'><option value='1'>One"
+            "</option><option value='2' selected>Two</option></select></div>")
+    fields = parse_fields(page, {"box": ("//*[@id='box']", TEXT),
+                                 "pick": ("//*[@id='pick']", VALUE)})
+    assert fields == {"box": "Pick: OneTwo", "pick": "2"}
+
+
+def test_missing_fields_are_none(backend):
+    backend.add_vendor("x@example.com", "X Brand")
+    address, _ = _pages(backend, "x@example.com")
+    assert set(parse_fields(address, DETAILS_FIELDS).values()) == {None}
+
+
+def test_the_login_page_raises(backend):
+    with pytest.raises(SessionExpired):
+        parse_fields(backend._login_page(), ADDRESS_FIELDS)
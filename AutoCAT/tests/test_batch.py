@@ -0,0 +1,211 @@
+'''
+test_batch.py
+------------
+    Reading vendor emails from batch files & piped input, and creating the
+    batch's Coming Soon categories together.
+'''
+import contextlib
+import io
+import types
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+import procedures.approve_vendor as approve_vendor
+from procedures.approve_vendor import ApproveVendorProcess
+from procedures.batch import (BatchApproveProcess, VendorResult,
+                              load_vendor_emails, parse_vendor_emails)
+from utils.checkpoint import CheckpointStore
+
+
+def test_reads_newline_separated_emails():
+    lines = io.StringIO("a@x.com\nb@x.com\n\nc@x.com\n")
+    assert parse_vendor_emails(lines) == ["a@x.com", "b@x.com", "c@x.com"]
+
+
+def test_reads_every_cell_of_a_csv():
+    lines = io.StringIO("a@x.com, b@x.com\nc@x.com,,d@x.com\n")
+    assert parse_vendor_emails(lines) == ["a@x.com", "b@x.com", "c@x.com",
+                                          "d@x.com"]
+
+
+def test_skips_headers_comments_and_duplicates(capsys):
+    lines = io.StringIO("email,brand\n# a@x.com\nB@x.com,Brand B\nb@x.com\n")
+    assert parse_vendor_emails(lines) == ["b@x.com"]
+    assert "Skipping 'email'" in capsys.readouterr().out
+
+
+def test_loads_a_file_with_a_byte_order_mark(tmp_path):
+    path = tmp_path / "vendors.csv"
+    path.write_bytes(b"\xef\xbb\xbfa@x.com\r\nb@x.com\r\n")
+    assert load_vendor_emails(str(path)) == ["a@x.com", "b@x.com"]
+
+
+class _Element:
+
+    def click(self):
+        pass
+
+
+class _Page:
+    '''Stands in for the Coming Soon page object.'''
+
+    def __init__(self, driver):
+        pass
+
+    def load(self, url):
+        pass
+
+    def wait_for(self, name, **params):
+        return _Element()
+
+    def element(self, name, **params):
+        return _Element()
+
+
+class _ComingSoon:
+    '''Stands in for the Coming Soon page's rows (read through read_all),
+    one list of (title, category id) rows per read, and its saves -- the
+    given one of which fails.'''
+
+    def __init__(self, *reads, fail_save: int = None):
+        self.reads = list(reads)
+        self.saves = 0
+        self.fail_save = fail_save
+        self.names = []
+        self.positions = []
+
+    def read_all(self, driver, fields):
+        rows = self.reads.pop(0)
+        return {"titles": [title for title, _ in rows],
+                "hrefs": [f"admin.php?target=category&id={category_id}"
+                          if category_id else None
+                          for _, category_id in rows]}
+
+    def save(self):
+        self.saves += 1
+        if self.saves == self.fail_save:
+            raise TimeoutException("save timed out")
+
+    def fill(self, fields):
+        for field, (_, value) in fields.items():
+            if field.startswith("name-"):
+                self.names.append(value)
+            else:
+                self.positions.append(value)
+
+
+@pytest.fixture
+def coming_soon(monkeypatch, tmp_path):
+    '''Returns a function setting up the Coming Soon page (see _ComingSoon)
+    for the processes to come.'''
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(approve_vendor, "ComingSoonPage", _Page)
+
+    def set_up(*reads, fail_save: int = None) -> _ComingSoon:
+        page = _ComingSoon(*reads, fail_save=fail_save)
+        monkeypatch.setattr(approve_vendor, "read_all", page.read_all)
+        monkeypatch.setattr(ApproveVendorProcess, "_save_coming_soon",
+                            page.save)
+        monkeypatch.setattr(ApproveVendorProcess, "_fill", page.fill)
+        return page
+    return set_up
+
+
+@pytest.fixture
+def process(make_driver, coming_soon):
+    return ApproveVendorProcess(make_driver(), http_reads=False)
+
+
+def test_categories_already_there_arent_mistaken_for_new_ones(coming_soon,
+                                                              process):
+    page = coming_soon([("Acme", "5")],
+                       [("Acme", "5"), ("Acme", "9"), ("Beta", "10"),
+                        ("Gamma", None)])
+    saved = []
+    category_ids = process.create_categories(["Acme", "Beta", "Gamma"],
+                                             on_saved=saved.append)
+
+    assert category_ids == {"Acme": "9", "Beta": "10"}
+    assert saved == [category_ids]
+    assert page.saves == 2
+    assert page.positions == [process.CATEGORY_POSITION] * 2
+
+
+def test_duplicate_titles_match_the_newest_row(coming_soon, process):
+    page = coming_soon([], [("Acme", "9"), ("Acme", "11")])
+    category_ids = process.create_categories(["Acme", " Acme ", "Acme"])
+
+    assert page.names == ["Acme"]
+    assert category_ids == {"Acme": "11"}
+
+
+def test_titles_match_despite_entities_and_whitespace(coming_soon, process):
+    coming_soon([], [("Tom &amp; Jerry", "12"), ("Bits  Bobs", "13")])
+    assert process.create_categories(["Tom & Jerry", "Bits Bobs", "Gone"]) \
+        == {"Tom & Jerry": "12", "Bits Bobs": "13"}
+
+
+def test_ids_are_handed_over_before_positioning_fails(coming_soon, process):
+    coming_soon([], [("Acme", "9")], fail_save=2)
+    saved = []
+    with pytest.raises(TimeoutException):
+        process.create_categories(["Acme", "Gone"], on_saved=saved.append)
+    assert saved == [{"Acme": "9"}]
+
+
+def _batch(make_driver, brand_names: dict) -> BatchApproveProcess:
+    '''Returns a batch whose vendors (with the given {email: brand name})
+    are ready for their categories.'''
+    batch = BatchApproveProcess(batch_categories=True)
+    for email, name in brand_names.items():
+        CheckpointStore().save(email, ["vendor_email_search"],
+                               {"_brand_name": name})
+
+    def run_workers(pool, emails, results, label, **kwargs):
+        results += [VendorResult(email, True, 1.0, None) for email in emails]
+    batch._run_workers = run_workers
+
+    @contextlib.contextmanager
+    def session():
+        yield types.SimpleNamespace(driver=make_driver())
+    return batch, types.SimpleNamespace(session=session)
+
+
+def test_batched_vendors_skip_the_coming_soon_page(make_driver, coming_soon):
+    coming_soon([], [("Acme", "9"), ("Beta", "10")])
+    batch, pool = _batch(make_driver, {"a@x.com": "Acme", "b@x.com": "Beta"})
+    ready, _ = batch._prepare_categories(pool, ["a@x.com", "b@x.com"])
+
+    assert ready == ["a@x.com", "b@x.com"]
+    checkpoint = CheckpointStore().load("a@x.com")
+    assert checkpoint["state"]["_category_id"] == "9"
+    assert "complete_coming_soon_page" in checkpoint["completed"]
+
+
+def test_a_failure_after_saving_doesnt_lead_to_duplicates(make_driver,
+                                                          coming_soon):
+    coming_soon([], [("Acme", "9")], fail_save=2)
+    batch, pool = _batch(make_driver, {"a@x.com": "Acme", "b@x.com": "Beta"})
+    ready, _ = batch._prepare_categories(pool, ["a@x.com", "b@x.com"])
+
+    # Acme's id is kept, so it's only positioned when they resume:
+    assert ready == ["a@x.com"]
+    checkpoint = CheckpointStore().load("a@x.com")
+    assert checkpoint["state"]["_category_id"] == "9"
+    assert "complete_coming_soon_page" not in checkpoint["completed"]
+    # Beta's category may exist too, so it's left to be reconciled by hand:
+    assert [(r.email, r.success) for r in batch._results] == \
+        [("b@x.com", False)]
+    assert not CheckpointStore().load("b@x.com")["state"].get("_category_id")
+
+
+def test_a_failure_before_saving_leaves_everyone_to_create_their_own(
+        make_driver, coming_soon):
+    coming_soon()  # (No rows to read, so it fails before saving)
+    batch, pool = _batch(make_driver, {"a@x.com": "Acme"})
+    ready, _ = batch._prepare_categories(pool, ["a@x.com"])
+
+    assert ready == ["a@x.com"]
+    assert batch._results == []
+    assert "_category_id" not in CheckpointStore().load("a@x.com")["state"]
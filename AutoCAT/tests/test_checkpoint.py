@@ -0,0 +1,55 @@
+'''
+test_checkpoint.py
+------------
+    Saving, loading & clearing per-vendor checkpoints.
+'''
+import os
+
+import pytest
+
+from utils.checkpoint import CheckpointStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(directory=str(tmp_path / "checkpoints"))
+
+
+def test_saved_checkpoints_load_back(store):
+    store.save("a@x.com", ["vendor_email_search"], {"_profile_id": "42"})
+    checkpoint = store.load("a@x.com")
+    assert checkpoint["completed"] == ["vendor_email_search"]
+    assert checkpoint["state"] == {"_profile_id": "42"}
+    assert checkpoint["saved_at"] > 0
+
+
+def test_emails_are_matched_case_insensitively(store):
+    store.save(" A@X.com ", ["read_account_header"], {})
+    assert store.load("a@x.com")["completed"] == ["read_account_header"]
+
+
+def test_a_later_save_replaces_the_checkpoint(store):
+    store.save("a@x.com", ["one"], {})
+    store.save("a@x.com", ["one", "two"], {"_category_id": "7"})
+    assert store.load("a@x.com")["completed"] == ["one", "two"]
+    assert os.listdir(store.directory) == ["a@x.com.json"]
+
+
+def test_unsafe_characters_stay_in_the_folder(store):
+    store.save("../evil/a@x.com", [], {})
+    assert os.listdir(store.directory) == [".._evil_a@x.com.json"]
+
+
+def test_missing_or_corrupt_checkpoints_load_as_none(store):
+    assert store.load("a@x.com") is None
+    store.save("a@x.com", [], {})
+    with open(os.path.join(store.directory, "a@x.com.json"), "w") as f:
+        f.write("{not json")
+    assert store.load("a@x.com") is None
+
+
+def test_cleared_checkpoints_are_gone(store):
+    store.save("a@x.com", ["one"], {})
+    store.clear("a@x.com")
+    store.clear("a@x.com")
+    assert store.load("a@x.com") is None
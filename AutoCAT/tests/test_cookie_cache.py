@@ -0,0 +1,59 @@
+'''
+test_cookie_cache.py
+------------
+    Saving & loading the encrypted session cookie cache.
+'''
+import os
+import threading
+
+import pytest
+from cryptography.fernet import Fernet
+
+from utils.cookie_cache import CookieCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("COOKIE_CACHE_KEY", Fernet.generate_key().decode())
+    return CookieCache(path=str(tmp_path / ".session_cache"), ttl=60)
+
+
+def test_saved_cookies_load_back(cache):
+    cookies = [{"name": "session", "value": "abc", "domain": "x.com"}]
+    cache.save(cookies)
+    assert cache.load() == cookies
+
+
+def test_expired_cookies_are_dropped(cache):
+    cache.save([{"name": "old", "value": "1", "expiry": 1},
+                {"name": "new", "value": "2"}])
+    assert [c["name"] for c in cache.load()] == ["new"]
+
+
+def test_stale_caches_are_ignored(tmp_path, monkeypatch):
+    monkeypatch.setenv("COOKIE_CACHE_KEY", Fernet.generate_key().decode())
+    cache = CookieCache(path=str(tmp_path / ".session_cache"), ttl=-1)
+    cache.save([{"name": "session", "value": "abc"}])
+    assert cache.load() == []
+
+
+def test_concurrent_saves_from_threads(cache, tmp_path):
+    errors = []
+
+    def save(i: int) -> None:
+        try:
+            for _ in range(20):
+                cache.save([{"name": "session", "value": str(i) * 500}])
+        except Exception as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    value = cache.load()[0]["value"]
+    assert len(set(value)) == 1 and len(value) == 500
+    assert os.listdir(tmp_path) == [".session_cache"]
@@ -0,0 +1,89 @@
+'''
+test_daemon.py
+------------
+    The daemon's watched folder bookkeeping (without browsers).
+'''
+import os
+import queue
+import threading
+import time
+
+import pytest
+
+from procedures.batch import VendorResult
+from procedures.daemon import DONE_DIR, PROCESSING_DIR, ApprovalDaemon
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    for folder in (PROCESSING_DIR, DONE_DIR):
+        os.makedirs(tmp_path / folder)
+    daemon = ApprovalDaemon(watch_dir=str(tmp_path), poll_interval=0.01)
+    processed = []
+
+    def process_vendor(email):
+        processed.append(email)
+        return VendorResult(email, True, 0.0, None)
+
+    monkeypatch.setattr(daemon, "_process_vendor", process_vendor)
+    daemon.processed = processed
+    return daemon
+
+
+def _drop(folder, name: str, emails: list) -> None:
+    (folder / name).write_text("\n".join(emails) + "\n")
+
+
+def _work(daemon, jobs: queue.Queue, done_dir, files: int) -> None:
+    '''Runs a worker until the 'done' folder has the given number of
+    files.'''
+    worker = threading.Thread(target=daemon._worker, args=(jobs,))
+    worker.start()
+    deadline = time.time() + 5
+    while len(os.listdir(done_dir)) < files and time.time() < deadline:
+        time.sleep(0.01)
+    daemon.stop()
+    worker.join()
+
+
+def test_batches_of_the_same_name_are_kept_apart(daemon, tmp_path):
+    jobs = queue.Queue()
+    _drop(tmp_path, "vendors.csv", ["a@x.com", "b@x.com"])
+    daemon._pick_up_batch("vendors.csv", jobs)
+    _drop(tmp_path, "vendors.csv", ["c@x.com"])
+    daemon._pick_up_batch("vendors.csv", jobs)
+
+    assert sorted(os.listdir(tmp_path / PROCESSING_DIR)) == \
+        ["vendors.2.csv", "vendors.csv"]
+
+    _work(daemon, jobs, tmp_path / DONE_DIR, files=4)
+    assert daemon.processed == ["a@x.com", "b@x.com", "c@x.com"]
+    assert sorted(os.listdir(tmp_path / DONE_DIR)) == [
+        "vendors.2.csv", "vendors.2.csv.results.csv", "vendors.csv",
+        "vendors.csv.results.csv"]
+    results = (tmp_path / DONE_DIR / "vendors.csv.results.csv").read_text()
+    assert "a@x.com" in results and "c@x.com" not in results
+
+
+def test_done_batches_are_not_overwritten(daemon, tmp_path):
+    jobs = queue.Queue()
+    (tmp_path / DONE_DIR / "vendors.csv").write_text("old@x.com\n")
+    _drop(tmp_path, "vendors.csv", ["a@x.com"])
+    daemon._pick_up_batch("vendors.csv", jobs)
+
+    _work(daemon, jobs, tmp_path / DONE_DIR, files=3)
+    assert (tmp_path / DONE_DIR / "vendors.csv").read_text() == "old@x.com\n"
+    assert (tmp_path / DONE_DIR / "vendors.2.csv").read_text() == "a@x.com\n"
+
+
+def test_files_are_picked_up_once_theyve_stopped_changing(daemon,
+                                                          tmp_path):
+    _drop(tmp_path, "vendors.csv", ["a@x.com"])
+    assert daemon._new_batch_files() == []
+
+    # (Still being written)
+    with open(tmp_path / "vendors.csv", "a") as f:
+        f.write("b@x.com\n")
+    assert daemon._new_batch_files() == []
+
+    assert daemon._new_batch_files() == ["vendors.csv"]
@@ -0,0 +1,68 @@
+'''
+test_locators.py
+------------
+    Compiling xpaths into lookup strategies & resolving elements with them.
+'''
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from pages.locators import (CSS, ID, RELATIVE, XPATH, LocatorRegistry,
+                            compile_xpath, xpath_to_css)
+
+
+@pytest.mark.parametrize("xpath, css", [
+    ("//*[@id='categories']", "#categories"),
+    ("/html/body/div[2]/form/div/button",
+     "html > body > div:nth-of-type(2) > form > div > button"),
+    ("//form//input[@name='city'][@type='text']",
+     "form input[name='city'][type='text']"),
+    ("//div[@id='1st']", "div[id='1st']"),
+])
+def test_simple_xpaths_convert_to_css(xpath, css):
+    assert xpath_to_css(xpath) == css
+
+
+@pytest.mark.parametrize("xpath", [
+    "//li[contains(@class, 'highlighted')]",
+    "//*[@id='cleanurl']/ancestor::form//button",
+    "/html/body/*[2]",
+    "div/span",
+])
+def test_other_xpaths_have_no_css(xpath):
+    assert xpath_to_css(xpath) is None
+
+
+def test_strategies_go_fastest_first():
+    assert [s.kind for s in compile_xpath("//*[@id='city']")] == [ID, XPATH]
+    assert [s.kind for s in compile_xpath("/html/body/div[2]")] == \
+        [CSS, XPATH]
+    chain = compile_xpath("/html/body/div[2]//li[contains(@class, 'a')]",
+                          ("//ul/li[@class='a']",))
+    assert [(s.kind, s.value) for s in chain] == [
+        (RELATIVE, "//ul/li[@class='a']"),
+        (XPATH, "/html/body/div[2]//li[contains(@class, 'a')]")]
+
+
+def test_relative_fallbacks_must_match_a_single_element(make_driver):
+    xpath = "/html/body//li[contains(@class, 'a')]"
+    registry = LocatorRegistry({"item": ["//li[@class='a']"]})
+    driver = make_driver({(By.XPATH, "//li[@class='a']"): ["one", "two"],
+                      (By.XPATH, xpath): ["one"]})
+    assert registry.find(driver, "page", "item", xpath) == "one"
+    assert registry.report() == {"page.item": {XPATH: 1}}
+
+
+def test_the_strategy_that_worked_is_tried_first_next_time(make_driver):
+    registry = LocatorRegistry({})
+    driver = make_driver({(By.XPATH, "/html/body/div[2]"): ["div"]})
+    registry.find(driver, "page", "box", "/html/body/div[2]")
+    driver.lookups.clear()
+
+    registry.find(driver, "page", "box", "/html/body/div[2]")
+    assert driver.lookups == [(By.XPATH, "/html/body/div[2]")]
+
+
+def test_missing_elements_raise(make_driver):
+    with pytest.raises(NoSuchElementException):
+        LocatorRegistry({}).find(make_driver(), "page", "box", "//*[@id='x']")
@@ -0,0 +1,51 @@
+'''
+test_metrics.py
+------------
+    Percentiles & the per step metrics collected while vendors run.
+'''
+import pytest
+
+from utils.metrics import (MetricsCollector, command_count, instrument_driver,
+                           percentile)
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    ([], 95, 0.0),
+    ([3.0], 99, 3.0),
+    ([1, 2, 3, 4, 5], 50, 3),
+    ([5, 1, 4, 2, 3], 0, 1),
+    ([5, 1, 4, 2, 3], 100, 5),
+    ([1, 2, 3, 4], 50, 2.5),
+    ([10, 20], 95, 19.5),
+])
+def test_percentile_interpolates_between_ranks(values, pct, expected):
+    assert percentile(values, pct) == pytest.approx(expected)
+
+
+def test_instrumented_drivers_count_commands(make_driver):
+    driver = instrument_driver(make_driver())
+    assert instrument_driver(driver) is driver
+    driver.execute("get", {"url": "https://shop.test/"})
+    driver.execute("findElement", {})
+    assert command_count(driver) == 2
+
+
+def test_collector_summarises_each_steps_samples(make_driver, make_process):
+    collector = MetricsCollector()
+    process = make_process(instrument_driver(make_driver()))
+    for elapsed, commands in ((1.0, 2), (3.0, 4)):
+        collector.step_started(process, "search")
+        for _ in range(commands):
+            process.driver.execute("findElement", {})
+        collector.step_finished(process, "search", elapsed)
+    collector.step_started(process, "search")
+    collector.step_finished(process, "search", 2.0, error=ValueError())
+
+    stats = collector.summary()["search"]
+    assert stats["count"] == 3
+    assert stats["failures"] == 1
+    assert stats["wall"]["sum"] == 6.0
+    assert stats["wall"]["p50"] == 2.0
+    assert stats["commands"]["mean"] == 2.0
+    assert 'autocat_step_failures_total{step="search"} 1' in \
+        collector.to_prometheus()
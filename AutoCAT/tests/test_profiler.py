@@ -0,0 +1,69 @@
+'''
+test_profiler.py
+------------
+    Writing each vendor's step profiles, and which steps count towards the
+    per worker estimate.
+'''
+import json
+import threading
+
+import pytest
+
+from utils.profiler import ResourceProfiler
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    return ResourceProfiler(directory=str(tmp_path), interval=60)
+
+
+def _written(profiler, vendor: str = "a@x.com") -> list:
+    with open(f"{profiler.directory}/{vendor}.json") as f:
+        return [step["step"] for step in json.load(f)["steps"]]
+
+
+def _nested(profiler) -> dict:
+    return {r["step"]: r["nested"] for r in profiler._finished}
+
+
+def test_a_vendors_profile_holds_every_step_after_export(make_process,
+                                                         profiler):
+    process = make_process(step_hooks=[profiler])
+    process.run_all()
+    profiler.export()
+
+    assert _written(profiler) == list(process.STEPS) + ["run_all"]
+    assert _nested(profiler)["run_all"] is False
+    assert all(_nested(profiler)[step] for step in process.STEPS)
+
+
+def test_a_failed_run_is_written_with_the_steps_it_got_through(
+        make_process, profiler):
+    process = make_process(step_hooks=[profiler])
+
+    def fail(process):
+        process.run(process.STEPS[0])
+        process.run(process.STEPS[1], lambda _: 1 / 0)
+
+    with pytest.raises(ZeroDivisionError):
+        process.run("run_all", fail)
+    assert _written(profiler) == list(process.STEPS[:2]) + ["run_all"]
+    assert profiler._vendors == {}
+
+
+def test_steps_run_alongside_on_another_thread_are_nested(make_process,
+                                                          profiler):
+    main = make_process(step_hooks=[profiler])
+    aux = main.spawn()
+
+    def run_alongside(process):
+        thread = threading.Thread(
+            target=aux.run, args=("complete_company_details",))
+        thread.start()
+        thread.join()
+
+    main.run("run_all", run_alongside)
+    profiler.export()
+    assert _nested(profiler) == {"complete_company_details": True,
+                                 "run_all": False}
+    assert _written(profiler) == ["complete_company_details", "run_all"]
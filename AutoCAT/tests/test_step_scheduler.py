@@ -0,0 +1,102 @@
+'''
+test_step_scheduler.py
+------------
+    Running a process's steps in dependency order, with & without an
+    auxiliary process to overlap them on.
+'''
+import threading
+
+import pytest
+
+from procedures.step_scheduler import ANY, Step, StepScheduler
+
+
+GRAPH = {
+    "search": Step(),
+    "address": Step(requires=("search",)),
+    "details": Step(requires=("search",), inputs=("profile_id",),
+                    outputs=("website",), lane=ANY),
+    "categories": Step(requires=("address",)),
+    "clean_up": Step(requires=("details", "categories")),
+}
+
+
+@pytest.fixture
+def log() -> list:
+    return []
+
+
+@pytest.fixture
+def process(make_process, log):
+    '''A process whose steps log that they ran (& on which copy).'''
+    # Set once 'details' has started, for the step that must overlap it:
+    details_started = threading.Event()
+    failing = []
+
+    def ran(process, step: str) -> None:
+        log.append((step, "aux" if process.parent else "main"))
+        if step in failing:
+            raise ValueError(f"{step} failed")
+
+    def search(process):
+        process.profile_id = "42"
+        ran(process, "search")
+
+    def address(process):
+        # (Only returns once 'details' is running on the other driver)
+        assert details_started.wait(timeout=5)
+        ran(process, "address")
+
+    def details(process):
+        details_started.set()
+        process.website = f"site-{process.profile_id}"
+        ran(process, "details")
+
+    steps = {"search": search, "address": address, "details": details}
+    for step in ("categories", "clean_up"):
+        steps[step] = lambda process, step=step: ran(process, step)
+    process = make_process(steps=steps, graph=GRAPH)
+    process.profile_id = process.website = None
+    process.details_started = details_started
+    process.failing = failing
+    return process
+
+
+def test_steps_run_in_order_without_an_aux_process(process, log):
+    finished = []
+    process.details_started.set()
+    StepScheduler(process).run(["search"], on_complete=finished.append)
+    assert [step for step, _ in log] == \
+        ["address", "details", "categories", "clean_up"]
+    assert finished == ["address", "details", "categories", "clean_up"]
+
+
+def test_independent_steps_overlap_on_the_aux_process(process, log):
+    finished = []
+    StepScheduler(process, process.spawn()).run([],
+                                                on_complete=finished.append)
+
+    assert ("details", "aux") in log
+    assert log[0] == ("search", "main")
+    assert log[-1] == ("clean_up", "main")
+    assert log.index(("categories", "main")) > \
+        log.index(("address", "main"))
+    assert sorted(finished) == sorted(GRAPH)
+    # Inputs went over to the aux process & outputs came back:
+    assert process.website == "site-42"
+
+
+def test_the_first_error_is_raised_and_no_new_steps_start(process, log):
+    process.details_started.set()
+    process.failing.append("address")
+    with pytest.raises(ValueError, match="address failed"):
+        StepScheduler(process, process.spawn()).run([])
+    assert ("categories", "main") not in log
+    assert ("clean_up", "main") not in log
+
+
+def test_unschedulable_steps_raise(make_process):
+    graph = dict(GRAPH, search=Step(requires=("clean_up",)))
+    process = make_process(steps={}, graph=graph)
+    with pytest.raises(RuntimeError, match="can't be scheduled"):
+        StepScheduler(process, process.spawn()).run([])
@@ -0,0 +1,164 @@
+'''
+test_tracing.py
+------------
+    Building network waterfalls from Chrome's performance log, and which
+    steps they're counted in.
+'''
+import json
+import threading
+
+import pytest
+
+from utils.tracing import NetworkTracer, build_waterfall
+
+
+def _sent(request_id, url, at, kind="Document", loader=None, redirect=None):
+    params = {"requestId": request_id, "loaderId": loader or request_id,
+              "request": {"url": url}, "type": kind, "timestamp": at}
+    if redirect is not None:
+        params["redirectResponse"] = {"status": redirect}
+    return ("Network.requestWillBeSent", params)
+
+
+def _received(request_id, status, kind="Document"):
+    return ("Network.responseReceived",
+            {"requestId": request_id, "type": kind,
+             "response": {"status": status}})
+
+
+def _finished(request_id, at, size):
+    return ("Network.loadingFinished",
+            {"requestId": request_id, "timestamp": at,
+             "encodedDataLength": size})
+
+
+def test_builds_a_pages_waterfall():
+    events = [
+        _sent("1", "https://shop.test/admin.php", 100.0),
+        _received("1", 200),
+        _finished("1", 100.5, 2000),
+        _sent("2", "https://cdn.test/app.js", 100.6, kind="Script",
+              loader="1"),
+        ("Page.domContentEventFired", {"timestamp": 100.8}),
+        ("Network.loadingFailed", {"requestId": "2", "timestamp": 101.0,
+                                   "blockedReason": "inspector"}),
+        ("Page.loadEventFired", {"timestamp": 101.2}),
+    ]
+    waterfall = build_waterfall(events)
+
+    assert waterfall["requests"] == 2
+    assert waterfall["failed_requests"] == 1
+    assert waterfall["bytes"] == 2000
+    assert waterfall["pages"] == [{"url": "https://shop.test/admin.php",
+                                   "dom_content_loaded": 0.8, "load": 1.2}]
+    assert waterfall["hosts"]["cdn.test"]["failed"] == 1
+    assert waterfall["waterfall"] == [
+        [0.0, 0.5, "Document", 200, 2000, "https://shop.test/admin.php"],
+        [0.6, 0.4, "Script", None, 0, "https://cdn.test/app.js"]]
+    assert waterfall["slowest"][0]["url"] == "https://shop.test/admin.php"
+
+
+def test_redirect_hops_are_requests_of_their_own():
+    events = [
+        _sent("1", "https://shop.test/login", 10.0),
+        _sent("1", "https://shop.test/admin.php", 10.2, redirect=302),
+        _finished("1", 10.5, 100),
+    ]
+    waterfall = build_waterfall(events)
+    assert [row[3] for row in waterfall["waterfall"]] == [302, None]
+    assert [page["url"] for page in waterfall["pages"]] == \
+        ["https://shop.test/login"]
+
+
+def test_unfinished_requests_have_no_duration():
+    waterfall = build_waterfall([_sent("1", "https://shop.test/", 5.0)])
+    assert waterfall["waterfall"] == [
+        [0.0, None, "Document", None, 0, "https://shop.test/"]]
+    assert waterfall["slowest"] == []
+
+
+def _load(driver, request_id, url, at):
+    '''Logs a request of the page to the (stand-in) driver.'''
+    for method, params in (_sent(request_id, url, at),
+                           _finished(request_id, at + 0.1, 10)):
+        driver.log_event(method, params)
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    return NetworkTracer(directory=str(tmp_path))
+
+
+def _written(tracer, vendor: str = "a@x.com") -> dict:
+    with open(f"{tracer.directory}/{vendor}.json") as f:
+        return {step["step"]: step for step in json.load(f)["steps"]}
+
+
+def test_a_vendors_waterfalls_hold_every_step_after_export(make_driver,
+                                                           make_process,
+                                                           tracer):
+    process = make_process(make_driver(), step_hooks=[tracer])
+    process.run_all()
+    tracer.export()
+
+    assert list(_written(tracer)) == list(process.STEPS) + ["run_all"]
+    assert tracer._vendors == {}
+
+
+def test_nested_steps_are_part_of_the_outer_step(make_driver, make_process,
+                                                 tracer):
+    driver = make_driver()
+    process = make_process(driver, step_hooks=[tracer])
+
+    def load_pages(process):
+        _load(driver, "1", "https://shop.test/a", 1.0)
+        process.run("read_account_header",
+                    lambda _: _load(driver, "2", "https://shop.test/b", 2.0))
+
+    process.run("run_all", load_pages)
+    tracer.export()
+
+    written = _written(tracer)
+    assert written["read_account_header"]["requests"] == 1
+    assert written["read_account_header"]["nested"]
+    assert written["run_all"]["requests"] == 2
+    assert not written["run_all"]["nested"]
+
+
+def test_steps_run_alongside_on_another_thread_are_nested(make_driver,
+                                                          make_process,
+                                                          tracer):
+    main = make_process(make_driver(), step_hooks=[tracer])
+    aux_driver = make_driver()
+    aux = main.spawn(aux_driver)
+
+    def run_alongside(process):
+        thread = threading.Thread(target=aux.run, args=(
+            "complete_company_details",
+            lambda _: _load(aux_driver, "9", "https://shop.test/details",
+                            3.0)))
+        thread.start()
+        thread.join()
+
+    main.run("run_all", run_alongside)
+    tracer.export()
+
+    written = _written(tracer)
+    assert list(written) == ["complete_company_details", "run_all"]
+    assert written["complete_company_details"]["nested"]
+    assert written["run_all"]["requests"] == 1
+    # (Counted once, through run_all)
+    assert tracer.summary()["urls"]["https://shop.test/details"][
+        "requests"] == 1
+
+
+def test_only_the_latest_steps_are_kept_for_the_summary(make_driver,
+                                                        make_process,
+                                                        tmp_path):
+    tracer = NetworkTracer(directory=str(tmp_path), max_finished=3)
+    process = make_process(make_driver(), step_hooks=[tracer])
+    process.run_all()
+
+    assert [r["step"] for r in tracer._finished] == \
+        list(process.STEPS[-2:]) + ["run_all"]
+    assert len(_written(tracer)) == len(process.STEPS) + 1
@@ -0,0 +1,132 @@
+'''
+test_work_queue.py
+------------
+    The MongoDB work queue's lease lifecycle, against an in-process mock.
+'''
+import mongomock
+import pytest
+
+from utils.database import (LeaseLost, Status, _build_vendor, claim_vendor,
+                            complete_vendor, enqueue_vendors, fail_vendor,
+                            reclaim_expired_leases, requeue_failed_vendors)
+
+
+@pytest.fixture
+def vendors():
+    return mongomock.MongoClient().autocat.vendor
+
+
+def _status(vendors, email: str) -> str:
+    return vendors.find_one({"email": email})["status"]
+
+
+def test_enqueue_skips_vendors_already_in_the_queue(vendors):
+    assert enqueue_vendors(["A@x.com", "b@x.com"], collection=vendors) == 2
+    assert enqueue_vendors(["a@x.com ", "c@x.com"], collection=vendors) == 1
+    assert vendors.count_documents({"status": Status.NEW.value}) == 3
+
+
+def test_claim_takes_the_oldest_new_vendor(vendors):
+    enqueue_vendors(["a@x.com"], collection=vendors)
+    enqueue_vendors(["b@x.com"], collection=vendors)
+
+    assert claim_vendor("w1", collection=vendors) == "a@x.com"
+    assert claim_vendor("w2", collection=vendors) == "b@x.com"
+    assert claim_vendor("w3", collection=vendors) is None
+
+    doc = vendors.find_one({"email": "a@x.com"})
+    assert doc["status"] == Status.INPROGRESS.value
+    assert doc["lease_owner"] == "w1"
+    assert doc["attempts"] == 1
+
+
+def test_expired_leases_can_be_claimed_again(vendors):
+    enqueue_vendors(["a@x.com"], collection=vendors)
+    claim_vendor("w1", lease_seconds=-1, collection=vendors)
+
+    assert claim_vendor("w2", collection=vendors) == "a@x.com"
+    doc = vendors.find_one({"email": "a@x.com"})
+    assert doc["lease_owner"] == "w2"
+    assert doc["attempts"] == 2
+
+
+def test_live_leases_are_not_claimed_again(vendors):
+    enqueue_vendors(["a@x.com"], collection=vendors)
+    claim_vendor("w1", collection=vendors)
+
+    assert claim_vendor("w2", collection=vendors) is None
+    assert reclaim_expired_leases(collection=vendors) == 0
+
+
+def test_reclaim_puts_expired_leases_back_as_new(vendors):
+    enqueue_vendors(["a@x.com"], collection=vendors)
+    claim_vendor("w1", lease_seconds=-1, collection=vendors)
+
+    assert reclaim_expired_leases(collection=vendors) == 1
+    doc = vendors.find_one({"email": "a@x.com"})
+    assert doc["status"] == Status.NEW.value
+    assert "lease_owner" not in doc
+
+
+def test_complete_marks_the_vendor_done(vendors):
+    enqueue_vendors(["a@x.com"], collection=vendors)
+    claim_vendor("w1", collection=vendors)
+
+    complete_vendor("a@x.com", "w1", collection=vendors)
+    doc = vendors.find_one({"email": "a@x.com"})
+    assert doc["status"] == Status.DONE.value
+    assert "lease_owner" not in doc and "lease_expires" not in doc
+
+
+def test_complete_raises_once_the_lease_is_lost(vendors):
+    enqueue_vendors(["a@x.com"], collection=vendors)
+    claim_vendor("w1", lease_seconds=-1, collection=vendors)
+    claim_vendor("w2", collection=vendors)
+
+    with pytest.raises(LeaseLost):
+        complete_vendor("a@x.com", "w1", collection=vendors)
+    assert _status(vendors, "a@x.com") == Status.INPROGRESS.value
+
+
+def test_complete_accepts_vendors_the_saved_stats_finished(vendors):
+    enqueue_vendors(["a@x.com"], collection=vendors)
+    claim_vendor("w1", collection=vendors)
+    vendors.bulk_write([_build_vendor("123", "456", "a@x.com", "Brand")])
+
+    complete_vendor("a@x.com", "w1", collection=vendors)
+    assert _status(vendors, "a@x.com") == Status.DONE.value
+
+
+def test_saving_the_stats_keeps_the_claim_count(vendors):
+    enqueue_vendors(["a@x.com"], collection=vendors)
+    claim_vendor("w1", lease_seconds=-1, collection=vendors)
+    claim_vendor("w2", collection=vendors)
+
+    vendors.bulk_write([_build_vendor("123", "456", "a@x.com", "Brand")])
+    doc = vendors.find_one({"email": "a@x.com"})
+    assert doc["attempts"] == 2
+    assert doc["brand_name"] == "Brand"
+
+
+def test_fail_only_applies_to_the_lease_owner(vendors):
+    enqueue_vendors(["a@x.com"], collection=vendors)
+    claim_vendor("w1", collection=vendors)
+
+    fail_vendor("a@x.com", "w2", "not mine", collection=vendors)
+    assert _status(vendors, "a@x.com") == Status.INPROGRESS.value
+
+    fail_vendor("a@x.com", "w1", "boom", collection=vendors)
+    doc = vendors.find_one({"email": "a@x.com"})
+    assert doc["status"] == Status.FAILED.value
+    assert doc["last_error"] == "boom"
+    assert "lease_owner" not in doc
+
+
+def test_failed_vendors_are_only_retried_when_requeued(vendors):
+    enqueue_vendors(["a@x.com"], collection=vendors)
+    claim_vendor("w1", collection=vendors)
+    fail_vendor("a@x.com", "w1", "boom", collection=vendors)
+
+    assert claim_vendor("w2", collection=vendors) is None
+    assert requeue_failed_vendors(collection=vendors) == 1
+    assert claim_vendor("w2", collection=vendors) == "a@x.com"
@@ -0,0 +1,424 @@
+'''
+backend_client.py
+------------
+    A browserless HTTP client for reading the backend's server-rendered
+    pages, so read-only work doesn't need a Chrome tab.
+'''
+import html
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlencode, urljoin
+
+import urllib3
+from dotenv import load_dotenv
+
+from xpaths.approved_paths import (
+    COUNTRY_DD, STATE_AS_DD, STATE_AS_FIELD, CITY_FIELD,
+    WEBSITE_FIELD, COMPANY_DESC_FIELD, INSTAGRAM_FIELD,
+)
+from utils.dom import AUTO, DATA_OPTION, SELECTED, TEXT, VALUE
+
+
+# Max. keep-alive connections kept open to the backend (shared by every
+#   client in the process) & the seconds before a request is given up on:
+HTTP_POOL_SIZE = 8
+HTTP_TIMEOUT = 10
+
+_POOL_LOCK = threading.Lock()
+_pool = None
+_executor = None
+
+# What each account tab read returns, as {name: (xpath, what to read)}. Only
+#   id based xpaths (ex. "//*[@id='location-city']") are supported:
+ADDRESS_FIELDS = {
+    "country": (COUNTRY_DD, SELECTED),
+    "state_dd": (STATE_AS_DD, DATA_OPTION),
+    "state_field": (STATE_AS_FIELD, VALUE),
+    "city": (CITY_FIELD, VALUE),
+}
+DETAILS_FIELDS = {
+    "website": (WEBSITE_FIELD, VALUE),
+    "description": (COMPANY_DESC_FIELD, AUTO),
+    "instagram": (INSTAGRAM_FIELD, VALUE),
+}
+
+_ID_XPATH = re.compile(r"^//[\w*]+\[@id='([^']+)'\]$")
+
+# Elements whose content is text, not markup (as in a browser):
+_RAW_TEXT_TAGS = ("textarea",)
+
+# The element the login page is recognised by:
+_LOGIN_FORM_ID = "login_form"
+
+
+class SessionExpired(Exception):
+    '''Raised when the backend answers with its login page.'''
+
+
+def get_http_pool() -> urllib3.PoolManager:
+    '''Returns this process's pooled, keep-alive HTTP connection manager.'''
+    global _pool
+    with _POOL_LOCK:
+        if _pool is None:
+            _pool = urllib3.PoolManager(
+                maxsize=HTTP_POOL_SIZE, block=False,
+                timeout=urllib3.Timeout(total=HTTP_TIMEOUT),
+                retries=urllib3.Retry(total=2, redirect=0,
+                                      raise_on_redirect=False))
+        return _pool
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    '''Returns the threads background page reads run on.'''
+    global _executor
+    with _POOL_LOCK:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=HTTP_POOL_SIZE,
+                                           thread_name_prefix="http-read")
+        return _executor
+
+
+def _element_id(xpath: str) -> str:
+    '''Returns the id an xpath like "//*[@id='name']" selects.'''
+    match = _ID_XPATH.match(xpath)
+    if not match:
+        raise ValueError(f"Only id based xpaths are supported: {xpath}")
+    return match.group(1)
+
+
+class _ElementParser(HTMLParser):
+    '''Collects the attributes, text & options of the elements with the
+    given ids.'''
+
+    def __init__(self, ids):
+        super().__init__(convert_charrefs=True)
+        self._ids = set(ids)
+        self.elements: dict = {}
+        self.ids_seen: set = set()
+        # The elements whose text we're collecting, as [element, tag, how
+        #   many tags of the same name are open inside it]:
+        self._open: list = []
+        self._option = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: (value if value is not None else "")
+                 for name, value in attrs}
+        if "id" in attrs:
+            self.ids_seen.add(attrs["id"])
+
+        # [CASE] A tag named like an element we're in -> it's nested:
+        for entry in self._open:
+            if entry[1] == tag:
+                entry[2] += 1
+
+        if attrs.get("id") in self._ids:
+            element = {"tag": tag, "attrs": attrs, "text": "", "options": [],
+                       "raw": False}
+            self.elements[attrs["id"]] = element
+            if tag not in ("input",):
+                self._open.append([element, tag, 0])
+            # [CASE] A textarea -> read its content as text, not tags:
+            if tag in _RAW_TEXT_TAGS and tag not in getattr(
+                    self, "RCDATA_CONTENT_ELEMENTS", ()):
+                self.set_cdata_mode(tag)
+                element["raw"] = True
+            return
+
+        if self._open and self._open[-1][1] == "select" and tag == "option":
+            self._option = {"value": attrs.get("value"), "text": "",
+                            "selected": "selected" in attrs}
+            self._open[-1][0]["options"].append(self._option)
+
+    def handle_endtag(self, tag):
+        if tag == "option":
+            self._option = None
+        for entry in list(self._open):
+            if entry[1] != tag:
+                continue
+            if entry[2]:
+                entry[2] -= 1
+            else:
+                self._open.remove(entry)
+
+    def handle_data(self, data):
+        if self._option is not None:
+            self._option["text"] += data
+        for element, _, _ in self._open:
+            element["text"] += data
+
+
+def _read(element: dict, kind: str):
+    '''Reads an element the way utils.dom.read_fields would in the
+    browser.'''
+    if element is None:
+        return None
+    tag, attrs = element["tag"], element["attrs"]
+    # (Raw text isn't unescaped by the parser.)
+    text = html.unescape(element["text"]) if element["raw"] \
+        else element["text"]
+    options = [dict(o, value=o["value"] if o["value"] is not None
+                    else o["text"].strip()) for o in element["options"]]
+
+    if kind == AUTO:
+        kind = VALUE if tag in ("input", "textarea", "select") else TEXT
+    if kind == TEXT:
+        return " ".join(text.split())
+    if kind == VALUE:
+        if tag == "textarea":
+            # (The parser keeps the leading newline browsers drop.)
+            return re.sub(r"^\r?\n", "", text)
+        if tag == "select":
+            chosen = _selected_option(options)
+            return chosen["value"] if chosen else ""
+        return attrs.get("value", "")
+    if kind == SELECTED:
+        chosen = _selected_option(options)
+        return chosen["text"].strip() if chosen else None
+    if kind == DATA_OPTION:
+        data_value = attrs.get("data-value")
+        matches = [o for o in options if o["value"] == data_value]
+        return matches[0]["text"].strip() if matches else None
+    if kind.startswith("@"):
+        return attrs.get(kind[1:])
+    return None
+
+
+def _selected_option(options: list) -> dict:
+    '''Returns the option a browser would show as selected.'''
+    chosen = [o for o in options if o["selected"]]
+    if chosen:
+        return chosen[-1]
+    return options[0] if options else None
+
+
+def parse_fields(page: str, locators: dict) -> dict:
+    '''The server side counterpart of utils.dom.read_fields: reads the named
+    fields out of a page's HTML.
+
+    Parameters
+    ----------
+        page : str
+            The page's HTML.
+
+        locators : dict
+            Maps a name to a tuple of (id based xpath, what to read).
+
+    Returns
+    -------
+        dict
+            The same names mapped to what was read, or None for elements
+            that couldn't be found.
+
+    Raises
+    ------
+        SessionExpired
+            When the page is the backend's login form.
+    '''
+    ids = {name: _element_id(xpath) for name, (xpath, _) in locators.items()}
+    parser = _ElementParser(ids.values())
+    parser.feed(page)
+    parser.close()
+
+    if _LOGIN_FORM_ID in parser.ids_seen:
+        raise SessionExpired("The backend asked us to log in again.")
+
+    return {name: _read(parser.elements.get(ids[name]), kind)
+            for name, (_, kind) in locators.items()}
+
+
+class BackendClient:
+    '''A class for fetching & reading the backend's pages over plain HTTP,
+    reusing a logged-in webdriver's cookies (or logging in itself).
+
+    Attributes
+    ----------
+        landing_url : str, optional
+            The backend landing page. (default BACKEND_LANDING_URL environ.
+            variable)
+
+        cookies : list [dict], optional
+            Session cookies, as returned by a webdriver's get_cookies().
+
+    Methods
+    -------
+        from_driver(driver):
+            Returns a client sharing the webdriver's backend session.
+
+        login():
+            Logs in with ADMIN_EMAIL & ADMIN_PASSWORD.
+
+        fetch(target, **params):
+            Returns the HTML of a backend page.
+
+        read_company_address(profile_id):
+            Returns the vendor's country, state & city.
+
+        read_company_details(profile_id):
+            Returns the vendor's website, description & Instagram handle.
+
+        read_vendor(profile_id):
+            Reads both tabs concurrently.
+
+        read_vendor_async(profile_id):
+            Starts reading both tabs in the background.
+    '''
+
+    def __init__(self, landing_url: str = None, cookies: list = None):
+        load_dotenv()
+        self._landing_url = landing_url or \
+            os.environ.get("BACKEND_LANDING_URL")
+        self._cookies = {c["name"]: c["value"] for c in cookies or []}
+        self._pool = get_http_pool()
+
+    @classmethod
+    def from_driver(cls, driver, landing_url: str = None) -> "BackendClient":
+        '''Returns a client sharing the webdriver's backend session.'''
+        return cls(landing_url, cookies=driver.get_cookies())
+
+    @property
+    def landing_url(self) -> str:
+        return self._landing_url
+
+
+    def _request(self, method: str, url: str, fields: dict = None):
+        '''Sends a request with our cookies, remembering any new ones the
+        backend sets. Redirects are followed by hand so cookies set along
+        the way aren't lost.'''
+        for _ in range(5):
+            headers = {"Cookie": "; ".join(f"{name}={value}" for name, value
+                                           in self._cookies.items())}
+            if fields is not None:
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+                response = self._pool.request(method, url, headers=headers,
+                                              body=urlencode(fields),
+                                              redirect=False)
+            else:
+                response = self._pool.request(method, url, headers=headers,
+                                              redirect=False)
+
+            for cookie in response.headers.getlist("Set-Cookie"):
+                name, _, value = cookie.split(";")[0].partition("=")
+                self._cookies[name.strip()] = value.strip()
+
+            location = response.get_redirect_location()
+            if not location:
+                return response
+            url = urljoin(url, location)
+            method, fields = "GET", None
+        raise urllib3.exceptions.MaxRetryError(self._pool, url,
+                                               "Too many redirects")
+
+
+    def login(self) -> None:
+        '''Logs in with the ADMIN_EMAIL & ADMIN_PASSWORD environ. variables,
+        filling in the login form's email & password inputs (and passing
+        along any hidden ones, ex. a CSRF token).'''
+        login_url = os.environ.get("BACKEND_LOGIN_URL")
+        response = self._request("GET", login_url)
+        form = _LoginFormParser()
+        form.feed(response.data.decode("utf-8", "replace"))
+
+        fields = dict(form.hidden)
+        fields[form.email_name or "login"] = os.environ.get("ADMIN_EMAIL", "")
+        fields[form.password_name or "password"] = \
+            os.environ.get("ADMIN_PASSWORD", "")
+        action = urljoin(login_url, form.action or login_url)
+
+        self._request("POST", action, fields)
+        # [CHECK] We're logged in now:
+        self.fetch("")
+
+
+    def fetch(self, target: str, **params) -> str:
+        '''Returns the HTML of the backend page with the given target.
+
+        Raises
+        ------
+            SessionExpired
+                When the backend bounces us to the login page.
+        '''
+        query = {"target": target, **params} if target else params
+        url = self._landing_url
+        if query:
+            url += "?" + urlencode(query)
+        response = self._request("GET", url)
+        page = response.data.decode("utf-8", "replace")
+        if f"id=\"{_LOGIN_FORM_ID}\"" in page or \
+                f"id='{_LOGIN_FORM_ID}'" in page:
+            raise SessionExpired("The backend asked us to log in again.")
+        return page
+
+
+    def read_company_address(self, profile_id: str) -> dict:
+        '''Returns the vendor's 'country', 'state_dd', 'state_field' &
+        'city' from their Company Address tab.'''
+        page = self.fetch("companyAddress", profile_id=profile_id)
+        return parse_fields(page, ADDRESS_FIELDS)
+
+
+    def read_company_details(self, profile_id: str) -> dict:
+        '''Returns the vendor's 'website', 'description' & 'instagram' from
+        their Company Details tab.'''
+        page = self.fetch("vendor", profile_id=profile_id)
+        return parse_fields(page, DETAILS_FIELDS)
+
+
+    def read_vendor(self, profile_id: str) -> dict:
+        '''Reads the Company Address & Company Details tabs concurrently.
+
+        Returns
+        -------
+            dict
+                With the keys 'address' & 'details'.
+        '''
+        futures = self.read_vendor_async(profile_id)
+        return {tab: future.result() for tab, future in futures.items()}
+
+
+    def read_vendor_async(self, profile_id: str) -> dict:
+        '''Starts reading the Company Address & Company Details tabs in the
+        background.
+
+        Returns
+        -------
+            dict [concurrent.futures.Future]
+                With the keys 'address' & 'details'.
+        '''
+        executor = _get_executor()
+        return {
+            "address": executor.submit(self.read_company_address, profile_id),
+            "details": executor.submit(self.read_company_details, profile_id),
+        }
+
+
+class _LoginFormParser(HTMLParser):
+    '''Finds the login form's action and the names of its inputs.'''
+
+    def __init__(self):
+        super().__init__()
+        self._in_form = False
+        self.action = None
+        self.hidden: dict = {}
+        self.email_name = None
+        self.password_name = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form" and attrs.get("id") == _LOGIN_FORM_ID:
+            self._in_form = True
+            self.action = attrs.get("action")
+        elif tag == "input" and self._in_form:
+            kind = (attrs.get("type") or "text").lower()
+            if kind == "hidden":
+                self.hidden[attrs.get("name")] = attrs.get("value") or ""
+            elif kind == "password":
+                self.password_name = attrs.get("name")
+            elif kind in ("text", "email") and not self.email_name:
+                self.email_name = attrs.get("name")
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self._in_form = False
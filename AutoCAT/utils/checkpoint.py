@@ -0,0 +1,90 @@
+'''
+checkpoint.py
+------------
+    A local store of each vendor's progress through the approval process, so
+    a failed run can pick up where it left off.
+'''
+import json
+import os
+import re
+import time
+
+
+# Where checkpoints live (relative to the 'AutoCAT' folder):
+DEFAULT_CHECKPOINT_DIR = ".checkpoints"
+
+
+class CheckpointStore:
+    '''A class for saving & loading per-vendor checkpoints, one JSON file per
+    vendor email.
+
+    A checkpoint records the steps a vendor has completed along with the
+    state (profile id, category id, location fields, etc.) those steps
+    produced.
+
+    Attributes
+    ----------
+        directory : str, optional
+            The folder checkpoints are saved in. (default
+            DEFAULT_CHECKPOINT_DIR)
+
+    Methods
+    -------
+        load(email):
+            Returns the vendor's checkpoint, or None if there isn't one.
+
+        save(email, completed, state):
+            Saves the vendor's completed steps & state.
+
+        clear(email):
+            Deletes the vendor's checkpoint.
+    '''
+
+    def __init__(self, directory: str = DEFAULT_CHECKPOINT_DIR):
+        self._directory = directory
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+
+    def _path(self, email: str) -> str:
+        '''Returns the path of the vendor's checkpoint file.'''
+        name = re.sub(r"[^\w.@-]", "_", email.strip().lower())
+        return os.path.join(self._directory, f"{name}.json")
+
+
+    def load(self, email: str) -> dict:
+        '''Returns the vendor's checkpoint, or None if there isn't one.
+
+        Returns
+        -------
+            dict
+                With the keys 'completed' (list of step names), 'state' (dict)
+                and 'saved_at' (timestamp).
+        '''
+        try:
+            with open(self._path(email), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+    def save(self, email: str, completed: list, state: dict) -> None:
+        '''Saves the vendor's completed steps & state.'''
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(email)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"completed": list(completed),
+                       "state": state,
+                       "saved_at": time.time()}, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+    def clear(self, email: str) -> None:
+        '''Deletes the vendor's checkpoint.'''
+        try:
+            os.remove(self._path(email))
+        except FileNotFoundError:
+            pass
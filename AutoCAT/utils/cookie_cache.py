@@ -0,0 +1,263 @@
+'''
+cookie_cache.py
+------------
+    An encrypted, on-disk cache of the backend's session cookies, so new
+    webdrivers can skip the login form across program runs.
+'''
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from cryptography.fernet import Fernet, InvalidToken
+from dotenv import load_dotenv
+from selenium.common.exceptions import WebDriverException
+
+
+# Where the cache lives (relative to the 'AutoCAT' folder) & how long (in
+#   seconds) cached cookies are trusted for. A TTL of 0 disables the cache:
+DEFAULT_CACHE_PATH = ".session_cache"
+DEFAULT_CACHE_TTL = 8 * 60 * 60
+
+# Key derivation settings for when no COOKIE_CACHE_KEY is provided:
+_KDF_ITERATIONS = 200_000
+_SALT_BYTES = 16
+
+
+class CookieCache:
+    '''A class for saving & loading the backend's session cookies to an
+    encrypted file.
+
+    The encryption key is read from the COOKIE_CACHE_KEY environ. variable
+    (a Fernet key) or, failing that, derived from the admin's credentials.
+
+    Attributes
+    ----------
+        path : str, optional
+            The path to the cache file. (default COOKIE_CACHE_PATH environ.
+            variable or DEFAULT_CACHE_PATH)
+
+        ttl : int, optional
+            Seconds before cached cookies are considered stale. (default
+            COOKIE_CACHE_TTL environ. variable or DEFAULT_CACHE_TTL)
+
+    Methods
+    -------
+        load():
+            Returns the cached cookies, or an empty list if there are none
+            or they've gone stale.
+
+        save(cookies):
+            Encrypts & saves the given cookies.
+
+        clear():
+            Deletes the cache file.
+    '''
+
+    def __init__(self, path: str = None, ttl: int = None):
+        load_dotenv()
+        self._path = path or os.environ.get("COOKIE_CACHE_PATH",
+                                            DEFAULT_CACHE_PATH)
+        if ttl is None:
+            ttl = int(os.environ.get("COOKIE_CACHE_TTL", DEFAULT_CACHE_TTL))
+        self._ttl = ttl
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0
+
+
+    def _fernet(self, salt: bytes) -> Fernet:
+        '''Builds our Fernet cipher for the given salt.'''
+        key = os.environ.get("COOKIE_CACHE_KEY")
+        if key:
+            return Fernet(key.encode())
+
+        secret = "{}:{}".format(os.environ.get("ADMIN_EMAIL", ""),
+                                os.environ.get("ADMIN_PASSWORD", ""))
+        derived = hashlib.pbkdf2_hmac("sha256", secret.encode(), salt,
+                                      _KDF_ITERATIONS)
+        return Fernet(base64.urlsafe_b64encode(derived))
+
+
+    def load(self) -> list:
+        '''Returns the cached cookies, or an empty list if there are none or
+        they've gone stale.
+
+        Returns
+        -------
+            list [dict]
+        '''
+        if not self.enabled or not os.path.exists(self._path):
+            return []
+
+        try:
+            with open(self._path, "r") as f:
+                stored = json.load(f)
+            salt = base64.b64decode(stored["salt"])
+            token = stored["token"].encode()
+            payload = json.loads(self._fernet(salt).decrypt(token))
+        except (OSError, ValueError, KeyError, InvalidToken):
+            # [CASE] Corrupt file or credentials changed -> Start over:
+            return []
+
+        now = time.time()
+        # [CHECK] The cache as a whole is still fresh:
+        if now - payload.get("saved_at", 0) > self._ttl:
+            return []
+
+        # Drop any individual cookies that have expired:
+        return [c for c in payload.get("cookies", [])
+                if c.get("expiry", now + 1) > now]
+
+
+    def save(self, cookies: list) -> None:
+        '''Encrypts & saves the given cookies.
+
+        Parameters
+        ----------
+            cookies : list [dict]
+                Cookies as returned by the webdriver's get_cookies().
+        '''
+        if not self.enabled or not cookies:
+            return
+
+        salt = os.urandom(_SALT_BYTES)
+        payload = json.dumps({"saved_at": time.time(), "cookies": cookies})
+        token = self._fernet(salt).encrypt(payload.encode())
+        stored = {"salt": base64.b64encode(salt).decode(),
+                  "token": token.decode()}
+
+        # Write to a temp file of our own first (workers are threads as well
+        #   as processes), so nobody ever sees half a file:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self._path) or ".",
+            prefix=f"{os.path.basename(self._path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+    def clear(self) -> None:
+        '''Deletes the cache file.'''
+        try:
+            os.remove(self._path)
+        except FileNotFoundError:
+            pass
+
+
+def _inject_cookies(driver, cookies: list, url: str) -> None:
+    '''Adds the cookies to the webdriver before it visits the backend.
+
+    Chrome's DevTools protocol lets us set cookies for a domain we haven't
+    loaded yet. If that isn't available, we load the page once to get onto
+    the right domain and add them the standard WebDriver way.
+    '''
+    try:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": [
+            {
+                "name": c["name"],
+                "value": c["value"],
+                "domain": c.get("domain"),
+                "path": c.get("path", "/"),
+                "secure": c.get("secure", False),
+                "httpOnly": c.get("httpOnly", False),
+                **({"expires": c["expiry"]} if "expiry" in c else {}),
+            }
+            for c in cookies
+        ]})
+    except (AttributeError, WebDriverException):
+        driver.get(url)
+        for cookie in cookies:
+            driver.add_cookie(cookie)
+
+
+def restore_session(driver, cache: CookieCache, landing_url: str,
+                    is_logged_in) -> bool:
+    '''Tries to log the webdriver in using cached cookies.
+
+    Parameters
+    ----------
+        driver : selenium.webdriver.Chrome
+            The webdriver to log in.
+
+        cache : CookieCache
+            The cache to read cookies from.
+
+        landing_url : str
+            The backend landing page, used to validate the cookies.
+
+        is_logged_in : callable
+            Given the driver (sitting on the landing page), returns whether
+            we're logged in.
+
+    Returns
+    -------
+        bool
+            Whether the cached cookies got us logged in. Stale cookies are
+            cleared from the cache.
+    '''
+    cookies = cache.load()
+    if not cookies:
+        return False
+
+    try:
+        _inject_cookies(driver, cookies, landing_url)
+        driver.get(landing_url)
+        if is_logged_in(driver):
+            return True
+    except WebDriverException as err:
+        print(f"\nCouldn't restore the cached session: {err}")
+
+    cache.clear()
+    driver.delete_all_cookies()
+    return False
+
+
+def share_session(source, target, landing_url: str, is_logged_in) -> bool:
+    '''Tries to log the target webdriver in with the (logged in) source
+    webdriver's cookies.
+
+    Parameters
+    ----------
+        source : selenium.webdriver.Chrome
+            A webdriver logged into the backend.
+
+        target : selenium.webdriver.Chrome
+            The webdriver to log in.
+
+        landing_url : str
+            The backend landing page, used to validate the cookies.
+
+        is_logged_in : callable
+            Given a driver (sitting on the landing page), returns whether
+            it's logged in.
+
+    Returns
+    -------
+        bool
+            Whether the shared cookies got the target logged in.
+    '''
+    try:
+        cookies = source.get_cookies()
+        if not cookies:
+            return False
+        _inject_cookies(target, cookies, landing_url)
+        target.get(landing_url)
+        return is_logged_in(target)
+    except WebDriverException as err:
+        print(f"\nCouldn't share the backend session: {err}")
+        return False
@@ -1,14 +1,46 @@
 import mongoengine as db
 from dotenv import load_dotenv
-from datetime import datetime as dt
+from datetime import datetime as dt, timedelta
+import atexit
 import os
+import queue
+import threading
+import time
 from enum import Enum
 
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+# Max. connections in our process wide MongoDB connection pool:
+MONGO_POOL_SIZE = 10
+
+# Write-behind queue settings -- the most vendors waiting to be written, and
+#   the batch size / seconds between flushes (whichever comes first):
+WRITE_QUEUE_SIZE = 1000
+FLUSH_BATCH_SIZE = 50
+FLUSH_INTERVAL = 2.0
+
+_CONNECT_LOCK = threading.Lock()
+_connected = False
+
+_WRITER_LOCK = threading.Lock()
+_writer = None
+
+# Seconds a worker may hold a claimed vendor before others can reclaim it:
+DEFAULT_LEASE_SECONDS = 15 * 60
+
+
+class LeaseLost(Exception):
+    '''Raised when a worker finishes a vendor whose lease it no longer
+    holds (ex. it expired & another worker reclaimed the vendor).'''
+
 
 class Status(Enum):
     NEW = 'new'
     INPROGRESS = 'in_progress'
     DONE = 'done'
+    FAILED = 'failed'
 
 
 class Vendor(db.Document):
@@ -23,6 +55,87 @@ class Vendor(db.Document):
     status = db.EnumField(Status, default=Status.NEW)
     created_at = db.DateTimeField(required=True, default=dt.now)
 
+    # Work queue bookkeeping -- who's working on the vendor, until when, how
+    #   many times it's been claimed & why it last failed:
+    lease_owner = db.StringField()
+    lease_expires = db.DateTimeField()
+    attempts = db.IntField(default=0)
+    last_error = db.StringField()
+
+    meta = {
+        'indexes': [
+            {'fields': ['email'], 'unique': True},
+            {'fields': ['profile_id'], 'unique': True, 'sparse': True},
+            {'fields': ['status', 'created_at']},
+        ],
+    }
+
+
+def connect() -> None:
+    '''Opens this process's single, pooled MongoDB connection (if it isn't
+    open already). It stays open until the program exits.'''
+    global _connected
+    with _CONNECT_LOCK:
+        if _connected:
+            return
+        load_dotenv()
+        db.connect(host=os.environ.get('MONGO_HOST'),
+                   maxPoolSize=MONGO_POOL_SIZE)
+        _connected = True
+        atexit.register(disconnect)
+
+        # Make sure our unique indexes exist (a no-op if they already do):
+        try:
+            Vendor.ensure_indexes()
+        except PyMongoError as e:
+            print(f"Couldn't create the vendor indexes (duplicates?): {e}")
+
+
+def disconnect() -> None:
+    '''Closes our MongoDB connection, draining any queued vendor writes
+    first.'''
+    global _connected
+    close_vendor_writer()
+    with _CONNECT_LOCK:
+        if _connected:
+            db.disconnect()
+            _connected = False
+
+
+def _build_vendor(profile_id: str,
+                  category_id: str,
+                  email: str,
+                  brand_name: str,
+                  location: str = 'MiddleOf NoWhere',
+                  web_url: str = "www.no-url.com",
+                  instagram: str = None) -> UpdateOne:
+    '''Builds (and validates) a completed vendor document, returning it as
+    an upsert keyed on the vendor's email & profile id -- so reruns update
+    the existing document instead of adding a duplicate.'''
+    vendor = Vendor(profile_id=profile_id,
+                    category_id=category_id,
+                    email=email.strip().lower(),
+                    brand_name=brand_name,
+                    location=location,
+                    web_url=web_url,
+                    instagram=instagram,
+                    status=Status.DONE)
+    vendor.validate()
+
+    document = vendor.to_mongo().to_dict()
+    # (Only set on insert, so the queue's claim count survives the save)
+    on_insert = {'created_at': document.pop('created_at'),
+                 'attempts': document.pop('attempts')}
+    return UpdateOne(
+        {'$or': [{'email': document['email']},
+                 {'profile_id': document['profile_id']}]},
+        {'$set': document,
+         '$setOnInsert': on_insert,
+         '$unset': {'lease_owner': '', 'lease_expires': '',
+                    'last_error': ''}},
+        upsert=True,
+    )
+
 
 def add_vendor_to_db(profile_id: str,
                     category_id: str,
@@ -31,20 +144,310 @@ def add_vendor_to_db(profile_id: str,
                     location: str = 'MiddleOf NoWhere',
                     web_url: str = "www.no-url.com",
                     instagram: str = None) -> None:
-    '''Adds a new vendor document to our MongoDB 'vendors' collection.'''
+    '''Adds (or updates) a vendor document in our MongoDB 'vendors'
+    collection.'''
     try:
-        load_dotenv()
-        db.connect(host=os.environ.get('MONGO_HOST'))
-        vendor = Vendor(profile_id=profile_id,
-                        category_id=category_id,
-                        email=email,
-                        brand_name=brand_name,
-                        location=location,
-                        web_url=web_url,
-                        instagram=instagram)
-        vendor.save()
+        connect()
+        upsert = _build_vendor(profile_id, category_id, email, brand_name,
+                               location, web_url, instagram)
+        Vendor._get_collection().bulk_write([upsert])
+        print('Vendor saved to MongoDB!')
     except Exception as e:
         print(e)
-    finally:
-        db.disconnect()
-        print('Vendor saved to MongoDB!')
+
+
+def queue_vendor_for_db(profile_id: str,
+                        category_id: str,
+                        email: str,
+                        brand_name: str,
+                        location: str = 'MiddleOf NoWhere',
+                        web_url: str = "www.no-url.com",
+                        instagram: str = None) -> None:
+    '''Queues a vendor document to be added (or updated) in our MongoDB
+    'vendors' collection in the background, returning straight away.'''
+    try:
+        upsert = _build_vendor(profile_id, category_id, email, brand_name,
+                               location, web_url, instagram)
+    except db.ValidationError as e:
+        print(e)
+        return
+    get_vendor_writer().put(upsert)
+
+
+class VendorWriter(threading.Thread):
+    '''A background thread writing queued vendor upserts to MongoDB with
+    unordered bulk writes.
+
+    Documents are flushed once FLUSH_BATCH_SIZE of them are waiting or
+    FLUSH_INTERVAL seconds have passed since the last flush. The queue is
+    bounded, so a slow database eventually pushes back on the producers
+    instead of growing without limit.
+
+    Attributes
+    ----------
+        max_queued : int, optional
+            The most documents allowed to wait in the queue.
+            (default WRITE_QUEUE_SIZE)
+
+        batch_size : int, optional
+            Upserts per bulk write. (default FLUSH_BATCH_SIZE)
+
+        interval : float, optional
+            The most seconds a document waits before being flushed.
+            (default FLUSH_INTERVAL)
+
+    Methods
+    -------
+        put(upsert):
+            Queues a vendor upsert to be written.
+
+        close():
+            Flushes everything still queued & stops the thread.
+    '''
+
+    # Placed on the queue to tell the thread to drain & stop:
+    _STOP = object()
+
+    def __init__(self, max_queued: int = WRITE_QUEUE_SIZE,
+                 batch_size: int = FLUSH_BATCH_SIZE,
+                 interval: float = FLUSH_INTERVAL):
+        super().__init__(name="vendor-writer", daemon=True)
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._batch_size = batch_size
+        self._interval = interval
+        self._written = 0
+
+    @property
+    def written(self) -> int:
+        '''The number of documents written so far.'''
+        return self._written
+
+
+    def put(self, upsert: UpdateOne) -> None:
+        '''Queues a vendor upsert to be written.'''
+        self._queue.put(upsert)
+
+
+    def close(self) -> None:
+        '''Flushes everything still queued & stops the thread.'''
+        if self.is_alive():
+            self._queue.put(self._STOP)
+            self.join()
+
+
+    def _flush(self, upserts: list) -> None:
+        '''Writes the upserts with a single unordered bulk write.'''
+        if not upserts:
+            return
+        try:
+            Vendor._get_collection().bulk_write(upserts, ordered=False)
+            self._written += len(upserts)
+        except BulkWriteError as e:
+            failed = len(e.details.get('writeErrors', []))
+            self._written += len(upserts) - failed
+            print(f"{failed} vendor(s) failed to save to MongoDB: "
+                  f"{e.details.get('writeErrors')}")
+        except PyMongoError as e:
+            print(f"{len(upserts)} vendor(s) failed to save to MongoDB: "
+                  f"{e}")
+
+
+    def run(self) -> None:
+        connect()
+        pending = []
+        deadline = time.time() + self._interval
+        stopping = False
+
+        while not stopping:
+            try:
+                item = self._queue.get(
+                    timeout=max(0.0, deadline - time.time()))
+                if item is self._STOP:
+                    stopping = True
+                else:
+                    pending.append(item)
+            except queue.Empty:
+                pass
+
+            if stopping or len(pending) >= self._batch_size \
+                    or time.time() >= deadline:
+                self._flush(pending)
+                pending = []
+                deadline = time.time() + self._interval
+
+
+def get_vendor_writer() -> VendorWriter:
+    '''Returns this process's background vendor writer, starting it if it
+    isn't running.'''
+    global _writer
+    with _WRITER_LOCK:
+        if _writer is None or not _writer.is_alive():
+            _writer = VendorWriter()
+            _writer.start()
+            atexit.register(close_vendor_writer)
+        return _writer
+
+
+def close_vendor_writer() -> None:
+    '''Drains any queued vendor writes & stops the background writer.'''
+    global _writer
+    with _WRITER_LOCK:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
+
+
+def find_done_emails(emails: list) -> set:
+    '''Returns which of the given vendor emails are already marked DONE, with
+    a single query.
+
+    Parameters
+    ----------
+        emails : list [str]
+            The vendors' email addresses.
+
+    Returns
+    -------
+        set [str]
+            The (lowercased) emails of the vendors that are already done.
+    '''
+    if not emails:
+        return set()
+    connect()
+    cursor = Vendor._get_collection().find(
+        {'email': {'$in': [e.strip().lower() for e in emails]},
+         'status': Status.DONE.value},
+        {'email': 1, '_id': 0})
+    return {doc['email'] for doc in cursor}
+
+
+def _vendors(collection=None):
+    '''Returns the given collection (ex. a mock, for testing) or our
+    vendors collection.'''
+    if collection is not None:
+        return collection
+    connect()
+    return Vendor._get_collection()
+
+
+def enqueue_vendors(emails: list, collection=None) -> int:
+    '''Adds vendors to the work queue as NEW documents. Vendors that already
+    have a document (in any state) are left alone.
+
+    Returns
+    -------
+        int
+            The number of vendors newly added to the queue.
+    '''
+    if not emails:
+        return 0
+    # (UTC, like the leases, so hosts in any timezone agree on the order)
+    now = dt.utcnow()
+    inserts = [
+        UpdateOne({'email': email.strip().lower()},
+                  {'$setOnInsert': {'email': email.strip().lower(),
+                                    'status': Status.NEW.value,
+                                    'attempts': 0,
+                                    'created_at': now}},
+                  upsert=True)
+        for email in emails
+    ]
+    result = _vendors(collection).bulk_write(inserts, ordered=False)
+    return result.upserted_count
+
+
+def claim_vendor(worker_id: str, lease_seconds: int = DEFAULT_LEASE_SECONDS,
+                 collection=None) -> str:
+    '''Atomically claims the oldest NEW vendor (or one whose lease has
+    expired) for the given worker, marking it INPROGRESS.
+
+    Returns
+    -------
+        str
+            The claimed vendor's email, or None when the queue is empty.
+    '''
+    # (Leases are in UTC, so workers in any timezone agree on them)
+    now = dt.utcnow()
+    claimed = _vendors(collection).find_one_and_update(
+        {'$or': [{'status': Status.NEW.value},
+                 {'status': Status.INPROGRESS.value,
+                  'lease_expires': {'$lt': now}}]},
+        {'$set': {'status': Status.INPROGRESS.value,
+                  'lease_owner': worker_id,
+                  'lease_expires': now + timedelta(seconds=lease_seconds)},
+         '$inc': {'attempts': 1}},
+        sort=[('created_at', ASCENDING)],
+        return_document=ReturnDocument.AFTER,
+    )
+    return claimed['email'] if claimed else None
+
+
+def complete_vendor(email: str, worker_id: str, collection=None) -> None:
+    '''Marks a vendor the given worker claimed as DONE.
+
+    Raises
+    ------
+        LeaseLost
+            When the worker no longer holds the vendor's lease (and the
+            vendor isn't DONE already, ex. by its saved stats).
+    '''
+    vendors = _vendors(collection)
+    email = email.strip().lower()
+    result = vendors.update_one(
+        {'email': email, 'status': Status.INPROGRESS.value,
+         'lease_owner': worker_id},
+        {'$set': {'status': Status.DONE.value},
+         '$unset': {'lease_owner': '', 'lease_expires': '',
+                    'last_error': ''}},
+    )
+    if result.matched_count:
+        return
+
+    # [CASE] Saving the vendor's stats already marked it DONE:
+    if vendors.count_documents({'email': email,
+                                'status': Status.DONE.value}):
+        return
+    raise LeaseLost(f"'{worker_id}' no longer holds the lease on '{email}'!")
+
+
+def fail_vendor(email: str, worker_id: str, error: str,
+                collection=None) -> None:
+    '''Marks a vendor the given worker claimed as FAILED.'''
+    _vendors(collection).update_one(
+        {'email': email.strip().lower(), 'lease_owner': worker_id},
+        {'$set': {'status': Status.FAILED.value, 'last_error': error},
+         '$unset': {'lease_owner': '', 'lease_expires': ''}},
+    )
+
+
+def reclaim_expired_leases(collection=None) -> int:
+    '''Puts INPROGRESS vendors whose lease has expired (ex. their worker
+    crashed) back in the queue as NEW.
+
+    Returns
+    -------
+        int
+            The number of vendors put back in the queue.
+    '''
+    result = _vendors(collection).update_many(
+        {'status': Status.INPROGRESS.value,
+         'lease_expires': {'$lt': dt.utcnow()}},
+        {'$set': {'status': Status.NEW.value},
+         '$unset': {'lease_owner': '', 'lease_expires': ''}},
+    )
+    return result.modified_count
+
+
+def requeue_failed_vendors(collection=None) -> int:
+    '''Puts FAILED vendors back in the queue as NEW.
+
+    Returns
+    -------
+        int
+            The number of vendors put back in the queue.
+    '''
+    result = _vendors(collection).update_many(
+        {'status': Status.FAILED.value},
+        {'$set': {'status': Status.NEW.value}},
+    )
+    return result.modified_count
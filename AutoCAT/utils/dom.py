@@ -0,0 +1,178 @@
+'''
+dom.py
+------------
+    Helpers for reading & writing many values on a page in a single
+    webdriver round trip.
+'''
+
+# What to read from an element (the second item of a locator tuple):
+#   - 'auto': The value of form fields, otherwise the visible text.
+#   - 'text': The element's visible text, stripped.
+#   - 'value': The element's current value.
+#   - 'selected': The text of a <select>'s selected option.
+#   - 'data_option': The text of the <select> option whose value matches the
+#       select's 'data-value' attribute.
+#   - '@name': The 'name' property (or attribute, if there's no such
+#       property) -- the same as WebElement.get_attribute('name').
+AUTO = 'auto'
+TEXT = 'text'
+VALUE = 'value'
+SELECTED = 'selected'
+DATA_OPTION = 'data_option'
+
+# Reads every match of each xpath instead of the first when arguments[1] is
+#   true:
+_SNAPSHOT_JS = """
+    var specs = arguments[0], all = arguments[1], out = {};
+    function find(xpath) {
+        return document.evaluate(xpath, document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    function findAll(xpath) {
+        var found = document.evaluate(xpath, document, null,
+            XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null), els = [];
+        for (var i = 0; i < found.snapshotLength; i++) {
+            els.push(found.snapshotItem(i));
+        }
+        return els;
+    }
+    function optionText(option) {
+        return option ? option.text.trim() : null;
+    }
+    function read(el, kind) {
+        var val = null;
+        if (el) {
+            if (kind === 'auto') {
+                kind = /^(INPUT|TEXTAREA|SELECT)$/.test(el.tagName)
+                    ? 'value' : 'text';
+            }
+            if (kind === 'text') {
+                val = (el.innerText || el.textContent || '').trim();
+            } else if (kind === 'value') {
+                val = el.value;
+            } else if (kind === 'selected') {
+                val = el.options ? optionText(el.options[el.selectedIndex]) : null;
+            } else if (kind === 'data_option') {
+                var dataVal = el.getAttribute('data-value');
+                var matches = Array.prototype.filter.call(el.options || [],
+                    function (o) { return o.value === dataVal; });
+                val = optionText(matches[0]);
+            } else if (kind.charAt(0) === '@') {
+                var prop = kind.slice(1);
+                val = (prop in el) ? el[prop] : el.getAttribute(prop);
+            }
+        }
+        return (val === undefined) ? null : val;
+    }
+    Object.keys(specs).forEach(function (name) {
+        var xpath = specs[name][0], kind = specs[name][1];
+        out[name] = all
+            ? findAll(xpath).map(function (el) { return read(el, kind); })
+            : read(find(xpath), kind);
+    });
+    return out;
+"""
+
+# Sets each field through the native value setter (so frameworks tracking the
+#   value notice), fires the events a user typing would, and reports the names
+#   of fields that couldn't be set.
+_FILL_JS = """
+    var specs = arguments[0], failed = [];
+    var setters = {
+        INPUT: HTMLInputElement.prototype,
+        TEXTAREA: HTMLTextAreaElement.prototype,
+        SELECT: HTMLSelectElement.prototype
+    };
+    Object.keys(specs).forEach(function (name) {
+        var el = document.evaluate(specs[name][0], document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        var value = specs[name][1];
+        if (!el || !setters[el.tagName] || el.disabled || el.readOnly) {
+            failed.push(name);
+            return;
+        }
+        Object.getOwnPropertyDescriptor(setters[el.tagName], 'value')
+            .set.call(el, value);
+        ['input', 'keyup', 'change'].forEach(function (type) {
+            el.dispatchEvent(new Event(type, {bubbles: true}));
+        });
+        if (el.value !== value) {
+            failed.push(name);
+        }
+    });
+    return failed;
+"""
+
+
+def read_fields(driver, locators: dict) -> dict:
+    '''Reads the values/attributes/text of many elements in one round trip.
+
+    Parameters
+    ----------
+        driver : selenium.webdriver.Chrome
+            The webdriver, sitting on the page to read.
+
+        locators : dict
+            Maps a name to either an xpath (read with AUTO) or a tuple of
+            (xpath, what to read). ex. {"title": (FIRST_POS_NAME, '@title')}
+
+    Returns
+    -------
+        dict
+            The same names mapped to what was read, or None for elements
+            that couldn't be found.
+    '''
+    return driver.execute_script(_SNAPSHOT_JS, _specs(locators), False)
+
+
+def read_all(driver, locators: dict) -> dict:
+    '''Like read_fields, but reads every element each xpath matches (ex.
+    a column of a table) rather than just the first.
+
+    Returns
+    -------
+        dict
+            The same names mapped to lists of what was read, in document
+            order.
+    '''
+    return driver.execute_script(_SNAPSHOT_JS, _specs(locators), True)
+
+
+def _specs(locators: dict) -> dict:
+    '''Normalises {name: locator} into the {name: [xpath, kind]} specs our
+    snapshot script expects.'''
+    specs = {}
+    for name, locator in locators.items():
+        if isinstance(locator, str):
+            locator = (locator, AUTO)
+        specs[name] = list(locator)
+    return specs
+
+
+def fill_fields(driver, fields: dict, typed: tuple = ()) -> None:
+    '''Sets the values of many form fields in one round trip, firing the
+    'input' & 'change' events so the page's scripts still see the edits.
+
+    Fields named in `typed`, and any field the script couldn't set, are
+    filled with real keystrokes instead.
+
+    Parameters
+    ----------
+        driver : selenium.webdriver.Chrome
+            The webdriver, sitting on the page to fill in.
+
+        fields : dict
+            Maps a name to a tuple of (xpath, value).
+
+        typed : tuple [str], optional
+            Names of fields whose widgets need real keystrokes.
+    '''
+    scripted = {name: [xpath, value] for name, (xpath, value) in fields.items()
+                if name not in typed}
+    failed = driver.execute_script(_FILL_JS, scripted) if scripted else []
+
+    for name in list(typed) + failed:
+        xpath, value = fields[name]
+        _field = driver.find_element_by_xpath(xpath)
+        _field.clear()
+        _field.send_keys(value)
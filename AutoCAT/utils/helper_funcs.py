@@ -3,6 +3,8 @@ helper_funcs.py
 ------------
     A place for some quality of life functions.
 '''
+import functools
+import html
 import os
 import re
 import time
@@ -14,16 +16,87 @@ from selenium.webdriver.support.expected_conditions import (
     element_to_be_clickable,
 )
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from utils.metrics import record_wait
+
+
+# Upper bound (in seconds) on how long we'll wait for a readiness condition:
+READY_TIMEOUT = 2
+# Pause (in seconds) between readiness condition checks:
+READY_POLL = 0.05
+
+# Upper bound (in seconds) on how long we'll wait for a save to complete:
+SAVE_TIMEOUT = 30
+# First & largest pause (in seconds) between checks when polling for a save:
+SAVE_POLL_START = 0.05
+SAVE_POLL_MAX = 0.5
+
+# Resolves as soon as the element at the given xpath gains the given class,
+#   or with false once the timeout (in ms) elapses. The element is re-resolved
+#   on every mutation since saving may re-render it.
+_SAVE_OBSERVER_JS = """
+    var xpath = arguments[0], clsName = arguments[1], timeoutMs = arguments[2];
+    var done = arguments[arguments.length - 1];
+    function hasClass() {
+        var el = document.evaluate(xpath, document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        return !!(el && el.classList.contains(clsName));
+    }
+    if (hasClass()) { done(true); return; }
+    var timer = null;
+    var observer = new MutationObserver(function () {
+        if (hasClass()) {
+            observer.disconnect();
+            clearTimeout(timer);
+            done(true);
+        }
+    });
+    observer.observe(document.documentElement, {
+        attributes: true, attributeFilter: ['class'],
+        childList: true, subtree: true
+    });
+    timer = setTimeout(function () {
+        observer.disconnect();
+        done(false);
+    }, timeoutMs);
+"""
 
 
 def timer(func):
-    '''A decorator function to measure execute time of functions.'''
+    '''A decorator function to measure execute time of functions.
+
+    When decorating a method whose object has a `step_hooks` attribute, each
+    hook's `step_started(obj, name)` is called before the method runs and
+    `step_finished(obj, name, elapsed, error)` after it (even if it raised),
+    letting collectors like utils.metrics.MetricsCollector record the step.
+    '''
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
+        hooks = tuple(getattr(args[0], 'step_hooks', None) or ()) \
+            if args else ()
+        for hook in hooks:
+            hook.step_started(args[0], func.__name__)
+
+        error = None
         start = time.time()
-        result = func(*args, **kwargs)
-        finish = time.time()
-        print(f"(Completed '{func.__name__}' in {round(finish - start, 2)} sec.)")
-        return result
+        try:
+            return func(*args, **kwargs)
+        except Exception as err:
+            error = err
+            raise
+        finally:
+            elapsed = time.time() - start
+            for hook in reversed(hooks):
+                hook.step_finished(args[0], func.__name__, elapsed, error)
+            if error is None:
+                print(f"(Completed '{func.__name__}' in "
+                      f"{round(elapsed, 2)} sec.)")
     return wrapper
 
 
@@ -46,40 +119,135 @@ def check_email(email_address: str) -> bool:
 
 def _element_has_class(element_obj, class_name: str) -> bool:
     '''Returns a boolean of whether a web element contains a specific class name.'''
-    classes = element_obj.get_attribute('class')
+    classes = element_obj.get_attribute('class') or ''
     for cls in classes.split(' '):
         if (cls == class_name):
             return True
     return False
 
 
-def wait_for_save(driver, xpath: str, cls_name: str = 'disabled') -> None:
+def wait_for_save(driver, xpath: str, cls_name: str = 'disabled',
+                  timeout: float = SAVE_TIMEOUT) -> float:
     '''Pauses program to wait for data to be saved successfully. Waits for
     the submit/update button to be disabled after inputting data and submitting.
+
+    A MutationObserver inside the page resolves the wait the moment the class
+    appears. If the page navigates away mid-wait (ex. a full form submit), we
+    fall back to polling the new page with a short, growing delay.
+
+    Returns
+    -------
+        float
+            The number of seconds spent waiting.
+
+    Raises
+    ------
+        selenium.common.exceptions.TimeoutException
+            When the class hasn't appeared within `timeout` seconds.
     '''
-    # Wait for the element to have the class 'classy':
-    _d = driver
-    elem = _d.find_element_by_xpath(xpath)
-    classy = _element_has_class(elem, cls_name)
-    # While the element doesn't have that class, pause then try again:
-    while not classy:
-        # Wait a sec:
-        time.sleep(1)
-        elem = _d.find_element_by_xpath(xpath)
-        classy = _element_has_class(elem, cls_name)
-    return None
+    start = time.time()
+    deadline = start + timeout
+    try:
+        driver.set_script_timeout(timeout + 1)
+        saved = driver.execute_async_script(
+            _SAVE_OBSERVER_JS, xpath, cls_name, int(timeout * 1000))
+    except WebDriverException:
+        # The document was unloaded out from under our observer:
+        saved = False
+
+    try:
+        if not saved:
+            _poll_for_class(driver, xpath, cls_name, deadline)
+    finally:
+        waited = time.time() - start
+        record_wait(waited)
+
+    return waited
 
 
-def check_condition(driver, xpath: str, timeout: int = 5) -> None:
+def _poll_for_class(driver, xpath: str, cls_name: str, deadline: float) -> None:
+    '''Polls the element at the given xpath (with backoff) until it has the
+    given class name, raising a TimeoutException once the deadline passes.
+
+        * Used as a part of wait_for_save function. *
+    '''
+    delay = SAVE_POLL_START
+    elem = None
+    while True:
+        try:
+            # Keep the element between polls until the page reloads:
+            if elem is None:
+                elem = driver.find_element_by_xpath(xpath)
+            if _element_has_class(elem, cls_name):
+                return
+        except (NoSuchElementException, StaleElementReferenceException):
+            # [CASE] Page is mid-reload -> Try again shortly:
+            elem = None
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise TimeoutException(
+                f"Element '{xpath}' never gained the class '{cls_name}'!")
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, SAVE_POLL_MAX)
+
+
+class element_lacks_class:
+    '''An expectation for checking that the element at the given xpath is
+    present and does NOT have a specific class name. (ex. a submit button
+    that's no longer 'disabled' once the form registers our changes)'''
+
+    def __init__(self, xpath: str, cls_name: str = 'disabled'):
+        self._xpath = xpath
+        self._cls_name = cls_name
+        # The element, kept between polls until it goes stale:
+        self._elem = None
+
+    def __call__(self, driver):
+        try:
+            if self._elem is None:
+                self._elem = driver.find_element_by_xpath(self._xpath)
+            return not _element_has_class(self._elem, self._cls_name)
+        except (NoSuchElementException, StaleElementReferenceException):
+            self._elem = None
+            return False
+
+
+def wait_until(driver, condition, timeout: float = READY_TIMEOUT) -> bool:
+    '''Waits (polling every READY_POLL sec.) for the given expected condition
+    to be met. Unlike check_condition, timing out is not an error.
+
+    Returns
+    -------
+        bool
+            Whether the condition was met before the timeout.
+    '''
+    start = time.time()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=READY_POLL)\
+            .until(condition)
+        return True
+    except TimeoutException:
+        return False
+    finally:
+        record_wait(time.time() - start)
+
+
+def check_condition(driver, xpath: str, timeout: int = 5):
     '''Checks the visibility of a web element located at a given xpath. This
-    function can be used to confirm the correct webpage has been loaded.'''
+    function can be used to confirm the correct webpage has been loaded.
+
+    Returns the (visible) element, or None if the check failed.'''
     _driver = driver
+    start = time.time()
     try:
-        WebDriverWait(_driver, timeout).until(
+        element = WebDriverWait(_driver, timeout).until(
             visibility_of_element_located(
                 (By.XPATH, xpath)
             )
         )
+        record_wait(time.time() - start)
+        return element
     except TimeoutError:
         print("\nTIMEOUT ERROR in check_condition!")
         _driver.quit()
@@ -90,15 +258,20 @@ def check_condition(driver, xpath: str, timeout: int = 5) -> None:
         return
 
 
-def check_is_clickable(driver, xpath: str, timeout: int = 5) -> None:
-    '''Checks if a web element is clickable at a given xpath.'''
+def check_is_clickable(driver, xpath: str, timeout: int = 5):
+    '''Checks if a web element is clickable at a given xpath.
+
+    Returns the (clickable) element, or None if the check failed.'''
     _driver = driver
+    start = time.time()
     try:
-        WebDriverWait(_driver, timeout).until(
+        element = WebDriverWait(_driver, timeout).until(
             element_to_be_clickable(
                 (By.XPATH, xpath)
             )
         )
+        record_wait(time.time() - start)
+        return element
     except TimeoutError:
         print("\nTIMEOUT ERROR in check_is_clickable!")
         _driver.quit()
@@ -209,6 +382,13 @@ def format_instagram_handle(handle: str):
     return None
 
 
+def title_key(title: str) -> str:
+    '''Returns a category title the way to compare it: HTML entities decoded
+    & runs of whitespace collapsed, as the Coming Soon page may show a name
+    differently than it was entered.'''
+    return " ".join(html.unescape(title or "").split())
+
+
 def minimum_order_amount_handler(inner_text: str) -> int:
     if inner_text:
         if (inner_text.contains('No minimum')):
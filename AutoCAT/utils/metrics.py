@@ -0,0 +1,246 @@
+'''
+metrics.py
+------------
+    Per-step metrics (wall time, webdriver commands & time spent waiting)
+    for the approval process, aggregated across a run and exported as JSON
+    and Prometheus text-format files.
+'''
+import json
+import os
+import threading
+import time
+
+
+# Where exported metrics are written (relative to the 'AutoCAT' folder),
+#   unless the METRICS_DIR environ. variable says otherwise:
+DEFAULT_METRICS_DIR = "metrics"
+
+# The percentiles reported for every metric:
+PERCENTILES = (50, 95, 99)
+
+# Prefix of every exported Prometheus metric name:
+_PROM_PREFIX = "autocat_step"
+
+# Each metric we record per step, with its Prometheus name suffix & help:
+_SERIES = (
+    ("wall", "duration_seconds", "Wall time of each approval step."),
+    ("commands", "webdriver_commands", "WebDriver commands sent per step."),
+    ("wait", "wait_seconds", "Time each step spent waiting on the page."),
+)
+
+# Seconds the current thread has spent in our wait helpers:
+_waits = threading.local()
+
+
+def record_wait(seconds: float) -> None:
+    '''Adds the given seconds to the current thread's total wait time.
+    Called by the wait helpers (wait_for_save, wait_until, etc.).'''
+    _waits.total = getattr(_waits, "total", 0.0) + seconds
+
+
+def wait_time() -> float:
+    '''Returns the total seconds the current thread has spent waiting.'''
+    return getattr(_waits, "total", 0.0)
+
+
+def instrument_driver(driver):
+    '''Wraps the driver's `execute` so every WebDriver command it sends (and
+    every page it loads) is counted. Safe to call more than once.'''
+    if hasattr(driver, "_command_count"):
+        return driver
+
+    execute = driver.execute
+    driver._command_count = 0
+    driver._page_loads = 0
+
+    def counting_execute(driver_command, params=None):
+        driver._command_count += 1
+        if driver_command == "get":
+            driver._page_loads += 1
+        return execute(driver_command, params)
+
+    driver.execute = counting_execute
+    return driver
+
+
+def command_count(driver) -> int:
+    '''Returns the number of commands an instrumented driver has sent.'''
+    return getattr(driver, "_command_count", 0)
+
+
+def page_load_count(driver) -> int:
+    '''Returns the number of pages an instrumented driver has loaded.'''
+    return getattr(driver, "_page_loads", 0)
+
+
+def percentile(values: list, pct: float) -> float:
+    '''Returns the given percentile of the values (linearly interpolated
+    between the closest ranks), or 0.0 when there are none.'''
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class MetricsCollector:
+    '''A step hook recording the wall time, WebDriver command count & wait
+    time of every timed ApproveVendorProcess step.
+
+    One collector can be shared by every worker in a batch; each step's
+    samples are aggregated into percentiles when summarised or exported.
+
+    Methods
+    -------
+        step_started(owner, step):
+            Called by the @timer decorator before a step runs.
+
+        step_finished(owner, step, elapsed, error):
+            Called by the @timer decorator after a step runs.
+
+        summary():
+            Returns the aggregated metrics of each step.
+
+        export(directory):
+            Writes 'metrics.json' & 'metrics.prom' to the given directory.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: dict = {}
+        # Each thread's (commands, wait time) at the start of its running
+        #   steps -- a stack, since steps may call other steps:
+        self._local = threading.local()
+
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+
+    def step_started(self, owner, step: str) -> None:
+        '''Notes the driver's command count & our wait time so far.'''
+        driver = getattr(owner, "driver", None)
+        if driver is not None:
+            instrument_driver(driver)
+        self._stack().append((command_count(driver), wait_time()))
+
+
+    def step_finished(self, owner, step: str, elapsed: float,
+                      error: Exception = None) -> None:
+        '''Records the step's wall time, commands sent & time spent
+        waiting.'''
+        stack = self._stack()
+        if not stack:
+            return
+        commands_start, wait_start = stack.pop()
+        driver = getattr(owner, "driver", None)
+        sample = {"wall": elapsed,
+                  "commands": command_count(driver) - commands_start,
+                  "wait": wait_time() - wait_start,
+                  "failed": error is not None}
+
+        with self._lock:
+            self._samples.setdefault(step, []).append(sample)
+
+
+    def summary(self) -> dict:
+        '''Returns the aggregated metrics of each step.
+
+        Returns
+        -------
+            dict
+                Maps each step to its 'count', 'failures' and, for each of
+                'wall', 'commands' & 'wait', the 'sum', 'mean' & percentiles
+                (ex. 'p95').
+        '''
+        with self._lock:
+            samples = {step: list(s) for step, s in self._samples.items()}
+
+        summary = {}
+        for step, step_samples in samples.items():
+            stats = {"count": len(step_samples),
+                     "failures": sum(s["failed"] for s in step_samples)}
+            for key, _, _ in _SERIES:
+                values = [s[key] for s in step_samples]
+                stats[key] = {"sum": sum(values),
+                              "mean": sum(values) / len(values)}
+                for pct in PERCENTILES:
+                    stats[key][f"p{pct}"] = percentile(values, pct)
+            summary[step] = stats
+        return summary
+
+
+    def to_prometheus(self) -> str:
+        '''Returns the aggregated metrics in the Prometheus text format.'''
+        summary = self.summary()
+        lines = []
+        for key, suffix, help_text in _SERIES:
+            name = f"{_PROM_PREFIX}_{suffix}"
+            lines += [f"# HELP {name} {help_text}",
+                      f"# TYPE {name} summary"]
+            for step, stats in sorted(summary.items()):
+                label = f'step="{step}"'
+                for pct in PERCENTILES:
+                    lines.append(f'{name}{{{label},quantile="{pct / 100}"}} '
+                                 f'{stats[key][f"p{pct}"]}')
+                lines.append(f'{name}_sum{{{label}}} {stats[key]["sum"]}')
+                lines.append(f'{name}_count{{{label}}} {stats["count"]}')
+
+        name = f"{_PROM_PREFIX}_failures_total"
+        lines += [f"# HELP {name} Approval steps that raised an error.",
+                  f"# TYPE {name} counter"]
+        for step, stats in sorted(summary.items()):
+            lines.append(f'{name}{{step="{step}"}} {stats["failures"]}')
+        return "\n".join(lines) + "\n"
+
+
+    def export(self, directory: str = None) -> list:
+        '''Writes the aggregated metrics to 'metrics.json' & 'metrics.prom'.
+
+        Parameters
+        ----------
+            directory : str, optional
+                Where to write the files. (default METRICS_DIR environ.
+                variable or DEFAULT_METRICS_DIR)
+
+        Returns
+        -------
+            list [str]
+                The paths of the written files.
+        '''
+        directory = directory or os.environ.get("METRICS_DIR",
+                                                DEFAULT_METRICS_DIR)
+        os.makedirs(directory, exist_ok=True)
+
+        json_path = os.path.join(directory, "metrics.json")
+        with open(json_path, "w") as f:
+            json.dump({"generated_at": time.time(),
+                       "steps": self.summary()}, f, indent=2)
+
+        prom_path = os.path.join(directory, "metrics.prom")
+        with open(prom_path, "w") as f:
+            f.write(self.to_prometheus())
+
+        return [json_path, prom_path]
+
+
+    def print_summary(self) -> None:
+        '''Prints each step's p50/p95/p99 wall time, commands & waits.'''
+        summary = self.summary()
+        if not summary:
+            return
+        print("\n ---- Step Metrics (p50 / p95 / p99) ----")
+        for step, stats in sorted(summary.items(),
+                                  key=lambda s: -s[1]["wall"]["sum"]):
+            wall, cmds, wait = stats["wall"], stats["commands"], stats["wait"]
+            print(f"{step} (x{stats['count']}): "
+                  f"{wall['p50']:.2f} / {wall['p95']:.2f} / "
+                  f"{wall['p99']:.2f} sec., "
+                  f"{cmds['p50']:.0f} / {cmds['p95']:.0f} / "
+                  f"{cmds['p99']:.0f} commands, "
+                  f"{wait['p50']:.2f} / {wait['p95']:.2f} / "
+                  f"{wait['p99']:.2f} sec. waiting")
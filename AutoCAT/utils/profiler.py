@@ -0,0 +1,306 @@
+'''
+profiler.py
+------------
+    A step hook profiling the CPU & memory used by Chrome, chromedriver and
+    Python (ie. us) during each step of the approval process, to tell browser
+    work apart from backend latency & our own overhead, and to size the
+    number of workers a host can take.
+'''
+import math
+import os
+import threading
+import time
+
+import psutil
+
+from utils.metrics import percentile
+from utils.resources import driver_pid
+from utils.step_reports import StepReporter
+
+
+# The process groups we profile:
+CHROME = "chrome"
+CHROMEDRIVER = "chromedriver"
+PYTHON = "python"
+GROUPS = (CHROME, CHROMEDRIVER, PYTHON)
+
+# Seconds between samples while a step is running:
+DEFAULT_INTERVAL = 0.5
+
+DEFAULT_PROFILE_DIR = "profiles"
+
+# The columns of each step's samples (CPU in % of one core, RSS in MB):
+SAMPLE_COLUMNS = ["t"] + [f"{group}_{series}" for group in GROUPS
+                          for series in ("cpu", "rss_mb")]
+
+# Share of the host's memory we'd fill with workers when sizing:
+MEMORY_HEADROOM = 0.8
+
+
+def _usage(driver) -> dict:
+    '''Returns the cumulative CPU seconds & current RSS (in bytes) of each
+    process group, as {group: [cpu, rss]}.'''
+    usage = {group: [0.0, 0] for group in GROUPS}
+    procs = [(PYTHON, psutil.Process(os.getpid()))]
+    pid = driver_pid(driver) if driver is not None else None
+    if pid is not None:
+        try:
+            root = psutil.Process(pid)
+            procs.append((CHROMEDRIVER, root))
+            procs += [(CHROME, child)
+                      for child in root.children(recursive=True)]
+        except psutil.Error:
+            pass
+
+    for group, proc in procs:
+        try:
+            with proc.oneshot():
+                times = proc.cpu_times()
+                usage[group][0] += times.user + times.system
+                usage[group][1] += proc.memory_info().rss
+        except psutil.Error:
+            # [CASE] The process exited (ex. a closed tab's renderer):
+            continue
+    return usage
+
+
+class _StepProfile:
+    '''The samples of one running step.'''
+
+    def __init__(self, vendor: str, step: str, driver, nested: bool):
+        self.vendor = vendor
+        self.step = step
+        self.nested = nested
+        self.driver = driver
+        self.started = time.time()
+        self.first = self.last = (self.started, _usage(driver))
+        self.peaks = {group: self.first[1][group][1] for group in GROUPS}
+        self.samples = []
+        self.sample(self.first)
+
+
+    def sample(self, reading: tuple = None) -> None:
+        '''Records a sample: each group's CPU use since the previous sample
+        & its current memory.'''
+        now, usage = reading or (time.time(), _usage(self.driver))
+        then, previous = self.last
+        span = now - then
+        row = [round(now - self.started, 2)]
+        for group in GROUPS:
+            cpu, rss = usage[group]
+            busy = max(0.0, cpu - previous[group][0])
+            row += [round(busy / span * 100, 1) if span > 0 else 0.0,
+                    round(rss / 1024 ** 2, 1)]
+            self.peaks[group] = max(self.peaks[group], rss)
+        self.samples.append(row)
+        self.last = (now, usage)
+
+
+    def finish(self, elapsed: float, failed: bool) -> dict:
+        '''Takes a last sample & returns the step's profile.'''
+        self.sample()
+        first, last = self.first[1], self.last[1]
+        # (CPU used by processes that exited mid-step is lost, hence max)
+        cpu = {group: round(max(0.0, last[group][0] - first[group][0]), 3)
+               for group in GROUPS}
+        return {
+            "step": self.step,
+            "started_at": self.started,
+            "elapsed": round(elapsed, 3),
+            "failed": failed,
+            "nested": self.nested,
+            "cpu_seconds": cpu,
+            "peak_rss_mb": {group: round(self.peaks[group] / 1024 ** 2, 1)
+                            for group in GROUPS},
+            "samples": self.samples,
+        }
+
+
+class ResourceProfiler(StepReporter):
+    '''A step hook sampling the CPU & memory of Chrome, chromedriver and
+    Python when every timed ApproveVendorProcess step starts & finishes, and
+    every `interval` seconds while it runs.
+
+    Each vendor's profile (every step) is written to '<email>.json' once
+    their run ends (see utils.step_reports.StepReporter). export() writes
+    any left over, along with 'summary.json': per step averages across the
+    batch, plus an estimate of how many workers the host can run.
+
+    Python is the whole AutoCAT process, so it's shared by every step running
+    at the same time (ex. in a batch).
+
+    Attributes
+    ----------
+        directory : str, optional
+            Where to write the profiles. (default PROFILE_DIR environ.
+            variable or DEFAULT_PROFILE_DIR)
+
+        interval : float, optional
+            Seconds between samples while a step runs.
+            (default DEFAULT_INTERVAL)
+
+        max_finished : int, optional
+            How many finished steps (the latest) to keep for the summary.
+            (default None, ie. every one)
+
+    Methods
+    -------
+        step_started(owner, step):
+            Called by the @timer decorator before a step runs.
+
+        step_finished(owner, step, elapsed, error):
+            Called by the @timer decorator after a step runs.
+
+        summary():
+            Returns the per step averages & the worker estimate.
+
+        export():
+            Writes any unwritten vendor profiles & 'summary.json'.
+
+        print_summary():
+            Prints where each step's time & memory went.
+    '''
+
+    COLUMNS = SAMPLE_COLUMNS
+    DETAIL = "samples"
+
+    def __init__(self, directory: str = None,
+                 interval: float = DEFAULT_INTERVAL,
+                 max_finished: int = None):
+        super().__init__(directory or os.environ.get("PROFILE_DIR",
+                                                     DEFAULT_PROFILE_DIR),
+                         max_finished=max_finished)
+        self._interval = interval
+        # Every running step, for the sampler:
+        self._running: set = set()
+        self._sampler = None
+
+
+    def step_started(self, owner, step: str) -> None:
+        '''Takes the step's first sample & has it sampled until it ends.'''
+        stack = self._stack()
+        profile = _StepProfile(self._vendor(owner), step,
+                               getattr(owner, "driver", None),
+                               nested=self._is_nested(owner, stack))
+        stack.append(profile)
+        with self._lock:
+            self._running.add(profile)
+            if self._sampler is None or not self._sampler.is_alive():
+                self._sampler = threading.Thread(target=self._sample_running,
+                                                 name="profiler", daemon=True)
+                self._sampler.start()
+
+
+    def _sample_running(self) -> None:
+        '''Samples every running step each interval, until none are left.'''
+        while True:
+            time.sleep(self._interval)
+            with self._lock:
+                running = list(self._running)
+                if not running:
+                    self._sampler = None
+                    return
+            for profile in running:
+                profile.sample()
+
+
+    def step_finished(self, owner, step: str, elapsed: float,
+                      error: Exception = None) -> None:
+        '''Records the step's profile, writing the vendor's out once their
+        run (the outermost step) is over.'''
+        stack = self._stack()
+        if not stack:
+            return
+        profile = stack.pop()
+        with self._lock:
+            self._running.discard(profile)
+        record = profile.finish(elapsed, error is not None)
+        self._add_record(profile.vendor, record, profile.nested)
+
+
+    def summary(self) -> dict:
+        '''Returns the per step averages across every vendor, plus an
+        estimate of how many workers this host can run.
+
+        Returns
+        -------
+            dict
+                'steps' maps each step to its 'count', mean 'elapsed', mean
+                'cpu_seconds' & p95 'peak_rss_mb' of each group. 'host' has
+                the host's CPUs & memory, the mean CPU cores & p95 memory per
+                worker, and 'suggested_workers'.
+        '''
+        finished = self._finished_records()
+
+        steps = {}
+        for record in finished:
+            steps.setdefault(record["step"], []).append(record)
+
+        summary = {"steps": {}}
+        for step, records in steps.items():
+            summary["steps"][step] = {
+                "count": len(records),
+                "elapsed": sum(r["elapsed"] for r in records) / len(records),
+                "cpu_seconds": {
+                    group: sum(r["cpu_seconds"][group] for r in records)
+                    / len(records) for group in GROUPS},
+                "peak_rss_mb": {
+                    group: percentile([r["peak_rss_mb"][group]
+                                       for r in records], 95)
+                    for group in GROUPS},
+            }
+
+        summary["host"] = self._size_host(finished)
+        return summary
+
+
+    @staticmethod
+    def _size_host(finished: list) -> dict:
+        '''Estimates how many workers the host can run, from the CPU cores &
+        memory a worker (its browser & its share of us) used per step.
+        Steps run within another step are left out, so they don't count
+        twice.'''
+        finished = [r for r in finished if not r["nested"]]
+        memory = psutil.virtual_memory()
+        host = {"cpus": psutil.cpu_count() or 1,
+                "memory_mb": round(memory.total / 1024 ** 2)}
+        wall = sum(r["elapsed"] for r in finished)
+        if not finished or not wall:
+            return host
+
+        cores = sum(sum(r["cpu_seconds"].values()) for r in finished) / wall
+        peak_mb = percentile([sum(r["peak_rss_mb"].values())
+                              for r in finished], 95)
+        by_cpu = host["cpus"] / cores if cores else math.inf
+        by_memory = memory.total / 1024 ** 2 * MEMORY_HEADROOM / peak_mb \
+            if peak_mb else math.inf
+        host.update({"cores_per_worker": round(cores, 2),
+                     "peak_mb_per_worker": round(peak_mb, 1),
+                     "suggested_workers": max(1, int(min(by_cpu, by_memory)))
+                     if min(by_cpu, by_memory) != math.inf else None})
+        return host
+
+
+    def print_summary(self) -> None:
+        '''Prints each step's mean CPU seconds by group & p95 memory, and the
+        worker estimate.'''
+        summary = self.summary()
+        if not summary["steps"]:
+            return
+        print("\n ---- Step Resources (mean CPU sec. chrome / chromedriver "
+              "/ python, p95 MB) ----")
+        for step, stats in sorted(summary["steps"].items(),
+                                  key=lambda s: -s[1]["elapsed"]):
+            cpu, rss = stats["cpu_seconds"], stats["peak_rss_mb"]
+            print(f"{step} (x{stats['count']}, {stats['elapsed']:.2f} sec.): "
+                  f"{cpu[CHROME]:.2f} / {cpu[CHROMEDRIVER]:.2f} / "
+                  f"{cpu[PYTHON]:.2f} CPU sec., "
+                  f"{rss[CHROME]:.0f} / {rss[CHROMEDRIVER]:.0f} / "
+                  f"{rss[PYTHON]:.0f} MB")
+
+        host = summary["host"]
+        if host.get("suggested_workers"):
+            print(f"\nEach worker used ~{host['cores_per_worker']} cores & "
+                  f"up to {host['peak_mb_per_worker']} MB -- this host "
+                  f"({host['cpus']} CPUs, {host['memory_mb']} MB) can take "
+                  f"~{host['suggested_workers']} workers.")
@@ -0,0 +1,142 @@
+'''
+resources.py
+------------
+    Samples the memory & CPU used by each webdriver's processes (chromedriver,
+    Chrome & its renderers) with psutil, and decides when a long-lived driver
+    has grown enough that it should be swapped for a fresh one.
+'''
+import os
+import threading
+from collections import namedtuple
+
+import psutil
+from dotenv import load_dotenv
+
+
+# Defaults for when a driver gets recycled (see RecyclePolicy):
+DEFAULT_MAX_RSS_MB = 1536
+DEFAULT_MAX_PAGE_LOADS = 400
+
+# A driver's processes at one point in time: their combined resident memory
+#   (in MB), combined CPU use (% of one core, since the previous sample) &
+#   how many processes there are:
+ResourceSample = namedtuple("ResourceSample",
+                            ["rss_mb", "cpu_percent", "processes"])
+
+# Thresholds past which a driver is recycled between vendors. Any of them may
+#   be None (ie. no limit):
+#   - max_rss_mb: Combined resident memory of the driver's processes.
+#   - max_page_loads: Pages loaded since the driver was launched.
+#   - max_vendors: Vendors processed since the driver was launched.
+RecyclePolicy = namedtuple("RecyclePolicy",
+                           ["max_rss_mb", "max_page_loads", "max_vendors"],
+                           defaults=(DEFAULT_MAX_RSS_MB,
+                                     DEFAULT_MAX_PAGE_LOADS, None))
+
+
+def _env_limit(name: str, default):
+    '''Reads a numeric limit from the environment ('0' means no limit).'''
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    number = float(value)
+    return (int(number) if number.is_integer() else number) or None
+
+
+def policy_from_env(**overrides) -> RecyclePolicy:
+    '''Builds the recycle policy from the DRIVER_MAX_RSS_MB,
+    DRIVER_MAX_PAGE_LOADS & DRIVER_MAX_VENDORS environ. variables, with any
+    given (non-None) overrides on top. A limit of 0 means no limit.'''
+    load_dotenv()
+    policy = RecyclePolicy(
+        max_rss_mb=_env_limit("DRIVER_MAX_RSS_MB", DEFAULT_MAX_RSS_MB),
+        max_page_loads=_env_limit("DRIVER_MAX_PAGE_LOADS",
+                                  DEFAULT_MAX_PAGE_LOADS),
+        max_vendors=_env_limit("DRIVER_MAX_VENDORS", None))
+    return policy._replace(**{k: v or None for k, v in overrides.items()
+                              if v is not None})
+
+
+def driver_pid(driver) -> int:
+    '''Returns the pid of the chromedriver behind the driver, or None if this
+    process didn't launch it (ex. an attached driver).'''
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+
+class ResourceMonitor:
+    '''A class for sampling the processes behind webdrivers.
+
+    Process handles are kept between samples, so each sample's CPU use
+    covers the time since the previous one (the first sample reads 0%).
+
+    Methods
+    -------
+        sample(*drivers):
+            Returns the combined ResourceSample of the drivers' processes.
+    '''
+
+    def __init__(self):
+        self._processes: dict = {}
+        self._lock = threading.Lock()
+
+
+    def _process(self, pid: int) -> psutil.Process:
+        if pid not in self._processes:
+            self._processes[pid] = psutil.Process(pid)
+        return self._processes[pid]
+
+
+    def sample(self, *drivers) -> ResourceSample:
+        '''Returns the combined ResourceSample of the given drivers'
+        processes (chromedriver & everything it launched), or None if none
+        of them can be sampled.'''
+        with self._lock:
+            tree = []
+            for driver in drivers:
+                pid = driver_pid(driver) if driver is not None else None
+                if pid is None:
+                    continue
+                try:
+                    root = self._process(pid)
+                    tree += [root] + root.children(recursive=True)
+                except psutil.Error:
+                    continue
+            if not tree:
+                return None
+
+            rss = 0
+            cpu = 0.0
+            alive = set()
+            for proc in tree:
+                try:
+                    proc = self._process(proc.pid)
+                    with proc.oneshot():
+                        rss += proc.memory_info().rss
+                        cpu += proc.cpu_percent(None)
+                    alive.add(proc.pid)
+                except psutil.Error:
+                    continue
+
+            # Forget processes that have exited:
+            for pid in set(self._processes) - alive:
+                del self._processes[pid]
+
+        return ResourceSample(round(rss / 1024 ** 2, 1), round(cpu, 1),
+                              len(alive))
+
+
+def recycle_reason(policy: RecyclePolicy, sample: ResourceSample,
+                   page_loads: int, vendors: int) -> str:
+    '''Returns why a driver should be recycled under the given policy, or
+    None if it's fine.'''
+    if policy.max_rss_mb and sample is not None \
+            and sample.rss_mb >= policy.max_rss_mb:
+        return f"{sample.rss_mb} MB used, limit {policy.max_rss_mb} MB"
+    if policy.max_page_loads and page_loads >= policy.max_page_loads:
+        return f"{page_loads} pages loaded, limit {policy.max_page_loads}"
+    if policy.max_vendors and vendors >= policy.max_vendors:
+        return f"{vendors} vendors processed, limit {policy.max_vendors}"
+    return None
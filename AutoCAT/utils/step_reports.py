@@ -0,0 +1,148 @@
+'''
+step_reports.py
+------------
+    The bookkeeping shared by the step hooks that report on every step of
+    each vendor's run (see utils.profiler & utils.tracing): which steps are
+    running on each thread, collecting a vendor's step records until their
+    run ends, and writing them out.
+'''
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+
+class StepReporter:
+    '''A base class for step hooks writing a file per vendor, '<email>.json'
+    with a record of every step of their run, once the run -- ie. the
+    outermost step, run_all -- ends (whether it finished or failed).
+    export() writes any left over, along with 'summary.json'.
+
+    A step is nested when it runs within another step on the same thread,
+    or on a process spawned to run steps alongside another (see
+    ApproveVendorProcess.parent), as StepScheduler does on the aux driver.
+
+    Subclasses set COLUMNS (the columns of each record's DETAIL, its bulky
+    per step data left out of the summary) and implement summary().
+
+    Attributes
+    ----------
+        directory : str
+            Where to write the vendor files & 'summary.json'.
+
+        max_finished : int, optional
+            How many finished steps (the latest) to keep for the summary, so
+            long running processes (ex. the daemon) don't grow without end.
+            (default None, ie. every one)
+
+    Methods
+    -------
+        summary():
+            Returns the summary of every finished step.
+
+        export():
+            Writes any unwritten vendor files & 'summary.json'.
+    '''
+    COLUMNS: list = []
+    DETAIL: str = None
+
+    def __init__(self, directory: str, max_finished: int = None):
+        self._directory = directory
+        self._lock = threading.Lock()
+        # Each thread's running steps -- a stack, since steps may call other
+        #   steps:
+        self._local = threading.local()
+        # Each running vendor's finished steps:
+        self._vendors: dict = {}
+        # Every finished step's record (minus its detail), for the summary:
+        self._finished = deque(maxlen=max_finished)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+
+    @staticmethod
+    def _vendor(owner) -> str:
+        '''Returns the email of the vendor the process is working on.'''
+        return getattr(owner, "vendor_email", "") or "unknown"
+
+
+    @staticmethod
+    def _is_nested(owner, stack: list) -> bool:
+        '''Whether a step starting on the process (with the given steps
+        running on this thread) is within another step.'''
+        return bool(stack) or getattr(owner, "parent", None) is not None
+
+
+    def _add_record(self, vendor: str, record: dict, nested: bool,
+                    summary_record: dict = None) -> None:
+        '''Adds a finished step's record to the vendor's, writing them out
+        once it's their outermost step.
+
+        Parameters
+        ----------
+            summary_record : dict, optional
+                What to keep of the step for the summary. (default the
+                record, minus its DETAIL)
+        '''
+        if summary_record is None:
+            summary_record = {key: value for key, value in record.items()
+                              if key != self.DETAIL}
+        with self._lock:
+            records = self._vendors.setdefault(vendor, [])
+            records.append(record)
+            self._finished.append(summary_record)
+            if not nested:
+                del self._vendors[vendor]
+
+        # [CASE] The outermost step (ie. run_all) -> The vendor's run is over:
+        if not nested:
+            self._write_vendor(vendor, records)
+
+
+    def _write_vendor(self, vendor: str, records: list) -> str:
+        '''Writes the vendor's step records, returning its path.'''
+        os.makedirs(self._directory, exist_ok=True)
+        name = re.sub(r"[^\w.@-]", "_", vendor)
+        path = os.path.join(self._directory, f"{name}.json")
+        with open(path, "w") as f:
+            json.dump({"vendor": vendor, "columns": self.COLUMNS,
+                       "steps": records}, f, separators=(",", ":"))
+        return path
+
+
+    def _finished_records(self) -> list:
+        '''Returns the finished steps kept for the summary.'''
+        with self._lock:
+            return list(self._finished)
+
+
+    def summary(self) -> dict:
+        '''Returns the summary of every finished step.'''
+        raise NotImplementedError
+
+
+    def export(self) -> list:
+        '''Writes the files of vendors whose run never ended & the
+        'summary.json', returning the written paths.'''
+        with self._lock:
+            vendors = dict(self._vendors)
+            self._vendors.clear()
+
+        paths = [self._write_vendor(vendor, records)
+                 for vendor, records in vendors.items()]
+        os.makedirs(self._directory, exist_ok=True)
+        path = os.path.join(self._directory, "summary.json")
+        with open(path, "w") as f:
+            json.dump(dict(self.summary(), generated_at=time.time()), f,
+                      indent=2)
+        return paths + [path]
@@ -0,0 +1,380 @@
+'''
+tracing.py
+------------
+    A step hook reading Chrome's performance log (network & page events)
+    around each step of the approval process, and turning it into a network
+    waterfall per step: how many requests were made & how many bytes they
+    took, how long each page took to reach DOMContentLoaded, and which URLs
+    & hosts were the slowest. Shows which backend pages & assets dominate a
+    run, and which third-party hosts are worth blocking in headless mode.
+
+    Needs drivers launched with tracing on, ex. MyWebDriver(trace=True).
+'''
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from utils.step_reports import StepReporter
+
+
+DEFAULT_TRACE_DIR = "traces"
+
+# How many of the slowest requests (per step) & URLs / hosts (per run) are
+#   reported:
+DEFAULT_SLOWEST = 5
+
+# The columns of each step's waterfall (times in seconds from the step's
+#   first request, status None for failed / unfinished requests):
+WATERFALL_COLUMNS = ["start", "duration", "type", "status", "bytes", "url"]
+
+
+def read_performance_log(driver) -> list:
+    '''Returns (and clears) the driver's performance log, as (method, params)
+    pairs, or None if the driver isn't tracing.'''
+    try:
+        # (Through the class' execute, so reading the log doesn't count as
+        #   one of the step's webdriver commands -- see instrument_driver)
+        entries = type(driver).execute(driver, Command.GET_LOG,
+                                       {"type": "performance"})["value"]
+    except WebDriverException:
+        return None
+
+    events = []
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+            events.append((message["method"], message.get("params", {})))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return events
+
+
+def _strip_query(url: str) -> str:
+    return url.split("?", 1)[0].split("#", 1)[0]
+
+
+def build_waterfall(events: list, slowest: int = DEFAULT_SLOWEST) -> dict:
+    '''Builds a step's network waterfall from its performance log events.
+
+    Returns
+    -------
+        dict
+            The step's 'requests', 'failed_requests', 'bytes' (as sent over
+            the wire), totals 'by_type' & by host ('hosts'), each page
+            navigation's 'dom_content_loaded' & 'load' times ('pages'), its
+            'slowest' requests, and the 'waterfall' itself (see
+            WATERFALL_COLUMNS).
+    '''
+    pending = {}
+    requests = []
+    pages = []
+    for method, params in events:
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            # [CASE] A redirect -> The previous hop finishes here:
+            if request_id in pending and "redirectResponse" in params:
+                hop = pending.pop(request_id)
+                hop.update(end=params["timestamp"],
+                           status=params["redirectResponse"].get("status"))
+                requests.append(hop)
+            request = {"url": params["request"]["url"],
+                       "type": params.get("type", "Other"),
+                       "start": params["timestamp"], "end": None,
+                       "status": None, "bytes": 0, "error": None}
+            pending[request_id] = request
+            # [CASE] The main document of a navigation (not a redirect):
+            if request["type"] == "Document" \
+                    and request_id == params.get("loaderId") \
+                    and "redirectResponse" not in params:
+                pages.append({"url": request["url"],
+                              "start": request["start"],
+                              "dom_content_loaded": None, "load": None})
+
+        elif method == "Network.responseReceived":
+            request = pending.get(request_id)
+            if request is not None:
+                request["status"] = params["response"].get("status")
+                request["type"] = params.get("type", request["type"])
+
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            request = pending.pop(request_id, None)
+            if request is None:
+                continue
+            request["end"] = params["timestamp"]
+            request["bytes"] = int(params.get("encodedDataLength", 0))
+            if method == "Network.loadingFailed":
+                request["status"] = None
+                request["error"] = params.get("blockedReason") \
+                    or params.get("errorText") or "failed"
+            requests.append(request)
+
+        elif method in ("Page.domContentEventFired", "Page.loadEventFired"):
+            key = "dom_content_loaded" \
+                if method == "Page.domContentEventFired" else "load"
+            # Goes with the latest navigation that hasn't fired it yet:
+            for page in reversed(pages):
+                if page[key] is None and params["timestamp"] >= page["start"]:
+                    page[key] = round(params["timestamp"] - page["start"], 3)
+                    break
+
+    # Requests still loading when the step ended:
+    requests += pending.values()
+    requests.sort(key=lambda r: r["start"])
+    origin = requests[0]["start"] if requests else 0.0
+
+    by_type = {}
+    hosts = {}
+    for r in requests:
+        r["duration"] = r["end"] - r["start"] if r["end"] is not None \
+            else None
+        kind = by_type.setdefault(r["type"], {"requests": 0, "bytes": 0})
+        kind["requests"] += 1
+        kind["bytes"] += r["bytes"]
+        host = hosts.setdefault(urlsplit(r["url"]).hostname or r["url"][:32],
+                                {"requests": 0, "bytes": 0, "seconds": 0.0,
+                                 "failed": 0})
+        host["requests"] += 1
+        host["bytes"] += r["bytes"]
+        host["seconds"] = round(host["seconds"] + (r["duration"] or 0.0), 3)
+        host["failed"] += r["error"] is not None
+
+    timed = sorted((r for r in requests if r["duration"] is not None),
+                   key=lambda r: -r["duration"])
+    return {
+        "requests": len(requests),
+        "failed_requests": sum(1 for r in requests if r["error"]),
+        "bytes": sum(r["bytes"] for r in requests),
+        "by_type": by_type,
+        "hosts": hosts,
+        "pages": [{k: v for k, v in page.items() if k != "start"}
+                  for page in pages],
+        "slowest": [{"url": r["url"], "type": r["type"],
+                     "status": r["status"], "bytes": r["bytes"],
+                     "seconds": round(r["duration"], 3)}
+                    for r in timed[:slowest]],
+        "waterfall": [[round(r["start"] - origin, 3),
+                       round(r["duration"], 3)
+                       if r["duration"] is not None else None,
+                       r["type"], r["status"], r["bytes"], r["url"]]
+                      for r in requests],
+    }
+
+
+class NetworkTracer(StepReporter):
+    '''A step hook collecting Chrome's performance log events while every
+    timed ApproveVendorProcess step runs, and building each step's network
+    waterfall (see build_waterfall).
+
+    Each vendor's waterfalls (every step) are written to '<email>.json' once
+    their run ends (see utils.step_reports.StepReporter). export() writes
+    any left over, along with 'summary.json': per step averages across the
+    run, the hosts & URLs that took the longest, and the third-party hosts
+    (ie. not the backend's) that headless runs could block.
+
+    A step run within another step is also part of the outer step's
+    waterfall, as are steps run alongside it on another thread (by a
+    process spawned with it as its parent, see StepScheduler). Drivers that
+    weren't launched with tracing on are skipped.
+
+    Attributes
+    ----------
+        directory : str, optional
+            Where to write the waterfalls. (default TRACE_DIR environ.
+            variable or DEFAULT_TRACE_DIR)
+
+        slowest : int, optional
+            How many of the slowest requests, URLs & hosts to report.
+            (default DEFAULT_SLOWEST)
+
+        max_finished : int, optional
+            How many finished steps (the latest) to keep for the summary.
+            (default None, ie. every one)
+
+    Methods
+    -------
+        step_started(owner, step):
+            Called by the @timer decorator before a step runs.
+
+        step_finished(owner, step, elapsed, error):
+            Called by the @timer decorator after a step runs.
+
+        summary():
+            Returns the per step averages & the slowest hosts / URLs.
+
+        export():
+            Writes any unwritten vendor waterfalls & 'summary.json'.
+
+        print_summary():
+            Prints each step's requests, bytes & page load times, and the
+            slowest hosts.
+    '''
+
+    COLUMNS = WATERFALL_COLUMNS
+    DETAIL = "waterfall"
+
+    def __init__(self, directory: str = None,
+                 slowest: int = DEFAULT_SLOWEST, max_finished: int = None):
+        super().__init__(directory or os.environ.get("TRACE_DIR",
+                                                     DEFAULT_TRACE_DIR),
+                         max_finished=max_finished)
+        self._slowest = slowest
+        # The outermost running step of each process, as {id(process):
+        #   frame}, for steps run alongside it to hand their events to:
+        self._outermost: dict = {}
+
+
+    def step_started(self, owner, step: str) -> None:
+        '''Clears the driver's log, handing what's in it to the step we're
+        within (if any).'''
+        driver = getattr(owner, "driver", None)
+        events = read_performance_log(driver) if driver is not None else None
+        stack = self._stack()
+        if stack and events:
+            stack[-1]["events"] += events
+        frame = {"started": time.time(), "events": [],
+                 "tracing": events is not None,
+                 "nested": self._is_nested(owner, stack)}
+        if not frame["nested"]:
+            with self._lock:
+                self._outermost[id(owner)] = frame
+        stack.append(frame)
+
+
+    def step_finished(self, owner, step: str, elapsed: float,
+                      error: Exception = None) -> None:
+        '''Builds the step's waterfall, writing the vendor's out once their
+        run (the outermost step) is over.'''
+        stack = self._stack()
+        if not stack:
+            return
+        frame = stack.pop()
+        parent = getattr(owner, "parent", None)
+        with self._lock:
+            if self._outermost.get(id(owner)) is frame:
+                del self._outermost[id(owner)]
+        if not frame["tracing"]:
+            return
+        driver = getattr(owner, "driver", None)
+        frame["events"] += read_performance_log(driver) or []
+        if stack:
+            stack[-1]["events"] += frame["events"]
+        # [CASE] Run alongside another process (on another thread) -> It's
+        #   part of that process' outermost step:
+        elif frame["nested"]:
+            with self._lock:
+                outer = self._outermost.get(id(parent))
+                if outer is not None:
+                    outer["events"] += frame["events"]
+
+        record = dict({"step": step, "started_at": frame["started"],
+                       "elapsed": round(elapsed, 3),
+                       "failed": error is not None,
+                       "nested": frame["nested"]},
+                      **build_waterfall(frame["events"], self._slowest))
+
+        # Keep the time spent on each URL (sans query), rather than the
+        #   whole waterfall, for the summary:
+        urls = {}
+        for _, duration, _, _, size, url in record["waterfall"]:
+            total = urls.setdefault(_strip_query(url),
+                                    {"requests": 0, "bytes": 0,
+                                     "seconds": 0.0})
+            total["requests"] += 1
+            total["bytes"] += size
+            total["seconds"] += duration or 0.0
+        self._add_record(
+            self._vendor(owner), record, frame["nested"],
+            summary_record=dict({k: v for k, v in record.items()
+                                 if k != self.DETAIL}, urls=urls))
+
+
+    def summary(self) -> dict:
+        '''Returns the per step averages across every vendor, and the hosts
+        & URLs the run spent the longest on.
+
+        Returns
+        -------
+            dict
+                'steps' maps each step to its 'count' and mean 'requests',
+                'bytes' & 'dom_content_loaded' (of its pages). 'hosts' &
+                'urls' are the slowest (by total seconds) with their
+                requests & bytes, and 'third_party' the hosts other than the
+                backend's that were actually loaded, by bytes.
+        '''
+        finished = self._finished_records()
+
+        steps = {}
+        for record in finished:
+            steps.setdefault(record["step"], []).append(record)
+
+        summary = {"steps": {}}
+        for step, records in steps.items():
+            loads = [page["dom_content_loaded"] for r in records
+                     for page in r["pages"]
+                     if page["dom_content_loaded"] is not None]
+            summary["steps"][step] = {
+                "count": len(records),
+                "requests": sum(r["requests"] for r in records) / len(records),
+                "bytes": sum(r["bytes"] for r in records) / len(records),
+                "dom_content_loaded": sum(loads) / len(loads)
+                if loads else None,
+            }
+
+        # Totals over the outermost steps, so nested ones don't count twice:
+        hosts = {}
+        urls = {}
+        for record in finished:
+            if record["nested"]:
+                continue
+            for host, stats in record["hosts"].items():
+                total = hosts.setdefault(host, dict.fromkeys(stats, 0))
+                for key, value in stats.items():
+                    total[key] += value
+            for url, stats in record["urls"].items():
+                total = urls.setdefault(url, dict.fromkeys(stats, 0))
+                for key, value in stats.items():
+                    total[key] += value
+
+        load_dotenv()
+        backend = urlsplit(os.environ.get("BACKEND_LANDING_URL") or "")\
+            .hostname
+
+        def top(totals: dict, key: str) -> dict:
+            ranked = sorted(totals.items(), key=lambda item: -item[1][key])
+            return {name: dict(stats, seconds=round(stats["seconds"], 3))
+                    for name, stats in ranked[:self._slowest]}
+
+        summary["hosts"] = top(hosts, "seconds")
+        summary["urls"] = top(urls, "seconds")
+        summary["third_party"] = top(
+            {host: stats for host, stats in hosts.items()
+             if host != backend and stats["failed"] < stats["requests"]},
+            "bytes")
+        return summary
+
+
+    def print_summary(self) -> None:
+        '''Prints each step's mean requests, bytes & time to
+        DOMContentLoaded, and the slowest hosts.'''
+        summary = self.summary()
+        if not summary["steps"]:
+            return
+        print("\n ---- Step Network (mean requests, KB, DOMContentLoaded) "
+              "----")
+        for step, stats in sorted(summary["steps"].items(),
+                                  key=lambda s: -s[1]["bytes"]):
+            loaded = f"{stats['dom_content_loaded']:.2f} sec." \
+                if stats["dom_content_loaded"] is not None else "-"
+            print(f"{step} (x{stats['count']}): {stats['requests']:.1f} "
+                  f"requests, {stats['bytes'] / 1024:.0f} KB, {loaded}")
+
+        print("\nSlowest hosts:")
+        for host, stats in summary["hosts"].items():
+            print(f"{host}: {stats['seconds']:.2f} sec. over "
+                  f"{stats['requests']} requests, "
+                  f"{stats['bytes'] / 1024:.0f} KB")
@@ -0,0 +1,90 @@
+'''
+vendor_index.py
+------------
+    A persistent email -> profile_id index, so vendors we've looked up before
+    can skip the backend search.
+'''
+import json
+import os
+import threading
+
+
+# Where the index lives (relative to the 'AutoCAT' folder):
+DEFAULT_INDEX_PATH = ".vendor_index.json"
+
+# Every VendorIndex writes the same file, so updates are serialised process
+#   wide & merged with whatever is on disk:
+_INDEX_LOCK = threading.Lock()
+
+
+class VendorIndex:
+    '''A class for looking up & remembering vendors' backend profile ids by
+    their email address.
+
+    Attributes
+    ----------
+        path : str, optional
+            The path to the index file. (default DEFAULT_INDEX_PATH)
+
+    Methods
+    -------
+        get(email):
+            Returns the vendor's profile id, or None if we haven't seen them.
+
+        set(email, profile_id):
+            Remembers the vendor's profile id.
+
+        remove(email):
+            Forgets the vendor (ex. when the cached id turns out to be wrong).
+    '''
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self._path = path
+        self._entries: dict = self._read()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+
+    def _read(self) -> dict:
+        '''Loads the index from disk.'''
+        try:
+            with open(self._path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+    def _write(self) -> None:
+        '''Saves the index to disk (via a temp file, so it's never left half
+        written).'''
+        tmp_path = f"{self._path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self._path)
+
+
+    def get(self, email: str) -> str:
+        '''Returns the vendor's profile id, or None if we haven't seen them.'''
+        return self._entries.get(email.strip().lower())
+
+
+    def set(self, email: str, profile_id: str) -> None:
+        '''Remembers the vendor's profile id.'''
+        email = email.strip().lower()
+        with _INDEX_LOCK:
+            self._entries = self._read()
+            if self._entries.get(email) == profile_id:
+                return
+            self._entries[email] = profile_id
+            self._write()
+
+
+    def remove(self, email: str) -> None:
+        '''Forgets the vendor.'''
+        email = email.strip().lower()
+        with _INDEX_LOCK:
+            self._entries = self._read()
+            if self._entries.pop(email, None) is not None:
+                self._write()
@@ -4,6 +4,9 @@ webdriver.py
     Class for building our Selenium Chrome webdriver.
 '''
 from selenium import webdriver
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
 
 
 # Default & Experimental option flags for configuring our Chrome webdriver:
@@ -15,6 +18,52 @@ DEFAULT_FLAGS = ["--start-maximized",
 
 EXP_OPTS = ["enable-automation", "enable-logging"]
 
+# What Chrome's performance log records when tracing (see
+#   utils.tracing.NetworkTracer):
+PERF_LOGGING_PREFS = {"enableNetwork": True, "enablePage": True}
+
+# Third-party hosts the performance profile refuses to resolve. None of them
+#   are needed to fill in & submit the backend's forms:
+DEFAULT_BLOCKLIST = ["*google-analytics.com",
+                     "*googletagmanager.com",
+                     "*doubleclick.net",
+                     "*facebook.net",
+                     "*facebook.com",
+                     "*hotjar.com",
+                     "*fonts.googleapis.com",
+                     "*fonts.gstatic.com",
+                    ]
+
+# Driver profiles:
+#   - 'interactive': A visible browser left open for a human to review.
+#   - 'performance': Headless, no images, third-party hosts blocked & pages
+#       handed back as soon as the DOM is ready. Meant for batch workers.
+INTERACTIVE = "interactive"
+PERFORMANCE = "performance"
+
+PROFILES = {
+    INTERACTIVE: {
+        "extra_flags": [],
+        "dropped_flags": [],
+        "prefs": {},
+        "page_load_strategy": "normal",
+        "detach": True,
+        "block_hosts": False,
+    },
+    PERFORMANCE: {
+        "extra_flags": ["--headless",
+                        "--window-size=1920,1080",
+                        "--disable-gpu",
+                        "--blink-settings=imagesEnabled=false",
+                       ],
+        "dropped_flags": ["--start-maximized"],
+        "prefs": {"profile.managed_default_content_settings.images": 2},
+        "page_load_strategy": "eager",
+        "detach": False,
+        "block_hosts": True,
+    },
+}
+
 
 class MyWebDriver:
     '''A class for building the Selenium Chrome webdriver.
@@ -32,6 +81,19 @@ class MyWebDriver:
             A list of experimental options that can be accepted by the Chrome
             Selenium webdriver. (default EXP_OPTS)
 
+        profile : str, optional
+            The name of the driver profile to use, one of PROFILES.
+            (default INTERACTIVE)
+
+        blocklist : list [str], optional
+            Host patterns the browser refuses to resolve, when the profile
+            blocks hosts. (default DEFAULT_BLOCKLIST)
+
+        trace : bool, optional
+            Whether Chrome records its network & page events in the
+            'performance' log, for utils.tracing.NetworkTracer.
+            (default False)
+
     Parameters
     ----------
         flags : list [str]
@@ -46,9 +108,17 @@ class MyWebDriver:
             Returns an initialized Selenium Chrome webdriver.
     '''
 
-    def __init__(self, flags: list = None, exp_opts: list = None):
+    def __init__(self, flags: list = None, exp_opts: list = None,
+                 profile: str = INTERACTIVE, blocklist: list = None,
+                 trace: bool = False):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown driver profile '{profile}'!")
+        self._profile = profile
         self._flags = flags if flags else DEFAULT_FLAGS
         self._exp_opts = exp_opts if exp_opts else EXP_OPTS
+        self._blocklist = blocklist if blocklist is not None \
+                          else DEFAULT_BLOCKLIST
+        self._trace = trace
 
     @property
     def flags(self) -> list:
@@ -58,6 +128,18 @@ class MyWebDriver:
     def exp_opts(self) -> list:
         return self._exp_opts
 
+    @property
+    def profile(self) -> str:
+        return self._profile
+
+    @property
+    def blocklist(self) -> list:
+        return self._blocklist
+
+    @property
+    def trace(self) -> bool:
+        return self._trace
+
 
     def _build_options(self) -> webdriver.ChromeOptions:
         '''Builds a ChromeOptions object for specifying special config settings
@@ -68,19 +150,50 @@ class MyWebDriver:
             selenium.webdriver.ChromeOptions
         '''
         _opts = webdriver.ChromeOptions()
+        _profile = PROFILES[self._profile]
 
-        # Add default flags:
+        # Add default flags (minus any the profile drops) & profile flags:
         for flag in self._flags:
+            if flag not in _profile["dropped_flags"]:
+                _opts.add_argument(flag)
+        for flag in _profile["extra_flags"]:
             _opts.add_argument(flag)
 
+        # [CASE] Profile blocks third-party hosts -> Make them unresolvable:
+        if _profile["block_hosts"] and self._blocklist:
+            rules = " , ".join(f"MAP {host} ~NOTFOUND"
+                               for host in self._blocklist)
+            _opts.add_argument(f"--host-resolver-rules={rules}")
+
         # Add experimental flags:
         _opts.add_experimental_option("excludeSwitches", self._exp_opts)
+        if _profile["prefs"]:
+            _opts.add_experimental_option("prefs", _profile["prefs"])
+        if self._trace:
+            _opts.add_experimental_option("perfLoggingPrefs",
+                                          PERF_LOGGING_PREFS)
 
         # Option to keep the web browser open after program is finished:
-        _opts.add_experimental_option("detach", True)
+        _opts.add_experimental_option("detach", _profile["detach"])
         return _opts
 
 
+    def _build_capabilities(self) -> dict:
+        '''Builds the desired capabilities for our Chrome webdriver, which
+        carry settings ChromeOptions can't (ex. the page load strategy).
+
+        Returns
+        -------
+            dict
+        '''
+        _caps = DesiredCapabilities.CHROME.copy()
+        _caps["pageLoadStrategy"] = PROFILES[self._profile]["page_load_strategy"]
+        # [CASE] Tracing -> Have chromedriver keep the performance log:
+        if self._trace:
+            _caps["goog:loggingPrefs"] = {"performance": "ALL"}
+        return _caps
+
+
     def initialize_driver(self) -> webdriver.Chrome:
         '''Initializes and returns a Google Chrome webdriver used to perform
         automated tasks in the browser.
@@ -89,4 +202,48 @@ class MyWebDriver:
         -------
             selenium.webdriver.Chrome
         '''
-        return webdriver.Chrome(options=self._build_options())
+        return webdriver.Chrome(options=self._build_options(),
+                                desired_capabilities=self._build_capabilities())
+
+
+class AttachedChrome(webdriver.Chrome):
+    '''A Chrome webdriver attached to a session that another process
+    started (and whose chromedriver it still owns).
+
+    Quitting it ends the browser session, but leaves the chromedriver to the
+    process that launched it.
+    '''
+
+    def __init__(self, executor_url: str, session_id: str, w3c: bool = True):
+        self._attach_to = (session_id, w3c)
+        RemoteWebDriver.__init__(
+            self, command_executor=ChromeRemoteConnection(
+                remote_server_addr=executor_url),
+            desired_capabilities={})
+
+    def start_session(self, capabilities, browser_profile=None) -> None:
+        # Join the existing session instead of asking for a new one:
+        self.session_id, self.w3c = self._attach_to
+
+    def quit(self) -> None:
+        RemoteWebDriver.quit(self)
+
+
+def session_info(driver) -> dict:
+    '''Returns what another process needs to attach to the driver's session
+    (see attach_driver).'''
+    return {"executor_url": driver.command_executor._url,
+            "session_id": driver.session_id,
+            "w3c": driver.w3c}
+
+
+def attach_driver(executor_url: str, session_id: str,
+                  w3c: bool = True) -> webdriver.Chrome:
+    '''Attaches to a running Chrome webdriver session (ex. one launched by
+    another process), as described by session_info.
+
+    Returns
+    -------
+        selenium.webdriver.Chrome
+    '''
+    return AttachedChrome(executor_url, session_id, w3c)
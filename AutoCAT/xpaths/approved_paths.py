@@ -93,6 +93,20 @@ coming_soon_page = {
 
   "FIRST_CAT_POS_INPUT":
     __COMING_SOON_ROOT + "/div[1]/div[3]/table/tbody[2]/tr[1]/td[1]/div/div[1]/div/div[2]/div/div/div/span/input",
+
+  # Templates for adding & positioning many categories in one save (format
+  #   with the new row's number / the table row's position):
+  "NEW_CATEGORY_FIELD_N":
+    "//*[@id='new-n{n}-name']",
+
+  "POS_NAMES":
+    __COMING_SOON_ROOT + "/div[1]/div[3]/table/tbody[2]/tr/td[3]/div/div[1]/span/a",
+
+  "POS_DIV":
+    __COMING_SOON_ROOT + "/div[1]/div[3]/table/tbody[2]/tr[{row}]/td[1]/div/div[1]/div/div[1]",
+
+  "CAT_POS_INPUT":
+    __COMING_SOON_ROOT + "/div[1]/div[3]/table/tbody[2]/tr[{row}]/td[1]/div/div[1]/div/div[2]/div/div/div/span/input",
 }
 
 category_page = {
@@ -118,6 +132,22 @@ clean_up = {
 
   "CATEGORY_INPUT_FIELD":
     "/html/body/div[2]/div[2]/div[2]/div[1]/div/div[2]/form/div/fieldset[1]/div/ul/li[8]/div[2]/div/span/span/span[1]/span/ul/li/input",
+
+  "CATEGORY_AUTOCOMPLETE_OPTION":
+    "//li[contains(@class, 'select2-results__option--highlighted')]",
+}
+
+# Relative xpaths, anchored on something stable, to fall back on when the
+#   layout shifts under an element's absolute xpath (see pages/locators.py):
+fallback_paths = {
+  "CATEGORY_INPUT_FIELD": [
+    "//*[@id='categories']/following-sibling::span"
+    "//input[contains(@class, 'select2-search__field')]",
+  ],
+
+  "CATEGORY_UPDATE_BUTTON": [
+    "//*[@id='cleanurl']/ancestor::form//button[@type='submit']",
+  ],
 }
 
 
@@ -155,6 +185,10 @@ SAVE_CHANGES_BUTTON     = coming_soon_page["SAVE_CHANGES_BUTTON"]
 FIRST_POS_NAME          = coming_soon_page["FIRST_POS_NAME"]
 FIRST_POS_DIV           = coming_soon_page["FIRST_POS_DIV"]
 FIRST_CAT_POS_INPUT     = coming_soon_page["FIRST_CAT_POS_INPUT"]
+NEW_CATEGORY_FIELD_N    = coming_soon_page["NEW_CATEGORY_FIELD_N"]
+POS_NAMES               = coming_soon_page["POS_NAMES"]
+POS_DIV                 = coming_soon_page["POS_DIV"]
+CAT_POS_INPUT           = coming_soon_page["CAT_POS_INPUT"]
 
 # Category Page:
 DESCRIPTION_TEXTAREA      = category_page["DESCRIPTION_TEXTAREA"]
@@ -166,3 +200,4 @@ CATEGORY_UPDATE_BUTTON    = category_page["CATEGORY_UPDATE_BUTTON"]
 VENDOR_PAGE_URL_FIELD   = clean_up["VENDOR_PAGE_URL_FIELD"]
 VENDOR_CATEGORIES_FIELD = clean_up["VENDOR_CATEGORIES_FIELD"]
 CATEGORY_INPUT_FIELD    = clean_up["CATEGORY_INPUT_FIELD"]
+CATEGORY_AUTOCOMPLETE_OPTION = clean_up["CATEGORY_AUTOCOMPLETE_OPTION"]